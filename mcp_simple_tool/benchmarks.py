@@ -0,0 +1,355 @@
+"""Reproducible microbenchmarks of the tool hot paths (``mcp-simple-tool bench``).
+
+Every benchmark runs on seeded synthetic data: a docs folder of ``docs``
+Markdown files of ``words`` words each, and a local stand-in HTTP server for
+fetches, so results only depend on the code and the machine. The suite
+returns a JSON-serialisable report; :func:`compare` checks it against a
+saved baseline report.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import io
+import pathlib
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+__all__ = [
+    "BENCHMARKS",
+    "Regression",
+    "compare",
+    "run_suite",
+    "standin_server",
+    "synthetic_corpus",
+    "time_calls",
+    "write_corpus",
+]
+
+# Report layout version; reports of another version are not compared
+REPORT_VERSION = 1
+# Slowdowns smaller than this many milliseconds are noise, whatever the ratio
+NOISE_FLOOR_MS = 0.05
+
+BENCHMARKS = (
+    "chunk_text",
+    "chunk_markdown",
+    "build_index.full",
+    "build_index.incremental",
+    "load_assets.cold",
+    "load_assets.warm",
+    "semantic_search.k1",
+    "semantic_search.k10",
+    "semantic_search.k50",
+    "read_local_doc",
+    "read_local_doc.cached",
+    "fetch",
+)
+
+# Benchmarks that need the index built first
+_INDEXED = BENCHMARKS[2:9]
+
+_WORDS = [
+    "server",
+    "client",
+    "tool",
+    "resource",
+    "prompt",
+    "transport",
+    "session",
+    "context",
+    "request",
+    "response",
+    "stream",
+    "message",
+    "schema",
+    "handler",
+    "capability",
+    "lifespan",
+]
+
+
+def synthetic_corpus(
+    n_docs: int, words_per_doc: int = 60, vocab_size: int = 20_000, seed: int = 0
+) -> List[str]:
+    """Return ``n_docs`` pseudo-documents with a Zipf-like word distribution."""
+    rng = random.Random(seed)
+    vocab = _WORDS + [f"term{i}" for i in range(vocab_size - len(_WORDS))]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+    return [
+        " ".join(rng.choices(vocab, weights=weights, k=words_per_doc))
+        for _ in range(n_docs)
+    ]
+
+
+def write_corpus(root: pathlib.Path, n_files: int, words_per_file: int = 600) -> None:
+    """Write ``n_files`` synthetic Markdown documents under ``root``."""
+    root.mkdir(parents=True, exist_ok=True)
+    for i, text in enumerate(synthetic_corpus(n_files, words_per_file)):
+        (root / f"doc{i:05d}.md").write_text(f"# Doc {i}\n\n{text}\n")
+
+
+@contextmanager
+def standin_server(
+    body: bytes = b"<html>ok</html>", delay: float = 0.0
+) -> Iterator[str]:
+    """Serve ``body`` on a local keep-alive HTTP server and yield its base URL."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:  # noqa: N802
+            if delay:
+                time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    samples.sort()
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+    }
+
+
+def time_calls(
+    fn: Callable[[], object],
+    repeat: int,
+    setup: Optional[Callable[[], object]] = None,
+) -> Dict[str, float]:
+    """Call ``fn`` ``repeat`` times and return latency stats in milliseconds.
+
+    ``setup`` runs untimed before every call.
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return _stats(samples)
+
+
+@contextmanager
+def _serving_docs(root: pathlib.Path) -> Iterator[None]:
+    """Point the index and the doc reader at ``root`` for the duration."""
+    from mcp_simple_tool.semantic_search import indexing, search
+    from mcp_simple_tool.server import doc_reader
+
+    saved = indexing.DOC_DIR, doc_reader.DOC_ROOT, search._generation
+    indexing.DOC_DIR = doc_reader.DOC_ROOT = root
+    search._generation = None
+    try:
+        yield
+    finally:
+        indexing.DOC_DIR, doc_reader.DOC_ROOT, search._generation = saved
+
+
+def _search_next(search: Any, queries: Iterator[str], k: int) -> None:
+    search.semantic_search(next(queries), k)
+
+
+async def _time_fetches(url: str, repeat: int) -> Dict[str, float]:
+    from mcp_simple_tool.server.config import Settings
+    from mcp_simple_tool.server.http import fetch, shared_client
+
+    samples = []
+    async with shared_client(Settings()):
+        await fetch(url, headers={}, extract="auto")  # open the connection
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await fetch(url, headers={}, extract="auto")
+            samples.append((time.perf_counter() - start) * 1000)
+    return _stats(samples)
+
+
+def run_suite(
+    docs: int = 200,
+    words: int = 600,
+    repeat: int = 20,
+    only: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Run the benchmarks (those whose name starts with one of ``only``).
+
+    Args:
+        docs: Synthetic Markdown files in the docs folder
+        words: Words per file
+        repeat: Timed calls per benchmark (index builds run a third as often)
+        only: Name prefixes to select, e.g. ``["semantic_search", "fetch"]``
+
+    Returns:
+        Report with the parameters, environment and per-benchmark stats in ms
+    """
+    from mcp_simple_tool.semantic_search import indexing, search
+    from mcp_simple_tool.server import doc_reader
+    from mcp_simple_tool.server.doc_cache import DocCache
+
+    def selected(name: str) -> bool:
+        return not only or any(name.startswith(prefix) for prefix in only)
+
+    results: Dict[str, Dict[str, float]] = {}
+    rng = random.Random(1)
+    text = " ".join(synthetic_corpus(1, words * 10)[0].split())
+    markdown = "\n\n".join(
+        f"## Section {i}\n\n{para}"
+        for i, para in enumerate(synthetic_corpus(words // 10 or 1, 100))
+    )
+    queries = [" ".join(doc.split()[:3]) for doc in synthetic_corpus(50, 20, seed=2)]
+    page = ("<html><body><article>" + "<p>" + text + "</p>" + "</article>").encode()
+
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        contextlib.redirect_stdout(io.StringIO()),
+    ):
+        root = pathlib.Path(tmp)
+        write_corpus(root, docs, words)
+        names = sorted(p.name for p in root.glob("*.md"))
+        with _serving_docs(root):
+            if selected("chunk_text"):
+                results["chunk_text"] = time_calls(
+                    lambda: indexing.chunk_text(text), repeat
+                )
+            if selected("chunk_markdown"):
+                results["chunk_markdown"] = time_calls(
+                    lambda: indexing.chunk_markdown("bench.md", markdown), repeat
+                )
+            builds = max(1, repeat // 3)
+            if any(selected(name) for name in BENCHMARKS if name in _INDEXED):
+                indexing.build_index(full=True)
+            if selected("build_index.full"):
+                results["build_index.full"] = time_calls(
+                    lambda: indexing.build_index(full=True), builds
+                )
+            if selected("build_index.incremental"):
+                edits = iter(range(builds))
+
+                def edit_one() -> None:
+                    path = root / names[rng.randrange(len(names))]
+                    path.write_text(path.read_text() + f"\nedit {next(edits)}\n")
+
+                results["build_index.incremental"] = time_calls(
+                    indexing.build_index, builds, setup=edit_one
+                )
+
+            def unload() -> None:
+                search._generation = None
+
+            if selected("load_assets.cold"):
+                results["load_assets.cold"] = time_calls(
+                    search._load_assets, repeat, setup=unload
+                )
+            if selected("load_assets.warm"):
+                search._load_assets()
+                results["load_assets.warm"] = time_calls(search._load_assets, repeat)
+            for k in (1, 10, 50):
+                if selected(f"semantic_search.k{k}"):
+                    search._load_assets()
+                    cycle = iter(queries * (repeat // len(queries) + 1))
+                    results[f"semantic_search.k{k}"] = time_calls(
+                        functools.partial(_search_next, search, cycle, k), repeat
+                    )
+
+            def read_page(cache: Optional[DocCache]) -> None:
+                name = names[rng.randrange(len(names))]
+                doc_reader.read_local_doc(name, offset=1, limit=2, cache=cache)
+
+            if selected("read_local_doc"):
+                results["read_local_doc"] = time_calls(lambda: read_page(None), repeat)
+            if selected("read_local_doc.cached"):
+                cache = DocCache(1 << 30)
+                for name in names:
+                    doc_reader.read_local_doc(name, cache=cache)
+                results["read_local_doc.cached"] = time_calls(
+                    lambda: read_page(cache), repeat
+                )
+        if selected("fetch"):
+            with standin_server(page) as url:
+                results["fetch"] = asyncio.run(_time_fetches(url, repeat))
+
+    return {
+        "version": REPORT_VERSION,
+        "params": {"docs": docs, "words": words, "repeat": repeat},
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "argv": sys.argv[1:],
+        },
+        "results": results,
+    }
+
+
+@dataclass(frozen=True)
+class Regression:
+    """A benchmark whose median got slower than the baseline allows."""
+
+    name: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_ms / self.baseline_ms if self.baseline_ms else float("inf")
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25
+) -> List[Regression]:
+    """Return the benchmarks whose p50 exceeds the baseline's by over ``tolerance``.
+
+    Benchmarks missing from either report are skipped, as are slowdowns under
+    :data:`NOISE_FLOOR_MS`.
+
+    Raises:
+        ValueError: If the reports were produced with different parameters
+            or report versions, so their timings are not comparable
+    """
+    for key in ("version", "params"):
+        if current.get(key) != baseline.get(key):
+            raise ValueError(
+                f"Baseline {key} {baseline.get(key)!r} differs from "
+                f"{current.get(key)!r}"
+            )
+    regressions = []
+    for name, stats in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        now, before = stats["p50_ms"], base["p50_ms"]
+        if now > before * (1 + tolerance) and now - before > NOISE_FLOOR_MS:
+            regressions.append(Regression(name, before, now))
+    return regressions
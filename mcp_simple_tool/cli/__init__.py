@@ -16,13 +16,19 @@ def cli() -> None:  # pragma: no cover
 
 
 # Import and add command functions to the CLI group
+from .bench_cmd import bench  # noqa: E402
 from .check_cmd import check  # noqa: E402
+from .profiles_cmd import profiles  # noqa: E402
+from .reindex_cmd import reindex  # noqa: E402
 from .restart_cmd import restart  # noqa: E402
 from .start_cmd import start  # noqa: E402
 from .stop_cmd import stop  # noqa: E402
 
 # Add commands to the CLI group
+cli.add_command(bench)
 cli.add_command(check)
+cli.add_command(profiles)
+cli.add_command(reindex)
 cli.add_command(restart)
 cli.add_command(start)
 cli.add_command(stop)
@@ -0,0 +1,88 @@
+"""Bench command implementation for MCP CLI."""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import sys
+from typing import Optional, Tuple
+
+import click
+
+from ..benchmarks import BENCHMARKS, compare, run_suite
+
+
+@click.command(help="Run the built-in microbenchmarks and compare with a baseline")
+@click.option("--docs", default=200, show_default=True, help="Synthetic doc files")
+@click.option("--words", default=600, show_default=True, help="Words per doc file")
+@click.option("--repeat", default=20, show_default=True, help="Timed calls each")
+@click.option(
+    "--only",
+    multiple=True,
+    help="Run benchmarks starting with this name (repeatable): "
+    + ", ".join(BENCHMARKS),
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    help="Write the JSON report here instead of stdout",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    help="Report to compare with; exit 1 if any benchmark regressed",
+)
+@click.option(
+    "--tolerance",
+    default=0.25,
+    show_default=True,
+    help="Allowed p50 slowdown over the baseline, as a fraction",
+)
+def bench(
+    docs: int,
+    words: int,
+    repeat: int,
+    only: Tuple[str, ...],
+    output: Optional[pathlib.Path],
+    baseline: Optional[pathlib.Path],
+    tolerance: float,
+) -> None:
+    """Run the benchmark suite, print or save its report and check regressions.
+
+    Args:
+        docs: Number of synthetic Markdown files to index and read
+        words: Words per synthetic file
+        repeat: Timed calls per benchmark
+        only: Benchmark name prefixes to run (all if empty)
+        output: File to write the JSON report to
+        baseline: Saved report to compare the p50 timings with
+        tolerance: Fraction by which a p50 may exceed the baseline's
+    """
+    report = run_suite(docs, words, repeat, only)
+    text = json.dumps(report, indent=2)
+    if output is None:
+        click.echo(text)
+    else:
+        output.write_text(text + "\n")
+    for name, stats in report["results"].items():
+        click.echo(
+            f"{name:<26} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms",
+            err=True,
+        )
+
+    if baseline is None:
+        return
+    try:
+        regressions = compare(report, json.loads(baseline.read_text()), tolerance)
+    except ValueError as e:
+        click.echo(f"Cannot compare with {baseline}: {e}", err=True)
+        sys.exit(2)
+    for r in regressions:
+        click.echo(
+            f"REGRESSION {r.name}: p50 {r.baseline_ms:.3f} -> {r.current_ms:.3f} ms "
+            f"({r.ratio:.2f}x)",
+            err=True,
+        )
+    if regressions:
+        sys.exit(1)
+    click.echo(f"No regressions beyond {tolerance:.0%} of {baseline}", err=True)
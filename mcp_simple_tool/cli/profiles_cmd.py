@@ -0,0 +1,54 @@
+"""Profiles command implementation for MCP CLI."""
+
+from __future__ import annotations
+
+import sys
+from typing import Dict, Optional, Union
+
+import click
+import requests
+from requests.exceptions import RequestException
+
+from ..server.config import Settings
+from .utils import admin_headers
+
+
+@click.command(help="Show the slowest sampled tool call profiles of a running server")
+@click.option("--port", default=Settings().port, help="Port the server is running on")
+@click.option(
+    "--index",
+    type=int,
+    default=None,
+    help="Print the collapsed stacks of this profile (0 = slowest) for a flame graph",
+)
+def profiles(port: int, index: Optional[int]) -> None:
+    """List the profiles kept by ``MCP_PROFILE_RATE``, or dump one of them.
+
+    Args:
+        port: The port the server is running on
+        index: Profile to print as collapsed stacks instead of the summary
+    """
+    url = f"http://localhost:{port}/admin/profiles"
+    params: Dict[str, Union[int, str]] = {}
+    if index is not None:
+        params = {"index": index, "format": "collapsed"}
+    try:
+        resp = requests.get(url, params=params, headers=admin_headers(), timeout=10)
+        resp.raise_for_status()
+    except RequestException as e:
+        click.echo(f"Fetching profiles failed: {e}")
+        sys.exit(1)
+
+    if index is not None:
+        click.echo(resp.text, nl=False)
+        return
+    summaries = resp.json()
+    if not summaries:
+        click.echo("No profiles yet (is MCP_PROFILE_RATE set?)")
+    for i, profile in enumerate(summaries):
+        click.echo(
+            f"[{i}] {profile['duration'] * 1000:.1f} ms  {profile['call']}  "
+            f"({profile['samples']} samples)"
+        )
+        for top in profile["top"][:5]:
+            click.echo(f"      {top['samples']:5d}  {top['frame']}")
@@ -0,0 +1,34 @@
+"""Reindex command implementation for MCP CLI."""
+
+from __future__ import annotations
+
+import sys
+
+import click
+import requests
+from requests.exceptions import RequestException
+
+from ..server.config import Settings
+from .utils import admin_headers
+
+
+@click.command(help="Rebuild the search index of a running server without restart")
+@click.option("--port", default=Settings().port, help="Port the server is running on")
+def reindex(port: int) -> None:
+    """Ask a running server to refresh and hot-swap its search index.
+
+    Args:
+        port: The port the server is running on
+    """
+    try:
+        resp = requests.post(
+            f"http://localhost:{port}/admin/reindex",
+            headers=admin_headers(),
+            timeout=300,
+        )
+        resp.raise_for_status()
+    except RequestException as e:
+        click.echo(f"Reindex failed: {e}")
+        sys.exit(1)
+
+    click.echo(f"Serving search index generation {resp.json()['generation']}")
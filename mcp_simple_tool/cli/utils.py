@@ -5,11 +5,19 @@ from __future__ import annotations
 import os
 import signal
 import time
-from typing import Optional
+from typing import Dict, Optional
 
 import requests
 from requests.exceptions import RequestException
 
+from ..server.config import Settings
+
+
+def admin_headers() -> Dict[str, str]:
+    """Authorization header for admin routes when ``MCP_ADMIN_TOKEN`` is set."""
+    token = Settings().admin_token
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
 
 def is_server_running(port: int) -> bool:
     """Return *True* if an HTTP(SSE) server listens on `port`."""
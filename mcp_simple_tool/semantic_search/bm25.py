@@ -0,0 +1,167 @@
+"""BM25 ranking over an inverted index of term frequencies."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+__all__ = ["B", "K1", "Postings", "postings_arrays"]
+
+# Okapi BM25 parameters, fixed at build time because per-term score bounds
+# depend on them
+K1 = 1.2
+B = 0.75
+
+
+def _idf(df: np.ndarray, n_docs: int) -> np.ndarray:
+    """BM25 IDF in the non-negative form used by Lucene."""
+    return np.log1p((n_docs - df + 0.5) / (df + 0.5))
+
+
+def _saturate(tf: np.ndarray, norm: np.ndarray) -> np.ndarray:
+    """Term-frequency component of BM25, given ``k1 * (1 - b + b * len / avg)``."""
+    scores: np.ndarray = tf * (K1 + 1) / (tf + norm)
+    return scores
+
+
+def postings_arrays(counts: sparse.csr_matrix) -> Dict[str, np.ndarray]:
+    """Turn a chunks × terms matrix of raw term counts into postings arrays.
+
+    Returns:
+        ``indptr``/``docs``/``tf``: the postings of term ``t`` are
+        ``docs[indptr[t]:indptr[t + 1]]`` (ascending chunk ids) with their term
+        frequencies; ``doc_len``: terms per chunk; ``max_score``: the highest
+        BM25 contribution of each term to any chunk, used to prune queries
+    """
+    csc = sparse.csc_matrix(counts, dtype=np.float32)
+    csc.sort_indices()
+    n_docs, n_terms = csc.shape
+    doc_len = np.asarray(csc.sum(axis=1), dtype=np.float32).ravel()
+    avg_len = float(doc_len.mean()) if n_docs and doc_len.any() else 1.0
+    norm = K1 * (1 - B + B * doc_len / avg_len)
+
+    df = np.diff(csc.indptr)
+    scores = _saturate(csc.data, norm[csc.indices])
+    max_tf_score = np.zeros(n_terms, dtype=np.float32)
+    nonempty = df > 0
+    max_tf_score[nonempty] = np.maximum.reduceat(scores, csc.indptr[:-1][nonempty])
+    idx_dtype = np.int32 if csc.nnz < np.iinfo(np.int32).max else np.int64
+    return {
+        "indptr": csc.indptr.astype(np.int64),
+        "docs": csc.indices.astype(idx_dtype),
+        "tf": csc.data,
+        "doc_len": doc_len,
+        "max_score": (max_tf_score * _idf(df, n_docs)).astype(np.float32),
+    }
+
+
+class Postings:
+    """Inverted index of term → (chunk ids, term frequencies) scored with BM25.
+
+    Only the postings of the query terms are read. Terms are processed from the
+    highest score bound down (MaxScore): once the bounds of the terms left
+    cannot lift a chunk that none of the earlier terms matched above the
+    current k-th best score, the remaining terms only update chunks already
+    found, and candidates that cannot reach the top k are dropped.
+    """
+
+    def __init__(
+        self,
+        indptr: np.ndarray,
+        docs: np.ndarray,
+        tf: np.ndarray,
+        doc_len: np.ndarray,
+        max_score: np.ndarray,
+    ) -> None:
+        self.indptr = indptr
+        self.docs = docs
+        self.tf = tf
+        self.doc_len = doc_len
+        self.max_score = max_score
+        avg_len = float(np.mean(doc_len)) if len(doc_len) else 0.0
+        self._avg_len = avg_len or 1.0
+
+    @classmethod
+    def from_counts(cls, counts: sparse.csr_matrix) -> Postings:
+        arrays = postings_arrays(counts)
+        return cls(**arrays)
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.doc_len)
+
+    def counts(self) -> sparse.csr_matrix:
+        """Return the chunks × terms matrix of term counts these postings hold."""
+        return sparse.csc_matrix(
+            (self.tf, self.docs, self.indptr),
+            shape=(self.n_docs, len(self.indptr) - 1),
+        ).tocsr()
+
+    def search(self, terms: Sequence[int], k: int) -> List[Tuple[int, float]]:
+        """Return the ``k`` best ``(chunk, score)`` pairs for the query ``terms``.
+
+        Args:
+            terms: Vocabulary columns of the query terms; repeats weigh a term
+                once per occurrence and out-of-vocabulary ``-1`` ids are ignored
+            k: Number of results
+        """
+        weights: Dict[int, int] = {}
+        for term in terms:
+            if 0 <= term < len(self.max_score):
+                weights[term] = weights.get(term, 0) + 1
+        query = sorted(
+            (t for t in weights if self.max_score[t] > 0),
+            key=lambda t: -float(self.max_score[t]) * weights[t],
+        )
+        if k <= 0 or not query:
+            return []
+        # Bounds were stored as float32; pad them so rounding never prunes
+        bounds = np.asarray([float(self.max_score[t]) * weights[t] for t in query])
+        bounds *= 1 + 1e-5
+        # rest[i]: the most terms i.. can still add to any chunk's score
+        rest = np.concatenate([np.cumsum(bounds[::-1])[::-1], [0.0]])
+
+        cand: np.ndarray = np.zeros(0, dtype=np.int64)
+        scores: np.ndarray = np.zeros(0, dtype=np.float64)
+        for i, term in enumerate(query):
+            lo, hi = int(self.indptr[term]), int(self.indptr[term + 1])
+            docs = np.asarray(self.docs[lo:hi])
+            idf = float(_idf(np.asarray(hi - lo), self.n_docs)) * weights[term]
+            theta = _kth_largest(scores, k)
+            if theta < rest[i]:
+                # A chunk only terms i.. match could still make the top k
+                contrib = idf * self._saturate(docs, np.asarray(self.tf[lo:hi]))
+                cand, inverse = np.unique(
+                    np.concatenate([cand, docs]), return_inverse=True
+                )
+                scores = np.bincount(inverse, weights=np.concatenate([scores, contrib]))
+                continue
+            # Only chunks already found can still make the top k
+            pos = np.searchsorted(docs, cand)
+            pos[pos == len(docs)] = 0
+            hit = np.flatnonzero(docs[pos] == cand)
+            hit_pos = pos[hit]
+            scores[hit] += idf * self._saturate(
+                docs[hit_pos], np.asarray(self.tf[lo:hi])[hit_pos]
+            )
+            alive = scores + rest[i + 1] >= _kth_largest(scores, k)
+            cand, scores = cand[alive], scores[alive]
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else None
+        idxs = np.arange(len(scores)) if top is None else top
+        idxs = idxs[np.lexsort((cand[idxs], -scores[idxs]))]
+        return [(int(cand[j]), float(scores[j])) for j in idxs]
+
+    def _saturate(self, docs: np.ndarray, tf: np.ndarray) -> np.ndarray:
+        norm = K1 * (1 - B + B * np.asarray(self.doc_len)[docs] / self._avg_len)
+        return _saturate(tf.astype(np.float64), norm)
+
+
+def _kth_largest(scores: np.ndarray, k: int) -> float:
+    """The ``k``-th largest score, or 0 while there are fewer than ``k``."""
+    if len(scores) < k:
+        return 0.0
+    return float(np.partition(scores, len(scores) - k)[len(scores) - k])
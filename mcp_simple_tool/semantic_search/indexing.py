@@ -2,33 +2,80 @@
 
 from __future__ import annotations
 
+import argparse
+import fcntl
+import hashlib
 import json
+import os
 import pathlib
-from dataclasses import dataclass
-from typing import Any, Dict, Iterator, Sequence
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 
+from .store import (
+    IndexLayout,
+    StringTable,
+    analyze,
+    is_current,
+    load_chunks,
+    load_matrix,
+    load_postings,
+    load_vocabulary,
+    read_header,
+    term_counts,
+    tfidf_rows,
+    write_file_ids,
+    write_header,
+    write_index,
+    write_matrix,
+    write_postings,
+    write_spans,
+    write_vocabulary,
+)
+from .vector_index import (
+    ANN_KINDS,
+    QUANTIZE_KINDS,
+    AnnParams,
+    read_ann_params,
+    write_vector_index,
+)
+
 # Export constants and functions
 __all__ = [
     "build_index",
+    "chunk_document",
+    "chunk_markdown",
     "chunk_text",
     "iter_files",
     "Chunk",
     "DOC_DIR",
+    "INDEX_FORMATS",
     "INDEX_PATH",
-    "META_PATH",
     "MODEL_NAME",
+    "index_layout",
+    "index_lock",
+    "main",
 ]
 
 DOC_DIR = pathlib.Path(__file__).resolve().parents[2] / "docs"
 INDEX_PATH = DOC_DIR / ".vector_index.npy"
-META_PATH = DOC_DIR / ".vector_meta.jsonl"
 CHUNK_SIZE = 400  # characters, tweak as needed
 OVERLAP = 40  # characters to preserve context
+MAX_CHUNK_CHARS = 800  # budget of a Markdown chunk, excluding its headings
+BATCH_FILES = 32  # files read and chunked per worker task in parallel builds
 
 MODEL_NAME = "tfidf-vectorizer"  # Using TF-IDF instead of transformer models
+INDEX_FORMATS = ("sparse", "dense")
+
+# Manifest entry: sha256, mtime_ns, size and the [start, end) rows of a file
+FileEntry = Dict[str, Any]
 
 
 @dataclass
@@ -39,6 +86,18 @@ class Chunk:
     start: int
     end: int
     text: str
+    # Titles of the Markdown headings the chunk sits under, outermost first
+    headings: Tuple[str, ...] = ()
+
+    @property
+    def heading(self) -> str:
+        """The heading path as stored in the index, e.g. ``"Server > Lifespan"``."""
+        return " > ".join(self.headings)
+
+    @property
+    def index_text(self) -> str:
+        """The text that is vectorised: the heading path followed by the chunk."""
+        return f"{self.heading}\n\n{self.text}" if self.headings else self.text
 
 
 def iter_files() -> Iterator[pathlib.Path]:
@@ -64,56 +123,697 @@ def chunk_text(text: str) -> Sequence[str]:
     return chunks
 
 
-def build_index() -> None:
+_HEADING_RE = re.compile(r" {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_FENCE_RE = re.compile(r" {0,3}(`{3,}|~{3,})")
+
+
+@dataclass(frozen=True)
+class _Block:
+    start: int
+    end: int
+    headings: Tuple[str, ...]
+    is_heading: bool = False
+
+
+def _markdown_blocks(text: str) -> Iterator[_Block]:
+    """Yield headings, fenced code blocks and paragraphs with their spans.
+
+    Spans exclude surrounding blank lines. Each block carries the heading path
+    it sits under; a heading's own path ends with its title.
     """
-    Build and save the vector index for all documentation files.
-    Uses scikit-learn's TfidfVectorizer and stores vectors with NumPy.
+    stack: List[Tuple[int, str]] = []
+    para_start = -1
+    para_end = 0
+    fence = ""
+    fence_start = 0
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        line_start, pos = pos, pos + len(line)
+        content = line.rstrip("\r\n")
+        line_end = line_start + len(content.rstrip())
+        path = tuple(title for _, title in stack)
+        if fence:
+            if (
+                content.strip().startswith(fence)
+                and not content.strip(fence[0]).strip()
+            ):
+                yield _Block(fence_start, line_end, path)
+                fence = ""
+            continue
+        fence_match = _FENCE_RE.match(content)
+        heading_match = _HEADING_RE.match(content)
+        if fence_match or heading_match or not content.strip():
+            if para_start >= 0:
+                yield _Block(para_start, para_end, path)
+                para_start = -1
+        if fence_match:
+            fence, fence_start = fence_match.group(1), line_start + content.index(
+                fence_match.group(1)
+            )
+        elif heading_match:
+            level = len(heading_match.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, (heading_match.group(2) or "").strip()))
+            yield _Block(
+                line_start + len(content) - len(content.lstrip()),
+                line_end,
+                tuple(title for _, title in stack),
+                is_heading=True,
+            )
+        elif content.strip():
+            if para_start < 0:
+                para_start = line_start + len(content) - len(content.lstrip())
+            para_end = line_end
+    path = tuple(title for _, title in stack)
+    if fence:
+        # Unclosed fence: runs to the end of the document
+        yield _Block(fence_start, len(text.rstrip()), path)
+    elif para_start >= 0:
+        yield _Block(para_start, para_end, path)
+
+
+def _split_block(text: str, block: _Block, max_chars: int) -> Iterator[_Block]:
+    """Cut a block longer than ``max_chars`` at line breaks, else at spaces."""
+    if block.end - block.start <= max_chars:
+        yield block
+        return
+    start = block.start
+    while block.end - start > max_chars:
+        window = text[start : start + max_chars]
+        cut = window.rfind("\n", max_chars // 2)
+        if cut < 0:
+            cut = window.rfind(" ", max_chars // 2)
+        if cut < 0:
+            cut = max_chars
+        end = start + len(window[:cut].rstrip())
+        yield _Block(start, end, block.headings)
+        start += cut
+        while start < block.end and text[start].isspace():
+            start += 1
+    if start < block.end:
+        yield _Block(start, block.end, block.headings)
+
+
+def chunk_markdown(
+    file_path: str, text: str, max_chars: int = MAX_CHUNK_CHARS
+) -> List[Chunk]:
+    """
+    Split Markdown into chunks that follow its structure.
+
+    Paragraphs, fenced code blocks and headings are packed greedily into chunks
+    of at most ``max_chars`` characters. A new chunk starts at every heading,
+    so a chunk never spans two sections, and a heading always stays with the
+    text that follows it. Only blocks longer than the budget on their own are
+    split, at line breaks where possible.
+
+    Returns:
+        Chunks with their ``[start, end)`` character span in ``text`` and the
+        heading path they sit under
+    """
+    chunks: List[Chunk] = []
+    current: List[_Block] = []
+
+    def flush() -> None:
+        if current:
+            body = [b for b in current if not b.is_heading] or current
+            start, end = current[0].start, current[-1].end
+            chunks.append(
+                Chunk(file_path, start, end, text[start:end], body[0].headings)
+            )
+            current.clear()
+
+    for block in _markdown_blocks(text):
+        for piece in _split_block(text, block, max_chars):
+            has_body = any(not b.is_heading for b in current)
+            if has_body and (
+                piece.is_heading or piece.end - current[0].start > max_chars
+            ):
+                flush()
+            current.append(piece)
+    flush()
+    return chunks
+
+
+def _chunk_windows(file_path: str, text: str) -> List[Chunk]:
+    """Fixed-size overlapping windows, as :func:`chunk_text`, with their spans."""
+    step = CHUNK_SIZE - OVERLAP
+    return [
+        Chunk(file_path, i, min(i + CHUNK_SIZE, len(text)), text[i : i + CHUNK_SIZE])
+        for i in range(0, len(text), step)
+    ]
+
+
+def chunk_document(file_path: str, text: str) -> List[Chunk]:
+    """Chunk a document: Markdown by structure, other formats by fixed windows."""
+    if pathlib.PurePath(file_path).suffix.lower() == ".md":
+        return chunk_markdown(file_path, text)
+    return _chunk_windows(file_path, text)
+
+
+def index_layout() -> IndexLayout:
+    """Return the on-disk layout of the index stored in ``DOC_DIR``."""
+    return IndexLayout(DOC_DIR)
+
+
+def _read_doc(path: pathlib.Path) -> Tuple[str, str]:
+    """Return the decoded text of ``path`` and the SHA-256 of its bytes."""
+    raw = path.read_bytes()
+    return raw.decode("utf-8", errors="ignore"), hashlib.sha256(raw).hexdigest()
+
+
+def _file_entry(path: pathlib.Path, sha256: str, rows: Tuple[int, int]) -> FileEntry:
+    st = path.stat()
+    return {
+        "sha256": sha256,
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "rows": [rows[0], rows[1]],
+    }
+
+
+def _read_manifest(layout: IndexLayout) -> Dict[str, FileEntry]:
+    if not layout.manifest.exists():
+        return {}
+    files: Dict[str, FileEntry] = json.loads(
+        layout.manifest.read_text(encoding="utf-8")
+    )["files"]
+    return files
+
+
+def _write_manifest(layout: IndexLayout, files: Dict[str, FileEntry]) -> None:
+    tmp = layout.manifest.with_name(layout.manifest.name + ".tmp")
+    tmp.write_text(json.dumps({"files": files}, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, layout.manifest)
+
+
+@contextmanager
+def index_lock(layout: IndexLayout, shared: bool = False) -> Iterator[None]:
+    """Hold the index file lock: exclusive for builds, shared for loads.
+
+    Serialises builds (e.g. several uvicorn workers starting at once) and keeps
+    readers from opening a half-written set of files. In a read-only docs
+    directory nobody can be writing, so no lock is taken.
     """
-    # Use scikit-learn's TfidfVectorizer
-    vectorizer = TfidfVectorizer(lowercase=True, ngram_range=(1, 2))
+    try:
+        f = layout.lock.open("a")
+    except OSError:
+        yield
+        return
+    with f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _full_build(layout: IndexLayout, index_format: str) -> bool:
+    # Use scikit-learn's TfidfVectorizer with the shared query-side analyzer
+    vectorizer = TfidfVectorizer(analyzer=analyze)
 
-    metas: list[Dict[str, Any]] = []
-    chunks: list[str] = []
-    file_paths: list[str] = []
+    chunks: list[Chunk] = []
+    manifest: Dict[str, FileEntry] = {}
 
     for file in iter_files():
-        content = file.read_text(encoding="utf-8", errors="ignore")
+        content, sha256 = _read_doc(file)
         file_path = str(file.relative_to(DOC_DIR))
 
-        for i, chunk in enumerate(chunk_text(content)):
-            chunks.append(chunk)
-            file_paths.append(file_path)
-            metas.append({"file": file_path, "text": chunk})
+        start = len(chunks)
+        chunks.extend(chunk_document(file_path, content))
+        manifest[file_path] = _file_entry(file, sha256, (start, len(chunks)))
 
     # Fit and transform the chunks to create document vectors
     if not chunks:
         print("No documents found to index!")
-        return
+        return False
+
+    texts = [c.index_text for c in chunks]
+    matrix = vectorizer.fit_transform(texts)
+    vocabulary = vectorizer.vocabulary_
+
+    write_index(
+        layout,
+        matrix,
+        index_format,
+        vectorizer.vocabulary_,
+        vectorizer.idf_,
+        [c.file_path for c in chunks],
+        [c.text for c in chunks],
+        _spans(chunks),
+        [c.heading for c in chunks],
+        term_counts(texts, lambda t: vocabulary.get(t, -1), matrix.shape[1]),
+    )
+    _write_manifest(layout, manifest)
+    return True
+
+
+def _spans(chunks: Sequence[Chunk]) -> np.ndarray:
+    return np.asarray([(c.start, c.end) for c in chunks], dtype=np.int64).reshape(-1, 2)
+
+
+@dataclass
+class _ChunkedBatch:
+    """Chunks of a batch of files, with term counts over a batch-local vocabulary."""
+
+    # (relative path, sha256, number of chunks) of every file, in order
+    files: List[Tuple[str, str, int]]
+    excerpts: List[str]
+    headings: List[str]
+    spans: np.ndarray
+    terms: List[str]
+    # CSR rows of term counts, one per chunk; indices refer to ``terms``
+    indptr: np.ndarray
+    indices: np.ndarray
+    counts: np.ndarray
 
-    matrix = vectorizer.fit_transform(chunks)
-    matrix_dense: np.ndarray = matrix.toarray().astype("float32")
-
-    # Normalize vectors for cosine similarity
-    norms = np.linalg.norm(matrix_dense, axis=1, keepdims=True)
-    # Avoid division by zero
-    norms[norms == 0] = 1
-    normalized_matrix = matrix_dense / norms
-
-    # Save matrix to file
-    np.save(str(INDEX_PATH), normalized_matrix)
-
-    # Save vocabulary and idf values as JSON
-    vocab_path = DOC_DIR / ".tfidf_vocab.json"
-    with vocab_path.open("w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "vocabulary": vectorizer.vocabulary_,
-                "idf": vectorizer.idf_.tolist(),
-            },
-            f,
-            ensure_ascii=False,
+
+def _chunk_batch(paths: Sequence[Tuple[str, str]]) -> _ChunkedBatch:
+    """Read, chunk and count the terms of ``(absolute, relative)`` file paths.
+
+    Runs in a worker process; only numbers and the strings to be written out
+    are sent back.
+    """
+    files: List[Tuple[str, str, int]] = []
+    chunks: List[Chunk] = []
+    for path, file_path in paths:
+        content, sha256 = _read_doc(pathlib.Path(path))
+        doc = chunk_document(file_path, content)
+        files.append((file_path, sha256, len(doc)))
+        chunks.extend(doc)
+
+    local: Dict[str, int] = {}
+    indptr = [0]
+    indices: List[int] = []
+    counts: List[int] = []
+    for chunk in chunks:
+        for term, count in Counter(analyze(chunk.index_text)).items():
+            indices.append(local.setdefault(term, len(local)))
+            counts.append(count)
+        indptr.append(len(indices))
+    return _ChunkedBatch(
+        files,
+        [c.text for c in chunks],
+        [c.heading for c in chunks],
+        _spans(chunks),
+        list(local),
+        np.asarray(indptr, dtype=np.int64),
+        np.asarray(indices, dtype=np.int32),
+        np.asarray(counts, dtype=np.int32),
+    )
+
+
+def _parallel_build(layout: IndexLayout, index_format: str, workers: int) -> bool:
+    """Full build that reads, chunks and counts terms in ``workers`` processes.
+
+    Batches of files are handed to a process pool. As batches come back, in
+    order, their excerpts and headings are appended to the on-disk tables and
+    their term counts are remapped onto a vocabulary merged across batches;
+    only numeric arrays stay in memory. TF-IDF weights are computed once every
+    batch is in and match what :class:`TfidfVectorizer` (smooth IDF, L2 norm)
+    would produce for the same chunks. With ``workers=1`` the batches are
+    processed in this process.
+    """
+    paths = [(str(p), str(p.relative_to(DOC_DIR))) for p in iter_files()]
+    if not paths:
+        print("No documents found to index!")
+        return False
+    batches = [paths[i : i + BATCH_FILES] for i in range(0, len(paths), BATCH_FILES)]
+
+    # Term -> provisional column, in order of first appearance
+    vocabulary: Dict[str, int] = {}
+    manifest: Dict[str, FileEntry] = {}
+    file_chunks: List[Tuple[str, int]] = []
+    spans: List[np.ndarray] = []
+    indptrs: List[np.ndarray] = [np.zeros(1, dtype=np.int64)]
+    indices: List[np.ndarray] = []
+    counts: List[np.ndarray] = []
+    n_rows = nnz = 0
+
+    layout.header.unlink(missing_ok=True)
+    with ExitStack() as stack:
+        add_excerpts = stack.enter_context(
+            StringTable.appender(*layout.table("excerpts"))
+        )
+        add_headings = stack.enter_context(
+            StringTable.appender(*layout.table("headings"))
+        )
+        if workers > 1:
+            pool = stack.enter_context(ProcessPoolExecutor(workers))
+            results: Iterator[_ChunkedBatch] = pool.map(_chunk_batch, batches)
+        else:
+            results = map(_chunk_batch, batches)
+
+        for batch in results:
+            add_excerpts(batch.excerpts)
+            add_headings(batch.headings)
+            spans.append(batch.spans)
+            remap = np.asarray(
+                [vocabulary.setdefault(t, len(vocabulary)) for t in batch.terms],
+                dtype=np.int32,
+            )
+            indices.append(remap[batch.indices])
+            counts.append(batch.counts)
+            indptrs.append(batch.indptr[1:] + nnz)
+            nnz += len(batch.indices)
+            for file_path, sha256, n in batch.files:
+                manifest[file_path] = _file_entry(
+                    DOC_DIR / file_path, sha256, (n_rows, n_rows + n)
+                )
+                file_chunks.append((file_path, n))
+                n_rows += n
+
+    if not n_rows:
+        print("No documents found to index!")
+        return False
+
+    # TfidfVectorizer numbers its columns in sorted term order
+    terms = sorted(vocabulary)
+    column = np.empty(len(terms), dtype=np.int32)
+    column[[vocabulary[t] for t in terms]] = np.arange(len(terms), dtype=np.int32)
+    cols = column[np.concatenate(indices)]
+    indptr = np.concatenate(indptrs)
+
+    # Smooth IDF, then L2-normalise every row of counts × IDF
+    df = np.bincount(cols, minlength=len(terms))
+    idf = np.log((1 + n_rows) / (1 + df)) + 1
+    raw = np.concatenate(counts)
+    write_postings(
+        layout, sparse.csr_matrix((raw, cols, indptr), shape=(n_rows, len(terms)))
+    )
+    data = raw * idf[cols]
+    row_of = np.repeat(np.arange(n_rows), np.diff(indptr))
+    data /= np.sqrt(np.bincount(row_of, weights=data * data, minlength=n_rows))[row_of]
+    matrix = sparse.csr_matrix((data, cols, indptr), shape=(n_rows, len(terms)))
+
+    files = sorted(f for f, n in file_chunks if n)
+    file_index = {f: i for i, f in enumerate(files)}
+    write_file_ids(
+        layout,
+        files,
+        np.repeat(
+            np.asarray([file_index.get(f, -1) for f, _ in file_chunks], np.int32),
+            [n for _, n in file_chunks],
+        ),
+    )
+    write_spans(layout, np.concatenate(spans))
+    write_matrix(layout, matrix, index_format)
+    write_vocabulary(layout, {t: i for i, t in enumerate(terms)}, idf)
+    write_header(layout, index_format, matrix.shape)
+    _write_manifest(layout, manifest)
+    return True
+
+
+def _incremental_build(
+    layout: IndexLayout,
+    header: Dict[str, Any],
+    old_manifest: Dict[str, FileEntry],
+) -> bool:
+    """Re-chunk only added or modified files and splice their rows in.
+
+    IDF weights of existing terms are frozen at the last full build; terms first
+    seen in changed files get an IDF computed against the current chunk count.
+    Run a full build to refresh all weights.
+    """
+    manifest: Dict[str, FileEntry] = {}
+    changed: Dict[str, Tuple[pathlib.Path, str, str]] = {}
+    seen: set[str] = set()
+    touched = False
+
+    for file in iter_files():
+        file_path = str(file.relative_to(DOC_DIR))
+        seen.add(file_path)
+        old = old_manifest.get(file_path)
+        st = file.stat()
+        if old and (old["mtime_ns"], old["size"]) == (st.st_mtime_ns, st.st_size):
+            continue
+        content, sha256 = _read_doc(file)
+        if old and old["sha256"] == sha256:
+            # Touched but identical: refresh the stat fields only
+            old_manifest[file_path] = {**old, "mtime_ns": st.st_mtime_ns}
+            touched = True
+            continue
+        changed[file_path] = (file, content, sha256)
+
+    removed = set(old_manifest) - seen
+    if not changed and not removed:
+        if touched:
+            _write_manifest(layout, old_manifest)
+        print("Index is up to date.")
+        return False
+
+    # Rows of untouched files, in their current order
+    keep: list[Tuple[int, int]] = []
+    n_kept = 0
+    for file_path, entry in old_manifest.items():
+        if file_path in changed or file_path in removed:
+            continue
+        start, end = entry["rows"]
+        keep.append((start, end))
+        manifest[file_path] = {**entry, "rows": [n_kept, n_kept + end - start]}
+        n_kept += end - start
+
+    new_chunks: list[Chunk] = []
+    for file_path, (file, content, sha256) in sorted(changed.items()):
+        start = n_kept + len(new_chunks)
+        new_chunks.extend(chunk_document(file_path, content))
+        manifest[file_path] = _file_entry(
+            file, sha256, (start, n_kept + len(new_chunks))
         )
 
-    with META_PATH.open("w", encoding="utf-8") as f:
-        for m in metas:
-            f.write(json.dumps(m, ensure_ascii=False) + "\n")
+    vocab = load_vocabulary(layout)
+    n_old_features = vocab.n_features
+    new_terms: Dict[str, int] = {}
+    new_df: Counter[str] = Counter()
+    new_texts = [c.index_text for c in new_chunks]
+    for text in new_texts:
+        for term in dict.fromkeys(analyze(text)):
+            if vocab.lookup(term) < 0:
+                new_terms.setdefault(term, n_old_features + len(new_terms))
+                new_df[term] += 1
+
+    # Smooth IDF, as computed by TfidfVectorizer
+    n_docs = n_kept + len(new_chunks)
+    idf = np.concatenate(
+        [
+            np.asarray(vocab.idf, dtype=np.float32),
+            np.asarray(
+                [np.log((1 + n_docs) / (1 + new_df[t])) + 1 for t in new_terms],
+                dtype=np.float32,
+            ),
+        ]
+    )
+
+    def lookup(term: str) -> int:
+        col = vocab.lookup(term)
+        return col if col >= 0 else new_terms.get(term, -1)
+
+    n_features = len(idf)
+    old_matrix = load_matrix(layout, header)
+    rows = np.concatenate(
+        [np.arange(s, e) for s, e in keep] or [np.zeros(0, dtype=np.int64)]
+    )
+    kept = sparse.csr_matrix(old_matrix[rows], dtype=np.float32)
+    kept.resize((len(rows), n_features))
+    matrix = sparse.vstack([kept, tfidf_rows(new_texts, lookup, idf)], format="csr")
+
+    # The header is the commit marker: without it a crash below leaves no
+    # index rather than an old header over a mix of old and new files
+    layout.header.unlink(missing_ok=True)
+    write_matrix(layout, matrix, header["format"])
+    kept_counts = load_postings(layout).counts()[rows]
+    kept_counts.resize((len(rows), n_features))
+    write_postings(
+        layout,
+        sparse.vstack(
+            [kept_counts, term_counts(new_texts, lookup, n_features)], format="csr"
+        ),
+    )
+    if new_terms:
+        vocabulary = {t: int(i) for t, i in zip(vocab.terms, vocab.ids)}
+        vocabulary.update(new_terms)
+        write_vocabulary(layout, vocabulary, idf)
+
+    # Remap file ids through the (small) files table instead of per row
+    chunks = load_chunks(layout)
+    files = sorted(manifest)
+    file_index = {f: i for i, f in enumerate(files)}
+    remap = np.asarray([file_index.get(f, -1) for f in chunks.files], np.int32)
+    file_ids = np.concatenate(
+        [
+            remap[np.asarray(chunks.file_ids)[rows]],
+            np.asarray([file_index[c.file_path] for c in new_chunks], np.int32),
+        ]
+    )
+    write_file_ids(layout, files, file_ids)
+    write_spans(layout, np.concatenate([chunks.spans[rows], _spans(new_chunks)]))
+    chunks.excerpts.splice(
+        keep, [c.text for c in new_chunks], *layout.table("excerpts")
+    )
+    chunks.headings.splice(
+        keep, [c.heading for c in new_chunks], *layout.table("headings")
+    )
+
+    write_header(layout, header["format"], matrix.shape)
+    _write_manifest(layout, manifest)
+    print(
+        f"Re-indexed {len(changed)} changed and dropped {len(removed)} removed "
+        f"file(s); kept {n_kept} of {header['n_rows']} rows."
+    )
+    return True
+
+
+def _refresh_vector_index(
+    layout: IndexLayout, ann: Optional[AnnParams], changed: bool
+) -> None:
+    """Retrain the nearest-neighbour index after its matrix or parameters changed."""
+    params, _ = read_ann_params(layout)
+    if ann is None and (not params.needs_matrix or not changed):
+        return
+    params = ann or params
+    header = read_header(layout)
+    if not params.needs_matrix:
+        write_vector_index(layout, params)
+    elif header.get("format") != "dense":
+        print("Skipped the vector index: --ann and --quantize need --format dense")
+    else:
+        matrix = load_matrix(layout, header)
+        assert isinstance(matrix, np.ndarray)
+        write_vector_index(layout, params, matrix)
+
+
+def build_index(
+    index_format: Optional[str] = None,
+    full: bool = False,
+    workers: Optional[int] = None,
+    ann: Optional[AnnParams] = None,
+) -> bool:
+    """
+    Build and save the vector index for all documentation files.
+    Uses scikit-learn's TfidfVectorizer and stores vectors with NumPy.
+
+    Unless ``full`` is set, an existing index is updated incrementally: a
+    manifest of per-file mtimes and SHA-256 hashes identifies added, modified
+    and removed files, and only their chunks are re-vectorised. An index
+    written in an older on-disk format is always rebuilt in full.
+
+    Markdown files are chunked by :func:`chunk_markdown`, other formats into
+    fixed windows; every chunk's character span and heading path are stored
+    alongside its excerpt.
+
+    By default a full build fits a :class:`TfidfVectorizer` in this process.
+    With ``workers`` set, it runs :func:`_parallel_build` instead, which reads
+    and chunks files in a pool of that many processes (``0``: one per CPU)
+    and streams the results to disk.
+
+    Args:
+        index_format: ``"sparse"`` (CSR arrays) or ``"dense"`` (a single
+            chunks × vocabulary float32 matrix); by default the format of the
+            existing index, or sparse
+        full: Rebuild from scratch even if an up-to-date manifest exists
+        workers: Worker processes for a full build, or ``None`` to build with
+            scikit-learn in this process
+        ann: Nearest-neighbour index to keep over a dense matrix from now
+            on; by default the one configured last (exact search unless set)
+            is retrained whenever the matrix changes
+
+    Returns:
+        True if any index file was rewritten
+    """
+    if index_format is not None and index_format not in INDEX_FORMATS:
+        raise ValueError(f"Unknown index format: {index_format!r}")
+
+    layout = index_layout()
+    with index_lock(layout):
+        header = read_header(layout)
+        manifest = _read_manifest(layout)
+        index_format = index_format or header.get("format", "sparse")
+        if (
+            full
+            or not manifest
+            or not is_current(header)
+            or header.get("format") != index_format
+        ):
+            if workers is None:
+                changed = _full_build(layout, index_format)
+            else:
+                changed = _parallel_build(
+                    layout, index_format, workers or os.cpu_count() or 1
+                )
+        else:
+            changed = _incremental_build(layout, header, manifest)
+        if read_header(layout):
+            _refresh_vector_index(layout, ann, changed)
+        return changed
+
+
+def _at_least_one(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point of the ``build-doc-index`` console script."""
+    parser = argparse.ArgumentParser(
+        description="Build or update the documentation search index."
+    )
+    parser.add_argument(
+        "--format",
+        choices=INDEX_FORMATS,
+        help="Matrix layout (default: that of the existing index, else sparse)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild from scratch instead of re-indexing changed files only",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help=(
+            "Read, chunk and vectorise a full build in N processes "
+            "(0 = one per CPU); default: single-process scikit-learn build"
+        ),
+    )
+    parser.add_argument(
+        "--ann",
+        choices=ANN_KINDS,
+        help="Nearest-neighbour index over a dense matrix (kept for later builds)",
+    )
+    parser.add_argument("--nlist", type=int, help="IVF clusters (0 = about 4·√chunks)")
+    parser.add_argument(
+        "--nprobe",
+        type=int,
+        help="IVF clusters scanned per query: more is slower with better recall",
+    )
+    parser.add_argument(
+        "--quantize",
+        choices=QUANTIZE_KINDS,
+        help=(
+            "Score candidates on a float16 or int8 copy of a dense matrix; saves "
+            "memory, but float16 scores several times slower than float32"
+        ),
+    )
+    parser.add_argument(
+        "--rerank",
+        type=_at_least_one,
+        metavar="N",
+        help="Re-rank the best k×N quantized candidates with float32 vectors",
+    )
+    args = parser.parse_args(argv)
+    ann = None
+    overrides = {
+        "kind": args.ann,
+        "nlist": args.nlist,
+        "nprobe": args.nprobe,
+        "quantize": args.quantize,
+        "rerank": args.rerank,
+    }
+    if any(value is not None for value in overrides.values()):
+        stored, _ = read_ann_params(index_layout())
+        ann = replace(stored, **{k: v for k, v in overrides.items() if v is not None})
+    build_index(index_format=args.format, full=args.full, workers=args.workers, ann=ann)
+    return 0
@@ -2,45 +2,162 @@
 
 from __future__ import annotations
 
-import json
-from functools import lru_cache
-from typing import Any, Dict, List, Tuple
+import threading
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    get_args,
+)
 
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy import sparse
 
-from .indexing import INDEX_PATH, META_PATH, build_index
+from ..server.config import SearchBackend
+from .bm25 import Postings
+from .indexing import build_index, index_layout, index_lock
+from .store import (
+    ChunkTable,
+    IndexMatrix,
+    Vocabulary,
+    analyze,
+    is_current,
+    load_chunks,
+    load_matrix,
+    load_postings,
+    load_vocabulary,
+    read_header,
+)
+from .vector_index import VectorIndex, open_vector_index, top_k
 
+BACKENDS: Tuple[SearchBackend, ...] = get_args(SearchBackend)
 
-@lru_cache(maxsize=1)
-def _load_assets() -> Tuple[TfidfVectorizer, np.ndarray, List[Dict[str, Any]]]:
+
+@dataclass(frozen=True)
+class IndexGeneration:
+    """One immutable, loaded version of the search index."""
+
+    number: int
+    vectorizer: Vocabulary
+    matrix: IndexMatrix
+    meta: ChunkTable
+    postings: Optional[Postings] = None
+    # Nearest-neighbour index over a dense matrix
+    vectors: Optional[VectorIndex] = None
+
+    @property
+    def matrix_bytes(self) -> int:
+        """Size of the document vectors (memory-mapped, so mostly on disk)."""
+        matrix = self.matrix
+        if isinstance(matrix, np.ndarray):
+            return int(matrix.nbytes)
+        return int(matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes)
+
+
+_generation: Optional[IndexGeneration] = None
+_reload_lock = threading.Lock()
+_listeners: List[Callable[[IndexGeneration], None]] = []
+
+
+def on_generation_change(callback: Callable[[IndexGeneration], None]) -> None:
+    """Call ``callback`` with every newly loaded generation, e.g. to drop caches."""
+    _listeners.append(callback)
+
+
+def _swap(generation: IndexGeneration) -> IndexGeneration:
+    global _generation
+    _generation = generation
+    for callback in _listeners:
+        callback(generation)
+    return generation
+
+
+def _open_generation(number: int) -> IndexGeneration:
+    layout = index_layout()
+    # A shared lock keeps a concurrent build from swapping files mid-load
+    with index_lock(layout, shared=True):
+        header = read_header(layout)
+        matrix = load_matrix(layout, header)
+        return IndexGeneration(
+            number,
+            load_vocabulary(layout),
+            matrix,
+            load_chunks(layout),
+            load_postings(layout),
+            (
+                open_vector_index(layout, matrix)
+                if isinstance(matrix, np.ndarray)
+                else None
+            ),
+        )
+
+
+def current_generation() -> IndexGeneration:
     """
-    Load or build search assets on first call.
+    Return the index generation new queries should use, loading it on first call.
 
-    Returns:
-        A tuple of (vectorizer, matrix, metadata)
+    Everything is memory-mapped, so loading only reads the index header up
+    front and its cost does not grow with the size of the corpus.
     """
-    # Build lazily if index missing
-    if not INDEX_PATH.exists():
-        build_index()
+    generation = _generation
+    if generation is None:
+        with _reload_lock:
+            generation = _generation
+            if generation is None:
+                # Build lazily if the index is missing or in an older format
+                header = read_header(index_layout())
+                if not is_current(header):
+                    build_index()
+                generation = _swap(_open_generation(1))
+    return generation
 
-    # Load the TF-IDF vocabulary and IDF values
-    vocab_path = INDEX_PATH.parent / ".tfidf_vocab.json"
-    with vocab_path.open("r", encoding="utf-8") as f:
-        tfidf_data = json.load(f)
 
-    # Recreate the vectorizer
-    vectorizer = TfidfVectorizer(lowercase=True, ngram_range=(1, 2))
-    vectorizer.vocabulary_ = tfidf_data["vocabulary"]
-    vectorizer.idf_ = np.array(tfidf_data["idf"])
+def loaded_generation() -> int:
+    """Return the number of the generation being served, or 0 if none is loaded."""
+    generation = _generation
+    return generation.number if generation else 0
 
-    # Load normalized document vectors
-    matrix = np.load(str(INDEX_PATH))
 
-    meta: List[Dict[str, Any]] = [
-        json.loads(line) for line in META_PATH.read_text().splitlines()
-    ]
-    return vectorizer, matrix, meta
+def reload_index(rebuild: bool = True) -> int:
+    """
+    Bring the index up to date and atomically swap in the new generation.
+
+    Meant to run off the event loop. Queries that already hold the previous
+    generation finish on it (its memory-mapped files stay valid after being
+    replaced on disk); queries started after the swap see the new one.
+
+    Args:
+        rebuild: Run an incremental build first; otherwise just reopen the files
+
+    Returns:
+        The number of the generation now being served
+    """
+    with _reload_lock:
+        generation = _generation
+        changed = build_index() if rebuild else True
+        if changed or generation is None:
+            number = generation.number + 1 if generation else 1
+            generation = _swap(_open_generation(number))
+        return generation.number
+
+
+def _load_assets() -> Tuple[Vocabulary, Union[IndexMatrix, VectorIndex], ChunkTable]:
+    """
+    Return the assets of the current index generation.
+
+    Returns:
+        A tuple of (vectorizer, matrix, metadata); for a dense index the
+        matrix comes wrapped in its nearest-neighbour index
+    """
+    generation = current_generation()
+    matrix = generation.vectors or generation.matrix
+    return generation.vectorizer, matrix, generation.meta
 
 
 def _cosine_similarity_search(
@@ -66,41 +183,134 @@ def _cosine_similarity_search(
     sims = matrix @ vec
 
     # Get top k results
-    k = min(k, len(sims))
-    idxs = np.argsort(-sims)[:k]
-    return [(int(i), float(sims[i])) for i in idxs]
+    return top_k(sims, k)
+
+
+def _sparse_cosine_similarity_search(
+    matrix: sparse.csr_matrix, vec: sparse.csr_matrix, k: int
+) -> List[Tuple[int, float]]:
+    """
+    Sparse counterpart of :func:`_cosine_similarity_search`.
 
+    Args:
+        matrix: CSR matrix of L2-normalised document vectors
+        vec: 1 × vocabulary CSR query vector
+        k: Number of neighbors to return
 
-def semantic_search(query: str, k: int = 3) -> List[Dict[str, Any]]:
+    Returns:
+        List of (index, score) tuples sorted by descending score
+    """
+    vec_norm = np.sqrt(vec.multiply(vec).sum())
+    if vec_norm > 0:
+        vec = vec / vec_norm
+
+    # Sparse × sparse product: only chunks sharing a term with the query are
+    # touched; the result is a single chunks-long column.
+    sims = np.asarray((matrix @ vec.T).toarray(), dtype=np.float32).ravel()
+    return top_k(sims, k)
+
+
+def _bm25_search(query: str, k: int) -> List[Dict[str, Any]]:
+    generation = current_generation()
+    assert generation.postings is not None
+    terms = [generation.vectorizer.lookup(t) for t in analyze(query)]
+    return _format_results(generation.meta, generation.postings.search(terms, k))
+
+
+def semantic_search(
+    query: str, k: int = 3, backend: SearchBackend = "tfidf"
+) -> List[Dict[str, Any]]:
     """
     Search for documents semantically similar to the query.
 
     Args:
         query: Search query text
         k: Number of top matches to return
+        backend: ``"tfidf"`` scores every chunk by cosine similarity;
+            ``"bm25"`` scores only the chunks in the query terms' postings
 
     Returns:
-        List of dicts with 'file', 'score', and 'excerpt' keys
+        List of dicts with 'file', 'score', and 'excerpt' keys, plus the
+        excerpt's 'start'/'end' character offsets in the file and its
+        'heading' path when the index records them
     """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown search backend: {backend!r}")
+    if backend == "bm25":
+        return _bm25_search(query, k)
     vectorizer, matrix, meta = _load_assets()
 
     # Transform the query using the fitted vectorizer
     q_vec_sparse = vectorizer.transform([query])
-    q_vec: np.ndarray = q_vec_sparse.toarray()[0].astype("float32")
 
     # Find similar documents using cosine similarity
-    results = _cosine_similarity_search(matrix, q_vec, k)
+    if isinstance(matrix, VectorIndex):
+        results = matrix.search(q_vec_sparse.toarray()[0].astype("float32"), k)
+    elif sparse.issparse(matrix):
+        results = _sparse_cosine_similarity_search(
+            matrix, sparse.csr_matrix(q_vec_sparse, dtype=np.float32), k
+        )
+    else:
+        q_vec: np.ndarray = q_vec_sparse.toarray()[0].astype("float32")
+        results = _cosine_similarity_search(matrix, q_vec, k)
+
+    return _format_results(meta, results)
+
+
+def semantic_search_many(
+    queries: Sequence[str], k: int = 3, backend: SearchBackend = "tfidf"
+) -> List[List[Dict[str, Any]]]:
+    """
+    Run several queries against the same index generation in one pass.
+
+    The query vectors are stacked and scored with a single matrix–matrix
+    product instead of one matrix–vector product per query. BM25 queries are
+    answered one by one from the postings.
+
+    Args:
+        queries: Search query texts
+        k: Number of top matches to return per query
+        backend: As for :func:`semantic_search`
+
+    Returns:
+        One list of result dicts (as from :func:`semantic_search`) per query
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown search backend: {backend!r}")
+    if backend == "bm25":
+        return [_bm25_search(query, k) for query in queries]
+    vectorizer, matrix, meta = _load_assets()
+    q_matrix = sparse.csr_matrix(vectorizer.transform(list(queries)), dtype=np.float32)
+
+    if isinstance(matrix, VectorIndex):
+        return [
+            _format_results(meta, results)
+            for results in matrix.search_many(q_matrix.toarray(), k)
+        ]
+
+    # chunks × queries similarity matrix
+    if sparse.issparse(matrix):
+        sims = (matrix @ q_matrix.T).toarray()
+    else:
+        sims = np.asarray(matrix @ q_matrix.toarray().T)
+
+    return [
+        _format_results(meta, top_k(np.asarray(sims[:, j], dtype=np.float32), k))
+        for j in range(len(queries))
+    ]
+
 
+def _format_results(
+    meta: Sequence[Dict[str, Any]], results: List[Tuple[int, float]]
+) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
     for idx, score in results:
         if idx < len(meta):  # Make sure index is valid
             m = meta[idx]
-            out.append(
-                {
-                    "file": m["file"],
-                    "score": score,
-                    "excerpt": m["text"],
-                }
-            )
+            result = {"file": m["file"], "score": score, "excerpt": m["text"]}
+            for key in ("start", "end", "heading"):
+                if key in m:
+                    result[key] = m[key]
+            out.append(result)
 
     return out
@@ -0,0 +1,604 @@
+"""On-disk layout of the search index, designed for zero-copy loading.
+
+Every array is a plain ``.npy`` file opened with ``mmap_mode="r"`` and every
+string column (excerpts, file names, vocabulary terms) is a single UTF-8 blob
+plus an ``int64`` offsets table. Opening an index therefore only reads a small
+JSON header; pages are faulted in on demand and shared between worker
+processes through the OS page cache.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import pathlib
+import re
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+import numpy as np
+from scipy import sparse
+
+from .bm25 import Postings, postings_arrays
+
+__all__ = [
+    "ChunkTable",
+    "IndexLayout",
+    "StringTable",
+    "Vocabulary",
+    "analyze",
+    "is_current",
+    "load_arrays",
+    "load_chunks",
+    "load_matrix",
+    "load_postings",
+    "load_vocabulary",
+    "read_header",
+    "term_counts",
+    "tfidf_rows",
+    "tokenize",
+    "write_arrays",
+    "write_chunks",
+    "write_file_ids",
+    "write_header",
+    "write_index",
+    "write_matrix",
+    "write_postings",
+    "write_spans",
+    "write_vocabulary",
+]
+
+IndexMatrix = Union[np.ndarray, sparse.csr_matrix]
+
+FORMAT_VERSION = 3
+# Same tokenisation as TfidfVectorizer's default word analyzer
+_TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+_NGRAM_RANGE = (1, 2)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split ``text`` into lower-cased word tokens."""
+    tokens: List[str] = _TOKEN_RE.findall(text.lower())
+    return tokens
+
+
+def analyze(text: str) -> List[str]:
+    """Split ``text`` into lower-cased unigrams and bigrams.
+
+    Used both when fitting the vectorizer and when encoding queries, so the two
+    sides can never disagree on tokenisation.
+    """
+    tokens = tokenize(text)
+    min_n, max_n = _NGRAM_RANGE
+    terms: List[str] = []
+    for n in range(min_n, max_n + 1):
+        terms.extend(" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+    return terms
+
+
+@dataclass(frozen=True)
+class IndexLayout:
+    """File names of one index inside ``root``."""
+
+    root: pathlib.Path
+
+    @property
+    def header(self) -> pathlib.Path:
+        return self.root / ".vector_header.json"
+
+    @property
+    def manifest(self) -> pathlib.Path:
+        return self.root / ".vector_manifest.json"
+
+    @property
+    def lock(self) -> pathlib.Path:
+        return self.root / ".vector_build.lock"
+
+    @property
+    def dense(self) -> pathlib.Path:
+        return self.root / ".vector_index.npy"
+
+    @property
+    def ann(self) -> pathlib.Path:
+        """Parameters of the nearest-neighbour index over the dense vectors."""
+        return self.root / ".vector_ann.json"
+
+    def sparse(self, name: str) -> pathlib.Path:
+        """Path of the CSR component ``name`` (data, indices or indptr)."""
+        return self.root / f".vector_index.{name}.npy"
+
+    def table(self, name: str) -> tuple[pathlib.Path, pathlib.Path]:
+        """Blob and offsets paths of the string table ``name``."""
+        return (
+            self.root / f".vector_{name}.bin",
+            self.root / f".vector_{name}.offsets.npy",
+        )
+
+    def array(self, name: str) -> pathlib.Path:
+        return self.root / f".vector_{name}.npy"
+
+
+def _open_array(path: pathlib.Path) -> np.ndarray:
+    array: np.ndarray = np.load(str(path), mmap_mode="r")
+    return array
+
+
+@contextmanager
+def _replacing(path: pathlib.Path) -> Iterator[pathlib.Path]:
+    """Yield a temporary sibling of ``path`` and rename it over ``path`` on exit.
+
+    Readers that still map the old file keep a valid view of it, so an index can
+    be rewritten while it is being queried.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        yield tmp
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, path)
+
+
+def _save_array(path: pathlib.Path, array: np.ndarray) -> None:
+    with _replacing(path) as tmp, tmp.open("wb") as f:
+        np.save(f, array)
+
+
+class StringTable(Sequence[str]):
+    """Read-only sequence of strings backed by a blob and an offsets array."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self._blob = blob
+        self._offsets = offsets
+
+    @classmethod
+    def open(cls, blob_path: pathlib.Path, offsets_path: pathlib.Path) -> StringTable:
+        # np.memmap refuses zero-length files
+        blob: np.ndarray
+        if blob_path.stat().st_size:
+            blob = np.memmap(str(blob_path), dtype=np.uint8, mode="r")
+        else:
+            blob = np.zeros(0, dtype=np.uint8)
+        return cls(blob, _open_array(offsets_path))
+
+    @staticmethod
+    def write(
+        strings: Iterable[str], blob_path: pathlib.Path, offsets_path: pathlib.Path
+    ) -> None:
+        with StringTable.appender(blob_path, offsets_path) as append:
+            append(strings)
+
+    @staticmethod
+    @contextmanager
+    def appender(
+        blob_path: pathlib.Path, offsets_path: pathlib.Path
+    ) -> Iterator[Callable[[Iterable[str]], None]]:
+        """Yield a function that appends strings to a table written on exit.
+
+        Strings go straight to the blob file, so a table can be built from a
+        stream without holding its rows in memory; only the offsets are kept.
+        """
+        offsets = [0]
+        with _replacing(blob_path) as tmp, tmp.open("wb") as f:
+
+            def append(strings: Iterable[str]) -> None:
+                for s in strings:
+                    offsets.append(offsets[-1] + f.write(s.encode("utf-8")))
+
+            yield append
+        _save_array(offsets_path, np.asarray(offsets, dtype=np.int64))
+
+    def splice(
+        self,
+        keep: Sequence[Tuple[int, int]],
+        extra: Iterable[str],
+        blob_path: pathlib.Path,
+        offsets_path: pathlib.Path,
+    ) -> None:
+        """Write the rows in the ``keep`` ranges followed by ``extra`` strings.
+
+        Kept ranges are copied as raw bytes, so the cost of an incremental
+        rewrite does not include decoding the unchanged rows.
+        """
+        parts = [np.zeros(1, dtype=np.int64)]
+        size = 0
+        with _replacing(blob_path) as tmp, tmp.open("wb") as f:
+            for start, end in keep:
+                lo, hi = int(self._offsets[start]), int(self._offsets[end])
+                f.write(self._blob[lo:hi].tobytes())
+                parts.append(self._offsets[start + 1 : end + 1] - lo + size)
+                size += hi - lo
+            extra_offsets = []
+            for s in extra:
+                size += f.write(s.encode("utf-8"))
+                extra_offsets.append(size)
+        parts.append(np.asarray(extra_offsets, dtype=np.int64))
+        _save_array(offsets_path, np.concatenate(parts).astype(np.int64))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, i: int) -> str: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[str]: ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+
+class Vocabulary:
+    """Sorted term table with IDF weights that encodes text like TfidfVectorizer.
+
+    Term lookup is a binary search over the memory-mapped sorted terms, so no
+    ``dict`` of the whole vocabulary is ever built.
+    """
+
+    def __init__(self, terms: StringTable, ids: np.ndarray, idf: np.ndarray) -> None:
+        self.terms = terms
+        self.ids = ids
+        self.idf = idf
+
+    @property
+    def n_features(self) -> int:
+        return len(self.idf)
+
+    def lookup(self, term: str) -> int:
+        """Return the column of ``term`` or ``-1`` if it is out of vocabulary."""
+        pos = bisect.bisect_left(self.terms, term)
+        if pos < len(self.terms) and self.terms[pos] == term:
+            return int(self.ids[pos])
+        return -1
+
+    def transform(self, texts: Sequence[str]) -> sparse.csr_matrix:
+        """Return L2-normalised TF-IDF rows for ``texts``."""
+        return tfidf_rows(texts, self.lookup, self.idf)
+
+
+def tfidf_rows(
+    texts: Sequence[str], lookup: Callable[[str], int], idf: np.ndarray
+) -> sparse.csr_matrix:
+    """Encode ``texts`` as L2-normalised TF-IDF rows, like TfidfVectorizer.
+
+    Args:
+        texts: Documents or queries to encode
+        lookup: Maps a term to its column, or ``-1`` if it is out of vocabulary
+        idf: IDF weight of every column
+    """
+    data: List[float] = []
+    indices: List[int] = []
+    indptr = [0]
+    for text in texts:
+        row: Dict[int, float] = {}
+        for term, count in Counter(analyze(text)).items():
+            col = lookup(term)
+            if col >= 0:
+                row[col] = count * float(idf[col])
+        norm = np.sqrt(sum(v * v for v in row.values())) or 1.0
+        for col in sorted(row):
+            indices.append(col)
+            data.append(row[col] / norm)
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (
+            np.asarray(data, dtype=np.float32),
+            np.asarray(indices, dtype=np.int32),
+            np.asarray(indptr, dtype=np.int32),
+        ),
+        shape=(len(texts), len(idf)),
+    )
+
+
+def term_counts(
+    texts: Sequence[str], lookup: Callable[[str], int], n_features: int
+) -> sparse.csr_matrix:
+    """Count the in-vocabulary terms of every text, one row per text."""
+    data: List[int] = []
+    indices: List[int] = []
+    indptr = [0]
+    for text in texts:
+        row = {}
+        for term, count in Counter(analyze(text)).items():
+            col = lookup(term)
+            if col >= 0:
+                row[col] = count
+        for col in sorted(row):
+            indices.append(col)
+            data.append(row[col])
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (
+            np.asarray(data, dtype=np.float32),
+            np.asarray(indices, dtype=np.int32),
+            np.asarray(indptr, dtype=np.int64),
+        ),
+        shape=(len(texts), n_features),
+    )
+
+
+class ChunkTable(Sequence[Dict[str, Any]]):
+    """Per-chunk metadata decoded lazily from the string tables.
+
+    Besides its file and excerpt, every chunk has the ``[start, end)``
+    character span it was cut from and the path of Markdown headings it sits
+    under (``"Server > Lifespan"``, empty outside Markdown).
+    """
+
+    def __init__(
+        self,
+        files: StringTable,
+        file_ids: np.ndarray,
+        excerpts: StringTable,
+        spans: np.ndarray,
+        headings: StringTable,
+    ) -> None:
+        self._files = files
+        self._file_ids = file_ids
+        self._excerpts = excerpts
+        self._spans = spans
+        self._headings = headings
+
+    @property
+    def files(self) -> StringTable:
+        return self._files
+
+    @property
+    def file_ids(self) -> np.ndarray:
+        return self._file_ids
+
+    @property
+    def excerpts(self) -> StringTable:
+        return self._excerpts
+
+    @property
+    def spans(self) -> np.ndarray:
+        return self._spans
+
+    @property
+    def headings(self) -> StringTable:
+        return self._headings
+
+    def file(self, i: int) -> str:
+        """Return the file that chunk ``i`` was cut from."""
+        return self._files[int(self._file_ids[i])]
+
+    def __len__(self) -> int:
+        return len(self._excerpts)
+
+    @overload
+    def __getitem__(self, i: int) -> Dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[Dict[str, Any]]: ...
+
+    def __getitem__(
+        self, i: Union[int, slice]
+    ) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        start, end = self._spans[i]
+        return {
+            "file": self.file(i),
+            "text": self._excerpts[i],
+            "start": int(start),
+            "end": int(end),
+            "heading": self._headings[i],
+        }
+
+
+def read_header(layout: IndexLayout) -> Dict[str, Any]:
+    """Return the index header, or an empty dict if no index exists."""
+    if not layout.header.exists():
+        return {}
+    header: Dict[str, Any] = json.loads(layout.header.read_text(encoding="utf-8"))
+    return header
+
+
+def is_current(header: Dict[str, Any]) -> bool:
+    """Whether ``header`` describes an index in this version's on-disk format."""
+    return header.get("version") == FORMAT_VERSION
+
+
+def write_matrix(
+    layout: IndexLayout, matrix: sparse.csr_matrix, index_format: str
+) -> None:
+    """Persist the document vectors in ``index_format`` (sparse or dense)."""
+    csr = sparse.csr_matrix(matrix, dtype=np.float32)
+    if index_format == "dense":
+        matrix_dense: np.ndarray = csr.toarray()
+
+        # Normalize vectors for cosine similarity
+        norms = np.linalg.norm(matrix_dense, axis=1, keepdims=True)
+        # Avoid division by zero
+        norms[norms == 0] = 1
+        _save_array(layout.dense, matrix_dense / norms)
+        for name in ("data", "indices", "indptr"):
+            layout.sparse(name).unlink(missing_ok=True)
+        return
+
+    # Rows are already L2-normalised by the vectorizer; keep them sparse.
+    # indices and indptr share one dtype so scipy wraps the memory-mapped
+    # arrays without casting (and thereby copying) them on load.
+    csr.sort_indices()
+    idx_dtype = np.int32 if csr.nnz < np.iinfo(np.int32).max else np.int64
+    _save_array(layout.sparse("data"), csr.data)
+    _save_array(layout.sparse("indices"), csr.indices.astype(idx_dtype))
+    _save_array(layout.sparse("indptr"), csr.indptr.astype(idx_dtype))
+    layout.dense.unlink(missing_ok=True)
+
+
+def write_vocabulary(
+    layout: IndexLayout, vocabulary: Dict[str, int], idf: np.ndarray
+) -> None:
+    """Persist the sorted term table, its column ids and the IDF weights."""
+    terms = sorted(vocabulary)
+    StringTable.write(terms, *layout.table("vocab"))
+    _save_array(
+        layout.array("vocab_ids"),
+        np.asarray([vocabulary[t] for t in terms], dtype=np.int32),
+    )
+    _save_array(layout.array("idf"), np.asarray(idf, dtype=np.float32))
+
+
+def write_chunks(
+    layout: IndexLayout,
+    chunk_files: Sequence[str],
+    excerpts: Sequence[str],
+    spans: Optional[np.ndarray] = None,
+    headings: Optional[Sequence[str]] = None,
+) -> None:
+    """Persist the file name, excerpt, character span and headings of every chunk.
+
+    Without ``spans`` or ``headings`` every chunk gets ``(0, 0)`` and ``""``.
+    """
+    files = sorted(set(chunk_files))
+    file_index = {f: i for i, f in enumerate(files)}
+    write_file_ids(
+        layout, files, np.asarray([file_index[f] for f in chunk_files], np.int32)
+    )
+    StringTable.write(excerpts, *layout.table("excerpts"))
+    if spans is None:
+        spans = np.zeros((len(excerpts), 2), dtype=np.int64)
+    write_spans(layout, spans)
+    StringTable.write(headings or [""] * len(excerpts), *layout.table("headings"))
+
+
+def write_spans(layout: IndexLayout, spans: np.ndarray) -> None:
+    """Persist the ``[start, end)`` character span of every chunk."""
+    _save_array(layout.array("spans"), np.asarray(spans, dtype=np.int64).reshape(-1, 2))
+
+
+def write_arrays(
+    layout: IndexLayout, prefix: str, arrays: Dict[str, np.ndarray]
+) -> None:
+    """Persist a group of named arrays as ``.vector_{prefix}_{name}.npy``."""
+    for name, array in arrays.items():
+        _save_array(layout.array(f"{prefix}_{name}"), array)
+
+
+def load_arrays(
+    layout: IndexLayout, prefix: str, names: Sequence[str]
+) -> List[np.ndarray]:
+    """Memory-map arrays written by :func:`write_arrays`, in ``names`` order."""
+    return [_open_array(layout.array(f"{prefix}_{name}")) for name in names]
+
+
+def write_postings(layout: IndexLayout, counts: sparse.csr_matrix) -> None:
+    """Persist the BM25 inverted index of a chunks × terms count matrix."""
+    write_arrays(layout, "postings", postings_arrays(counts))
+
+
+def write_file_ids(
+    layout: IndexLayout, files: Sequence[str], file_ids: np.ndarray
+) -> None:
+    """Persist the ``files`` table and each chunk's position in it."""
+    StringTable.write(files, *layout.table("files"))
+    _save_array(layout.array("file_ids"), np.asarray(file_ids, dtype=np.int32))
+
+
+def write_header(
+    layout: IndexLayout, index_format: str, shape: Tuple[int, int]
+) -> None:
+    """Write the header, which marks the other index files as complete."""
+    header = {
+        "version": FORMAT_VERSION,
+        "format": index_format,
+        "n_rows": int(shape[0]),
+        "n_features": int(shape[1]),
+    }
+    with _replacing(layout.header) as tmp:
+        tmp.write_text(json.dumps(header), encoding="utf-8")
+
+
+def write_index(
+    layout: IndexLayout,
+    matrix: sparse.csr_matrix,
+    index_format: str,
+    vocabulary: Dict[str, int],
+    idf: np.ndarray,
+    chunk_files: Sequence[str],
+    excerpts: Sequence[str],
+    spans: Optional[np.ndarray] = None,
+    headings: Optional[Sequence[str]] = None,
+    counts: Optional[sparse.csr_matrix] = None,
+) -> None:
+    """Persist a fitted index; the header is written last as a commit marker.
+
+    ``counts`` are the raw term counts behind ``matrix``, for BM25; without
+    them the excerpts are counted again.
+    """
+    layout.header.unlink(missing_ok=True)
+    write_matrix(layout, matrix, index_format)
+    write_vocabulary(layout, vocabulary, idf)
+    if counts is None:
+        counts = term_counts(excerpts, lambda t: vocabulary.get(t, -1), matrix.shape[1])
+    write_postings(layout, counts)
+    write_chunks(layout, chunk_files, excerpts, spans, headings)
+    write_header(layout, index_format, matrix.shape)
+
+
+def load_matrix(layout: IndexLayout, header: Dict[str, Any]) -> IndexMatrix:
+    """Memory-map the document vectors described by ``header``."""
+    if header["format"] == "dense":
+        return _open_array(layout.dense)
+    return sparse.csr_matrix(
+        (
+            _open_array(layout.sparse("data")),
+            _open_array(layout.sparse("indices")),
+            _open_array(layout.sparse("indptr")),
+        ),
+        shape=(header["n_rows"], header["n_features"]),
+        copy=False,
+    )
+
+
+def load_vocabulary(layout: IndexLayout) -> Vocabulary:
+    """Memory-map the sorted vocabulary and IDF weights."""
+    return Vocabulary(
+        StringTable.open(*layout.table("vocab")),
+        _open_array(layout.array("vocab_ids")),
+        _open_array(layout.array("idf")),
+    )
+
+
+def load_postings(layout: IndexLayout) -> Postings:
+    """Memory-map the BM25 inverted index."""
+    return Postings(
+        *load_arrays(
+            layout, "postings", ("indptr", "docs", "tf", "doc_len", "max_score")
+        )
+    )
+
+
+def load_chunks(layout: IndexLayout) -> ChunkTable:
+    """Memory-map the per-chunk file ids, excerpts, spans and headings."""
+    return ChunkTable(
+        StringTable.open(*layout.table("files")),
+        _open_array(layout.array("file_ids")),
+        StringTable.open(*layout.table("excerpts")),
+        _open_array(layout.array("spans")),
+        StringTable.open(*layout.table("headings")),
+    )
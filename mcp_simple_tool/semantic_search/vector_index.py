@@ -0,0 +1,471 @@
+"""Nearest-neighbour search over the dense index vectors.
+
+:class:`ExactIndex` scores every row and is the default. :class:`IVFIndex` is
+an inverted-file index in plain NumPy: rows are clustered around ``nlist``
+centroids (spherical k-means) and a query only scans the rows of its
+``nprobe`` closest clusters. :class:`FaissIVFIndex` does the same with faiss
+(``pip install 'mcp-simple-tool[ann]'``). Either NumPy index can score a
+compact :class:`QuantizedVectors` copy of the rows (float16, or int8 with a
+scale per row) and re-rank the best candidates against the float32 rows. The
+chosen kind and its parameters are kept in ``.vector_ann.json`` next to
+``.vector_index.npy`` and reused by every later build.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import logging
+import math
+import os
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .store import IndexLayout, load_arrays, write_arrays
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "ANN_KINDS",
+    "AnnParams",
+    "ExactIndex",
+    "FaissIVFIndex",
+    "IVFIndex",
+    "QUANTIZE_KINDS",
+    "QuantizedVectors",
+    "VectorIndex",
+    "open_vector_index",
+    "read_ann_params",
+    "top_k",
+    "write_vector_index",
+]
+
+ANN_KINDS = ("exact", "ivf", "faiss")
+QUANTIZE_KINDS = ("none", "float16", "int8")
+
+_ASSIGN_BLOCK = 16_384  # rows scored against the centroids at a time
+_TRAIN_PER_LIST = 64  # k-means training sample rows per list
+_SCAN_BYTES = 1 << 18  # quantized rows widened to float32 at a time
+
+
+def top_k(sims: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """Return the ``k`` best ``(index, score)`` pairs of ``sims``.
+
+    An O(n) ``argpartition`` selects the candidates and only those ``k`` are
+    sorted, instead of sorting every chunk score.
+    """
+    k = min(k, len(sims))
+    if k <= 0:
+        return []
+    if k < len(sims):
+        candidates = np.argpartition(-sims, k - 1)[:k]
+    else:
+        candidates = np.arange(len(sims))
+    idxs = candidates[np.argsort(-sims[candidates], kind="stable")]
+    return [(int(i), float(sims[i])) for i in idxs]
+
+
+def _normalized(vec: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+
+@dataclass(frozen=True)
+class AnnParams:
+    """Kind and tuning knobs of the nearest-neighbour index."""
+
+    kind: str = "exact"
+    # Number of clusters; 0 picks about 4·√rows
+    nlist: int = 0
+    # Clusters scanned per query: higher means better recall and slower queries
+    nprobe: int = 8
+    # Storage the candidates are scored on: "none" (float32), float16 or int8
+    quantize: str = "none"
+    # Quantized candidates re-ranked exactly, as a multiple of k
+    rerank: int = 4
+
+    def __post_init__(self) -> None:
+        if self.rerank < 1:
+            raise ValueError(f"rerank must be at least 1, got {self.rerank}")
+
+    @property
+    def needs_matrix(self) -> bool:
+        """Whether building this index reads the matrix (anything but a plain scan)."""
+        return self.kind != "exact" or self.quantize != "none"
+
+    def lists_for(self, n_rows: int) -> int:
+        nlist = self.nlist or round(4 * math.sqrt(n_rows))
+        return max(1, min(nlist, n_rows))
+
+
+class QuantizedVectors:
+    """Compact copy of the matrix rows scored in place of the float32 rows.
+
+    Row ``i`` is approximately ``codes[i] * scales[i]``: float16 codes with unit
+    scales, or int8 codes with ``scales[i] = max|row i| / 127``. Scores are
+    computed a block of rows at a time, widening each block to float32 in a
+    small buffer that stays in cache instead of converting the whole array.
+    """
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray) -> None:
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def encode(cls, matrix: np.ndarray, dtype: str) -> QuantizedVectors:
+        """Quantize the rows of ``matrix`` to ``dtype`` (``float16`` or ``int8``)."""
+        if dtype not in QUANTIZE_KINDS[1:]:
+            raise ValueError(f"Unknown quantization: {dtype!r}")
+        codes = np.empty(matrix.shape, dtype=np.dtype(dtype))
+        scales = np.ones(len(matrix), dtype=np.float32)
+        step = max(1, _SCAN_BYTES // max(1, matrix.shape[1]))
+        for start in range(0, len(matrix), step):
+            block = np.asarray(matrix[start : start + step], dtype=np.float32)
+            if dtype == "float16":
+                codes[start : start + step] = block
+                continue
+            scale = np.abs(block).max(axis=1, initial=0.0) / 127
+            scales[start : start + step] = scale
+            scale[scale == 0] = 1
+            codes[start : start + step] = np.rint(block / scale[:, None])
+        return cls(codes, scales)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"codes": self.codes, "scales": self.scales}
+
+    def scores(
+        self, queries: np.ndarray, rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Approximate dot products of the rows (or ``rows`` only) with ``queries``.
+
+        Args:
+            queries: One query vector, or a dim × queries matrix
+            rows: Row ids to score instead of every row
+        """
+        codes = self.codes if rows is None else self.codes[rows]
+        scales = self.scales if rows is None else self.scales[rows]
+        out = np.empty((len(codes),) + queries.shape[1:], dtype=np.float32)
+        step = max(1, _SCAN_BYTES // max(1, codes.shape[1] * codes.itemsize))
+        buf = np.empty((min(step, len(codes)), codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(codes), step):
+            block = buf[: len(codes[start : start + step])]
+            block[...] = codes[start : start + step]
+            out[start : start + step] = block @ queries
+        out *= scales.reshape((-1,) + (1,) * (out.ndim - 1))
+        return out
+
+
+def _rerank(
+    matrix: np.ndarray,
+    query: np.ndarray,
+    approx: np.ndarray,
+    rows: Optional[np.ndarray],
+    k: int,
+    rerank: int,
+) -> List[Tuple[int, float]]:
+    """Score the best ``k * rerank`` of ``approx`` against the float32 rows.
+
+    ``approx[i]`` belongs to row ``rows[i]`` (row ``i`` if ``rows`` is None).
+    """
+    cand = np.asarray([i for i, _ in top_k(approx, k * rerank)], dtype=np.int64)
+    if rows is not None:
+        cand = rows[cand]
+    # Only these rows of the (memory-mapped) float32 matrix are read
+    order = np.argsort(cand)
+    exact = np.empty(len(cand), dtype=np.float32)
+    exact[order] = np.asarray(matrix[cand[order]] @ query)
+    return [(int(cand[i]), score) for i, score in top_k(exact, k)]
+
+
+class VectorIndex(ABC):
+    """Cosine-similarity top-k over L2-normalised rows."""
+
+    @abstractmethod
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Return the ``k`` best ``(row, score)`` pairs for one query vector."""
+
+    def search_many(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """Run :meth:`search` for every row of ``queries``."""
+        return [self.search(query, k) for query in queries]
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force scan of every row, or of their quantized copy.
+
+    With ``quantized`` set, the best ``k * rerank`` rows by approximate score
+    are re-scored against ``matrix`` and the top ``k`` of those returned.
+    """
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        quantized: Optional[QuantizedVectors] = None,
+        rerank: int = 4,
+    ) -> None:
+        self.matrix = matrix
+        self.quantized = quantized
+        self.rerank = rerank
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        query = _normalized(query)
+        if self.quantized is None:
+            return top_k(self.matrix @ query, k)
+        approx = self.quantized.scores(query.astype(np.float32))
+        return _rerank(self.matrix, query, approx, None, k, self.rerank)
+
+    def search_many(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        # One matrix–matrix product instead of a product per query
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        queries = queries / norms
+        if self.quantized is None:
+            sims = np.asarray(self.matrix @ queries.T)
+            return [top_k(sims[:, j], k) for j in range(len(queries))]
+        approx = self.quantized.scores(queries.T.astype(np.float32))
+        return [
+            _rerank(self.matrix, query, approx[:, j], None, k, self.rerank)
+            for j, query in enumerate(queries)
+        ]
+
+
+def _assign(rows: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the closest (highest dot product) centroid of every row."""
+    return np.concatenate(
+        [
+            np.argmax(rows[i : i + _ASSIGN_BLOCK] @ centroids.T, axis=1)
+            for i in range(0, len(rows), _ASSIGN_BLOCK)
+        ]
+        or [np.zeros(0, dtype=np.int64)]
+    )
+
+
+def _spherical_kmeans(
+    sample: np.ndarray, nlist: int, n_iter: int, rng: np.random.Generator
+) -> np.ndarray:
+    centroids: np.ndarray = sample[rng.choice(len(sample), nlist, replace=False)]
+    for _ in range(n_iter):
+        assign = _assign(sample, centroids)
+        members = sparse.csr_matrix(
+            (np.ones(len(sample), dtype=np.float32), (assign, np.arange(len(sample)))),
+            shape=(nlist, len(sample)),
+        )
+        sums = np.asarray(members @ sample)
+        empty = np.flatnonzero(np.bincount(assign, minlength=nlist) == 0)
+        # Restart empty clusters from random rows
+        sums[empty] = sample[rng.choice(len(sample), len(empty))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class IVFIndex(VectorIndex):
+    """Inverted-file index: scan only the rows of the closest clusters.
+
+    ``order`` lists the rows grouped by cluster and cluster ``c`` owns
+    ``order[list_ptr[c]:list_ptr[c + 1]]``.
+    """
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        centroids: np.ndarray,
+        order: np.ndarray,
+        list_ptr: np.ndarray,
+        nprobe: int,
+        quantized: Optional[QuantizedVectors] = None,
+        rerank: int = 4,
+    ) -> None:
+        self.matrix = matrix
+        self.centroids = centroids
+        self.order = order
+        self.list_ptr = list_ptr
+        self.nprobe = nprobe
+        self.quantized = quantized
+        self.rerank = rerank
+
+    @classmethod
+    def train(
+        cls,
+        matrix: np.ndarray,
+        nlist: int,
+        nprobe: int,
+        n_iter: int = 10,
+        seed: int = 0,
+    ) -> IVFIndex:
+        """Cluster a sample of ``matrix`` and file every row under a centroid."""
+        rng = np.random.default_rng(seed)
+        n_sample = min(len(matrix), nlist * _TRAIN_PER_LIST)
+        sample = np.asarray(
+            matrix[np.sort(rng.choice(len(matrix), n_sample, replace=False))],
+            dtype=np.float32,
+        )
+        centroids = _spherical_kmeans(sample, nlist, n_iter, rng)
+        assign = _assign(matrix, centroids)
+        idx_dtype = np.int32 if len(matrix) < np.iinfo(np.int32).max else np.int64
+        order = np.argsort(assign, kind="stable").astype(idx_dtype)
+        list_ptr = np.concatenate(
+            [[0], np.cumsum(np.bincount(assign, minlength=nlist))]
+        ).astype(np.int64)
+        return cls(matrix, centroids, order, list_ptr, nprobe)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "centroids": self.centroids,
+            "order": self.order,
+            "list_ptr": self.list_ptr,
+        }
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        query = _normalized(query)
+        probe = [c for c, _ in top_k(self.centroids @ query, self.nprobe)]
+        rows = np.sort(
+            np.concatenate(
+                [self.order[self.list_ptr[c] : self.list_ptr[c + 1]] for c in probe]
+            )
+        )
+        if self.quantized is not None:
+            approx = self.quantized.scores(query.astype(np.float32), rows)
+            return _rerank(self.matrix, query, approx, rows, k, self.rerank)
+        sims = np.asarray(self.matrix[rows] @ query)
+        return [(int(rows[i]), score) for i, score in top_k(sims, k)]
+
+
+class FaissIVFIndex(VectorIndex):
+    """:class:`IVFIndex` counterpart built on faiss's ``IndexIVFFlat``."""
+
+    def __init__(self, index: Any, nprobe: int) -> None:
+        self.index = index
+        self.index.nprobe = nprobe
+
+    @classmethod
+    def train(cls, matrix: np.ndarray, nlist: int, nprobe: int) -> FaissIVFIndex:
+        import faiss
+
+        vectors = np.ascontiguousarray(matrix, dtype=np.float32)
+        quantizer = faiss.IndexFlatIP(vectors.shape[1])
+        index = faiss.IndexIVFFlat(
+            quantizer, vectors.shape[1], nlist, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(vectors)
+        index.add(vectors)
+        return cls(index, nprobe)
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        return self.search_many(query[None, :], k)[0]
+
+    def search_many(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        scores, ids = self.index.search(
+            np.ascontiguousarray(queries / norms, dtype=np.float32), k
+        )
+        # faiss pads with -1 when fewer than k rows were scanned
+        return [
+            [(int(i), float(s)) for i, s in zip(row_ids, row_scores) if i >= 0]
+            for row_ids, row_scores in zip(ids, scores)
+        ]
+
+
+def _fingerprint(layout: IndexLayout) -> Dict[str, int]:
+    """Identifies the dense matrix an ANN index was trained on."""
+    stat = layout.dense.stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _faiss_path(layout: IndexLayout) -> str:
+    return str(layout.root / ".vector_ann.faiss")
+
+
+def read_ann_params(layout: IndexLayout) -> Tuple[AnnParams, Optional[Dict[str, int]]]:
+    """Return the configured parameters and the fingerprint they were built for."""
+    if not layout.ann.exists():
+        return AnnParams(), None
+    stored = json.loads(layout.ann.read_text(encoding="utf-8"))
+    trained_on = stored.pop("trained_on", None)
+    return AnnParams(**stored), trained_on
+
+
+def write_vector_index(
+    layout: IndexLayout, params: AnnParams, matrix: Optional[np.ndarray] = None
+) -> None:
+    """Train the index described by ``params`` over ``matrix`` and persist it.
+
+    The parameters file is written last, recording which matrix the index
+    belongs to; an index whose matrix has since changed is not used. When only
+    ``nprobe`` or ``rerank`` differs from an index that is still current, the
+    trained index is kept and just the parameters are rewritten.
+    """
+    if params.kind not in ANN_KINDS:
+        raise ValueError(f"Unknown ANN index kind: {params.kind!r}")
+    if params.quantize not in QUANTIZE_KINDS:
+        raise ValueError(f"Unknown quantization: {params.quantize!r}")
+    if params.kind == "faiss" and params.quantize != "none":
+        raise ValueError("The faiss index does not support --quantize")
+    stored, trained_on = read_ann_params(layout)
+    if not params.needs_matrix:
+        trained_on = None
+    elif replace(
+        stored, nprobe=params.nprobe, rerank=params.rerank
+    ) != params or trained_on != _fingerprint(layout):
+        if matrix is None:
+            raise ValueError(f"Building a {params.kind} index needs the matrix")
+        nlist = params.lists_for(len(matrix))
+        if params.kind == "faiss":
+            if importlib.util.find_spec("faiss") is None:
+                raise RuntimeError("The 'faiss' index needs the faiss-cpu package")
+            import faiss
+
+            index = FaissIVFIndex.train(matrix, nlist, params.nprobe)
+            faiss.write_index(index.index, _faiss_path(layout))
+        elif params.kind == "ivf":
+            ivf = IVFIndex.train(matrix, nlist, params.nprobe)
+            write_arrays(layout, "ivf", ivf.arrays())
+        if params.quantize != "none":
+            quantized = QuantizedVectors.encode(matrix, params.quantize)
+            write_arrays(layout, "quant", quantized.arrays())
+        trained_on = _fingerprint(layout)
+
+    tmp = layout.ann.with_name(layout.ann.name + ".tmp")
+    tmp.write_text(json.dumps({**asdict(params), "trained_on": trained_on}))
+    os.replace(tmp, layout.ann)
+
+
+def open_vector_index(layout: IndexLayout, matrix: np.ndarray) -> VectorIndex:
+    """Open the configured index over ``matrix``, or an exact one.
+
+    Falls back to a plain :class:`ExactIndex` (with a warning) when the index
+    or quantized copy was built from a different matrix, or its backend is
+    not installed.
+    """
+    params, trained_on = read_ann_params(layout)
+    if not params.needs_matrix:
+        return ExactIndex(matrix)
+    if trained_on != _fingerprint(layout):
+        logger.warning(
+            "%s index is out of date; using exact search until the next build",
+            params.kind if params.quantize == "none" else params.quantize,
+        )
+        return ExactIndex(matrix)
+    if params.kind == "faiss":
+        if importlib.util.find_spec("faiss") is None:
+            logger.warning("faiss is not installed; using exact search")
+            return ExactIndex(matrix)
+        import faiss
+
+        return FaissIVFIndex(faiss.read_index(_faiss_path(layout)), params.nprobe)
+    quantized = None
+    if params.quantize != "none":
+        quantized = QuantizedVectors(*load_arrays(layout, "quant", ("codes", "scales")))
+    if params.kind == "exact":
+        return ExactIndex(matrix, quantized, params.rerank)
+    centroids, order, list_ptr = load_arrays(
+        layout, "ivf", ("centroids", "order", "list_ptr")
+    )
+    return IVFIndex(
+        matrix, centroids, order, list_ptr, params.nprobe, quantized, params.rerank
+    )
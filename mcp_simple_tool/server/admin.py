@@ -0,0 +1,54 @@
+"""Admin endpoints: runtime statistics and access control for admin routes."""
+
+from __future__ import annotations
+
+import functools
+import hmac
+import ipaddress
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+StatsProvider = Callable[[], Dict[str, Any]]
+Endpoint = Callable[[Request], Awaitable[Response]]
+
+_providers: Dict[str, StatsProvider] = {}
+
+
+def register_stats(name: str, provider: StatsProvider) -> None:
+    """Publish ``provider()`` under ``name`` in ``GET /admin/stats``."""
+    _providers[name] = provider
+
+
+async def stats_endpoint(request: Request) -> JSONResponse:
+    """``GET /admin/stats`` – counters of every registered component."""
+    return JSONResponse({name: provider() for name, provider in _providers.items()})
+
+
+def _is_loopback(host: Optional[str]) -> bool:
+    try:
+        return host is not None and ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def admin_only(endpoint: Endpoint, token: Optional[str]) -> Endpoint:
+    """Serve ``endpoint`` only to administrators.
+
+    With ``token`` set (``MCP_ADMIN_TOKEN``) a request must send
+    ``Authorization: Bearer <token>``; without one only loopback clients are
+    served. Behind a reverse proxy every client looks local, so set a token.
+    """
+
+    @functools.wraps(endpoint)
+    async def guarded(request: Request) -> Response:
+        if token:
+            sent = request.headers.get("authorization", "")
+            if not hmac.compare_digest(sent.encode(), f"Bearer {token}".encode()):
+                return JSONResponse({"error": "unauthorized"}, status_code=401)
+        elif not _is_loopback(request.client.host if request.client else None):
+            return JSONResponse({"error": "forbidden"}, status_code=403)
+        return await endpoint(request)
+
+    return guarded
@@ -2,8 +2,75 @@
 
 from __future__ import annotations
 
-from .handlers import mcp
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import anyio
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.routing import Route
+
+from .admin import admin_only, stats_endpoint
+from .doc_cache import watch_docs
+from .doc_reader import DOC_ROOT
+from .handlers import (
+    doc_cache,
+    loop_monitor,
+    mcp,
+    profiler,
+    search_pool,
+    settings,
+)
+from .http import shared_client
+from .metrics import SessionGauge, metrics_endpoint, monitor_loop_lag
+from .profiling import profiles_endpoint
+from .reindex import reindex_endpoint, watch_index
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    """Run background services for as long as the server is up."""
+    async with shared_client(settings), anyio.create_task_group() as tg:
+        if settings.index_watch_interval > 0:
+            tg.start_soon(watch_index, settings.index_watch_interval)
+        if settings.doc_cache_watch:
+            tg.start_soon(watch_docs, doc_cache, DOC_ROOT)
+        if settings.metrics_lag_interval > 0:
+            tg.start_soon(monitor_loop_lag, settings.metrics_lag_interval)
+        if settings.loop_monitor:
+            tg.start_soon(loop_monitor.run)
+        yield
+        tg.cancel_scope.cancel()
+    search_pool.shutdown()
+
 
 # The FastMCP's sse_app() method provides the complete ASGI app for SSE.
 # It internally handles the SseServerTransport, routes, and server run logic.
-starlette_app = mcp.sse_app()
+# Its routes are reused here so the app can also carry a lifespan, admin routes
+# and /metrics.
+_sse_app = mcp.sse_app()
+
+starlette_app = Starlette(
+    debug=_sse_app.debug,
+    routes=[
+        Route(
+            "/admin/reindex",
+            admin_only(reindex_endpoint, settings.admin_token),
+            methods=["POST"],
+        ),
+        Route(
+            "/admin/stats",
+            admin_only(stats_endpoint, settings.admin_token),
+            methods=["GET"],
+        ),
+        Route(
+            "/admin/profiles",
+            admin_only(profiles_endpoint(profiler), settings.admin_token),
+            methods=["GET"],
+        ),
+        Route("/metrics", metrics_endpoint, methods=["GET"]),
+        *_sse_app.routes,
+    ],
+    middleware=[*_sse_app.user_middleware, Middleware(SessionGauge, path="/sse")],
+    lifespan=lifespan,
+)
@@ -0,0 +1,210 @@
+"""Concurrent fetching of many URLs with global and per-host limits."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import anyio
+import httpx
+
+from .http import Page
+
+__all__ = ["BatchFetcher", "FetchOutcome", "TokenBucket"]
+
+FetchFn = Callable[[str], Awaitable[Page]]
+
+
+class TokenBucket:
+    """Allow ``rate`` acquisitions per second on average, bursting to ``burst``.
+
+    A ``rate`` of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.burst
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        if self.rate <= 0:
+            return
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass(frozen=True)
+class FetchOutcome:
+    """Result of one URL in a batch: a page or an error message."""
+
+    url: str
+    page: Optional[Page] = None
+    error: Optional[str] = None
+
+
+class _Host:
+    def __init__(self, concurrency: int, rate: float, burst: int) -> None:
+        self.slots = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate, burst)
+        self.users = 0
+
+
+class BatchFetcher:
+    """Fetch URLs concurrently under shared limits.
+
+    At most ``concurrency`` fetches run at once across every batch, at most
+    ``host_concurrency`` of them against the same host, and each host gets a
+    token bucket of ``host_rate`` requests per second (bursting to
+    ``host_burst``). The limits are shared by all callers, so parallel batches
+    cannot together overload one upstream.
+
+    Each URL must finish within ``timeout`` seconds of being submitted, time
+    spent waiting for the limits included; one that does not is cancelled and
+    reported as timed out.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        host_concurrency: int,
+        host_rate: float = 0.0,
+        host_burst: int = 1,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.host_concurrency = host_concurrency
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots = asyncio.Semaphore(concurrency)
+        self._hosts: Dict[str, _Host] = {}
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    def _host(self, url: str) -> Tuple[str, _Host]:
+        parsed = httpx.URL(url)
+        if parsed.scheme not in ("http", "https") or not parsed.host:
+            raise httpx.InvalidURL("expected an absolute http(s) URL")
+        key = parsed.netloc.decode("ascii").lower()
+        host = self._hosts.get(key)
+        if host is None:
+            host = _Host(self.host_concurrency, self.host_rate, self.host_burst)
+            self._hosts[key] = host
+        return key, host
+
+    def _release(self, key: str, host: _Host) -> None:
+        host.users -= 1
+        # Idle hosts with a full bucket carry no state worth keeping
+        if host.users == 0 and host.bucket.full:
+            self._hosts.pop(key, None)
+
+    async def _fetch_one(self, url: str, fetch: FetchFn) -> FetchOutcome:
+        # The URL's deadline counts from here, before any limit is waited for
+        with anyio.move_on_after(self.timeout) as scope:
+            outcome = await self._fetch_limited(url, fetch)
+        if scope.cancelled_caught:
+            self.failed += 1
+            self.timed_out += 1
+            return FetchOutcome(url, error=f"timed out after {self.timeout:g} s")
+        return outcome
+
+    async def _fetch_limited(self, url: str, fetch: FetchFn) -> FetchOutcome:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores belong to one event loop; start afresh in a new one
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._hosts.clear()
+        try:
+            key, host = self._host(url)
+        except (httpx.InvalidURL, UnicodeError) as exc:
+            self.failed += 1
+            return FetchOutcome(url, error=f"invalid URL: {exc}")
+
+        host.users += 1
+        try:
+            async with host.slots:
+                await host.bucket.acquire()
+                async with self._slots:
+                    page = await fetch(url)
+        except Exception as exc:
+            self.failed += 1
+            return FetchOutcome(url, error=_describe(exc))
+        finally:
+            self._release(key, host)
+        self.completed += 1
+        return FetchOutcome(url, page=page)
+
+    async def fetch_all(
+        self, urls: Sequence[str], fetch: FetchFn
+    ) -> List[FetchOutcome]:
+        """Fetch every URL and return the outcomes in input order."""
+        return list(
+            await asyncio.gather(*(self._fetch_one(url, fetch) for url in urls))
+        )
+
+    async def as_completed(
+        self, urls: Sequence[str], fetch: FetchFn
+    ) -> AsyncIterator[Tuple[int, FetchOutcome]]:
+        """Yield ``(input index, outcome)`` pairs as fetches finish."""
+
+        async def indexed(i: int, url: str) -> Tuple[int, FetchOutcome]:
+            return i, await self._fetch_one(url, fetch)
+
+        tasks = [asyncio.ensure_future(indexed(i, url)) for i, url in enumerate(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the admin stats endpoint."""
+        return {
+            "concurrency": self.concurrency,
+            "host_concurrency": self.host_concurrency,
+            "host_rate": self.host_rate,
+            "active_hosts": len(self._hosts),
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+        }
+
+
+def _describe(exc: Exception) -> str:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return f"HTTP {exc.response.status_code}"
+    if isinstance(exc, (TimeoutError, httpx.TimeoutException)):
+        return "timed out"
+    return str(exc) or type(exc).__name__
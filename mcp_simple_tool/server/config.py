@@ -1,12 +1,74 @@
 """Configuration settings for the MCP server."""
 
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Ranking functions: cosine similarity of TF-IDF vectors, or BM25 over the
+# inverted index
+SearchBackend = Literal["tfidf", "bm25"]
+SearchPoolKind = Literal["thread", "process"]
+
 
 class Settings(BaseSettings):
     """MCP server settings."""
 
     port: int = 7000
     user_agent: str = "MCP Website Fetcher"
+    # Bearer token required by the /admin/reindex, /admin/stats and
+    # /admin/profiles routes; unset, they only answer loopback clients
+    admin_token: Optional[str] = None
+    # Seconds between checks of the docs folder for changes; 0 disables watching
+    index_watch_interval: float = 0.0
+    # Ranking of search_docs_tool: "tfidf" (cosine similarity over TF-IDF
+    # vectors) or "bm25" (BM25 over the inverted index)
+    search_backend: SearchBackend = "tfidf"
+    # Worker pool for search_docs_tool: "thread" or "process"
+    search_pool: SearchPoolKind = "thread"
+    search_workers: int = 2
+    # Searches allowed to wait for a worker before new ones are rejected
+    search_queue_limit: int = 32
+    # search_docs_tool result cache; 0 bytes disables it, 0 s TTL never expires
+    search_cache_bytes: int = 8 * 1024 * 1024
+    search_cache_ttl: float = 0.0
+    # Shared HTTP client used by http_fetch_tool
+    http_timeout: float = 30.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http2: bool = False
+    # Limits per http_fetch_tool call; the body is truncated once either is hit
+    http_max_bytes: int = 5 * 1024 * 1024
+    http_deadline: float = 60.0
+    # http_fetch_many_tool: concurrent fetches overall and per host, requests per
+    # second per host (0 disables) with its burst, and the seconds each URL may
+    # take from the call, queueing for those limits included
+    http_batch_concurrency: int = 8
+    http_host_concurrency: int = 2
+    http_host_rate: float = 5.0
+    http_host_burst: int = 5
+    http_url_timeout: float = 20.0
+    # get_local_content_tool chunk cache; 0 bytes disables it
+    doc_cache_bytes: int = 32 * 1024 * 1024
+    # Seconds a cached doc is served before its mtime is checked again
+    doc_cache_check_interval: float = 1.0
+    # Invalidate on file-system events instead (needs the 'watch' extra)
+    doc_cache_watch: bool = False
+    # Seconds between event-loop lag samples exported on /metrics; 0 disables
+    metrics_lag_interval: float = 0.5
+    # Log event-loop stalls longer than loop_monitor_threshold seconds with the
+    # tool call that caused them
+    loop_monitor: bool = False
+    loop_monitor_threshold: float = 0.1
+    # Share of tool calls profiled (0 disables), how many of the slowest
+    # profiles to keep and the stack sampling period in seconds
+    profile_rate: float = 0.0
+    profile_keep: int = 20
+    profile_interval: float = 0.005
+    # Response cache for http_fetch_tool; 0 bytes keeps it in memory off
+    http_cache_bytes: int = 16 * 1024 * 1024
+    # Optional on-disk tier that survives restarts, bounded by http_cache_disk_bytes
+    http_cache_dir: Optional[str] = None
+    http_cache_disk_bytes: int = 256 * 1024 * 1024
 
     model_config = SettingsConfigDict(env_prefix="MCP_")
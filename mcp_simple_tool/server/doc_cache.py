@@ -0,0 +1,150 @@
+"""Byte-bounded LRU cache of decoded local doc chunks."""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import pathlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["CachedDoc", "DocCache", "watch_docs"]
+
+_CHUNK_OVERHEAD = 64  # rough per-chunk str object overhead, in bytes
+
+
+@dataclass
+class CachedDoc:
+    """Every chunk of one validated doc with the file version it came from."""
+
+    path: pathlib.Path
+    # (mtime_ns, size) of the file when it was read
+    version: Tuple[int, int]
+    chunks: List[str]
+    # Byte offset of each chunk plus the file size (see doc_reader.ChunkTable)
+    offsets: np.ndarray
+    checked: float = 0.0
+
+    @property
+    def cost(self) -> int:
+        return self.version[1] + _CHUNK_OVERHEAD * len(self.chunks)
+
+
+class DocCache:
+    """LRU of :class:`CachedDoc` keyed by the requested relative path.
+
+    Only paths that passed validation are stored, so a hit skips the path
+    checks as well as reading and decoding the file. An entry is trusted for
+    ``check_interval`` seconds after its file was last stat-ed; after that the
+    next lookup compares mtime and size and drops the entry if either changed.
+    While :func:`watch_docs` runs, changed files are dropped as events arrive
+    and lookups never touch the file system.
+    """
+
+    def __init__(self, max_bytes: int, check_interval: float = 1.0) -> None:
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+        self.watching = False
+        self._entries: OrderedDict[str, CachedDoc] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, rel_path: str) -> Optional[CachedDoc]:
+        """Return the cached doc for ``rel_path`` if it is still current."""
+        entry = self._entries.get(rel_path)
+        if entry is not None and not self.watching:
+            now = time.monotonic()
+            if now - entry.checked >= self.check_interval:
+                if _version(entry.path) != entry.version:
+                    self._drop(rel_path)
+                    self.invalidations += 1
+                    entry = None
+                else:
+                    entry.checked = now
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(rel_path)
+        self.hits += 1
+        return entry
+
+    def put(self, rel_path: str, entry: CachedDoc) -> None:
+        """Store ``entry`` unless it alone exceeds the byte budget."""
+        if entry.cost > self.max_bytes:
+            return
+        if rel_path in self._entries:
+            self._drop(rel_path)
+        entry.checked = time.monotonic()
+        self._entries[rel_path] = entry
+        self.size += entry.cost
+        while self.size > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, path: Optional[pathlib.Path] = None) -> None:
+        """Drop entries read from ``path``, or every entry."""
+        if path is None:
+            stale = list(self._entries)
+        else:
+            stale = [key for key, e in self._entries.items() if e.path == path]
+        for key in stale:
+            self._drop(key)
+        self.invalidations += len(stale)
+
+    def _drop(self, rel_path: str) -> None:
+        self.size -= self._entries.pop(rel_path).cost
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the admin stats endpoint."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "watching": self.watching,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def _version(path: pathlib.Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+async def watch_docs(cache: DocCache, root: pathlib.Path) -> None:
+    """Drop cache entries as files under ``root`` change, until cancelled.
+
+    Needs the optional ``watchfiles`` package
+    (``pip install 'mcp-simple-tool[watch]'``); without it the cache keeps
+    checking mtimes every ``check_interval`` seconds.
+    """
+    if importlib.util.find_spec("watchfiles") is None:
+        logger.warning("MCP_DOC_CACHE_WATCH is set but 'watchfiles' is not installed")
+        return
+    from watchfiles import awatch
+
+    # Changes made before the watcher started are not reported; start clean
+    cache.invalidate()
+    cache.watching = True
+    try:
+        async for changes in awatch(root):
+            for _, changed in changes:
+                cache.invalidate(pathlib.Path(changed))
+    finally:
+        cache.watching = False
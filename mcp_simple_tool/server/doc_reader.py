@@ -1,16 +1,24 @@
 from __future__ import annotations
 
 import pathlib
-from typing import List
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
 import mcp.types as types
+import numpy as np
 from pydantic import BaseModel, Field, field_validator
 
+from .doc_cache import CachedDoc, DocCache
+
 # Constants
 DOC_ROOT = pathlib.Path(__file__).resolve().parents[2] / "docs"
 ALLOWED_EXTS = {".md", ".txt", ".yml", ".yaml"}
 CHUNK_SIZE = 1_000  # characters
 
+_SCAN_BLOCK = 1 << 20  # bytes scanned at a time when building a chunk table
+_MAX_TABLES = 256
+
 
 class DocPath(BaseModel):
     """Validated, normalised path relative to docs root."""
@@ -29,13 +37,196 @@ class DocPath(BaseModel):
         return v
 
 
-def read_local_doc(rel_path: str) -> List[types.TextContent]:
-    """Return file content chunked into TextContent objects."""
+@dataclass(frozen=True)
+class ChunkTable:
+    """Byte offset of every ``CHUNK_SIZE``-character chunk of a UTF-8 file.
+
+    ``offsets[i]`` is where chunk ``i`` starts and the last entry is the file
+    size, so chunk ``i`` is ``offsets[i]:offsets[i + 1]``. A chunk that would
+    start between the ``\r`` and ``\n`` of a line break starts after it.
+    """
+
+    offsets: np.ndarray
+    # (mtime_ns, size) of the file the table was built from
+    version: Tuple[int, int] = (0, 0)
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def size(self) -> int:
+        return int(self.offsets[-1])
+
+
+# Chunk tables by path, valid while the file's (mtime_ns, size) is unchanged
+_tables: OrderedDict[pathlib.Path, ChunkTable] = OrderedDict()
+
+
+def _build_chunk_table(path: pathlib.Path, version: Tuple[int, int]) -> ChunkTable:
+    """Find chunk starts by counting UTF-8 lead bytes, one block at a time."""
+    size = version[1]
+    if size == 0:
+        return ChunkTable(np.zeros(1, dtype=np.int64), version)
+    data = np.memmap(path, dtype=np.uint8, mode="r", shape=(size,))
+    parts = []
+    chars_before = 0
+    for block_start in range(0, size, _SCAN_BLOCK):
+        block = data[block_start : block_start + _SCAN_BLOCK]
+        # Every byte except 10xxxxxx continuation bytes starts a character
+        starts = np.flatnonzero((block & 0xC0) != 0x80)
+        first = -chars_before % CHUNK_SIZE
+        parts.append(starts[first::CHUNK_SIZE].astype(np.int64) + block_start)
+        chars_before += len(starts)
+    parts.append(np.array([size], dtype=np.int64))
+    offsets = np.concatenate(parts)
+    # Keep each \r\n in one chunk so it decodes to a single newline
+    inner = offsets[1:-1]
+    inner[(data[inner] == 0x0A) & (data[inner - 1] == 0x0D)] += 1
+    return ChunkTable(np.unique(offsets), version)
+
+
+def chunk_table(path: pathlib.Path) -> ChunkTable:
+    """Return the (cached) chunk table of ``path``."""
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _tables.get(path)
+    if cached is not None and cached.version == version:
+        _tables.move_to_end(path)
+        return cached
+    table = _build_chunk_table(path, version)
+    _tables[path] = table
+    _tables.move_to_end(path)
+    while len(_tables) > _MAX_TABLES:
+        _tables.popitem(last=False)
+    return table
+
+
+def _snap(data: bytes, pos: int) -> int:
+    """Move ``pos`` forward to the next UTF-8 character boundary in ``data``."""
+    while pos < len(data) and data[pos] & 0xC0 == 0x80:
+        pos += 1
+    return pos
+
+
+def _decode(data: bytes) -> str:
+    """Decode UTF-8 with universal newlines, as ``Path.read_text()`` does."""
+    text = data.decode("utf-8", errors="ignore")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _content(text: str, meta: Dict[str, Any]) -> types.TextContent:
+    return types.TextContent(type="text", text=text, _meta=meta)
+
+
+def read_local_doc(
+    rel_path: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    byte_start: Optional[int] = None,
+    byte_end: Optional[int] = None,
+    cache: Optional[DocCache] = None,
+) -> List[types.TextContent]:
+    """Return file content chunked into TextContent objects.
+
+    Only the requested part of the file is read: chunks ``offset`` to
+    ``offset + limit`` (all remaining chunks if ``limit`` is ``None``), or the
+    byte range ``byte_start:byte_end`` moved forward to character boundaries.
+    A chunk table of byte offsets is kept per file, so a chunk is found with a
+    seek instead of decoding everything before it. Each item's ``_meta`` holds
+    its chunk index and byte range plus the file's total chunk count and size.
+
+    With a ``cache``, chunk requests for a file that is cached are served from
+    memory without validating the path again or touching the file; files that
+    fit its budget are read whole and cached on first use.
+    """
+    ranged = byte_start is not None or byte_end is not None
+    if ranged and (offset or limit is not None):
+        raise ValueError("Use either offset/limit or byte_start/byte_end")
+    if offset < 0 or (limit is not None and limit < 1):
+        raise ValueError("offset must be >= 0 and limit >= 1")
+
+    if cache is not None and not ranged:
+        doc = cache.get(rel_path)
+        if doc is not None:
+            return _page(doc.chunks, doc.offsets, offset, limit)
+
     validated = DocPath(file=rel_path).file
-    text = (DOC_ROOT / validated).read_text(encoding="utf-8", errors="ignore")
+    path = DOC_ROOT / validated
+    table = chunk_table(path)
+    totals = {"total_chunks": table.n_chunks, "total_bytes": table.size}
+
+    if cache is not None and not ranged and table.size <= cache.max_bytes:
+        data = path.read_bytes()
+        chunks = _decode_chunks(data, table.offsets, 0, table.n_chunks)
+        cache.put(
+            rel_path, CachedDoc(path.resolve(), table.version, chunks, table.offsets)
+        )
+        return _page(chunks, table.offsets, offset, limit)
+
+    if ranged:
+        start = max(0, byte_start or 0)
+        end = table.size if byte_end is None else min(byte_end, table.size)
+        if start >= end:
+            return []
+        with path.open("rb") as f:
+            f.seek(start)
+            # A UTF-8 character is at most 4 bytes, so this covers a split end
+            data = f.read(end - start + 3)
+        stop = _snap(data, end - start)
+        begin = _snap(data, 0)
+        text = _decode(data[begin:stop])
+        meta = {"byte_start": start + begin, "byte_end": start + stop, **totals}
+        return [_content(text, meta)]
+
+    offsets = table.offsets
+    last = _last_chunk(table.n_chunks, offset, limit)
+    if offset >= last:
+        return []
+    with path.open("rb") as f:
+        f.seek(int(offsets[offset]))
+        data = f.read(int(offsets[last] - offsets[offset]))
+    texts = _decode_chunks(data, offsets, offset, last)
+    return _page(texts, offsets, offset, limit, first=offset)
+
+
+def _last_chunk(n_chunks: int, offset: int, limit: Optional[int]) -> int:
+    return n_chunks if limit is None else min(n_chunks, offset + limit)
+
+
+def _decode_chunks(
+    data: bytes, offsets: np.ndarray, first: int, last: int
+) -> List[str]:
+    """Decode chunks ``first:last`` from ``data``, which starts at chunk ``first``."""
+    base = int(offsets[first])
+    return [
+        _decode(data[int(offsets[i]) - base : int(offsets[i + 1]) - base])
+        for i in range(first, last)
+    ]
+
+
+def _page(
+    texts: List[str],
+    offsets: np.ndarray,
+    offset: int,
+    limit: Optional[int],
+    first: int = 0,
+) -> List[types.TextContent]:
+    """Wrap chunks ``offset:offset + limit`` of ``texts`` (chunk ``first`` onwards)."""
+    n_chunks = len(offsets) - 1
+    totals = {"total_chunks": n_chunks, "total_bytes": int(offsets[-1])}
     # Chunk to stay within typical LLM context windows
-    chunks = [
-        types.TextContent(type="text", text=text[i : i + CHUNK_SIZE])
-        for i in range(0, len(text), CHUNK_SIZE)
+    return [
+        _content(
+            texts[i - first],
+            {
+                "chunk": i,
+                "byte_start": int(offsets[i]),
+                "byte_end": int(offsets[i + 1]),
+                **totals,
+            },
+        )
+        for i in range(offset, _last_chunk(n_chunks, offset, limit))
     ]
-    return chunks
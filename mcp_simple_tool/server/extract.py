@@ -0,0 +1,219 @@
+"""Incremental HTML to Markdown-flavoured text extraction for fetched pages."""
+
+from __future__ import annotations
+
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+__all__ = ["EXTRACT_MODES", "HtmlExtractor", "html_to_text", "wants_extraction"]
+
+# "auto" extracts HTML responses only, "markdown" always extracts, "raw" never does
+EXTRACT_MODES = ("auto", "markdown", "raw")
+
+_HTML_TYPES = ("text/html", "application/xhtml+xml")
+# Elements whose content is never readable text
+_SKIP = frozenset(
+    "head script style noscript template svg canvas iframe object nav header "
+    "footer aside form button select".split()
+)
+# Elements allowed in <head>; any other start tag ends it, as </head> is optional
+_HEAD_CONTENT = frozenset("title base link meta style script noscript template".split())
+_BLOCK = frozenset(
+    "p div section article main blockquote table thead tbody ul ol dl dt dd "
+    "figure figcaption details summary address".split()
+)
+_HEADINGS = {f"h{n}": "#" * n + " " for n in range(1, 7)}
+# An absolute http(s) URL or a root-relative path that urljoin() would return
+# as is or prefix with the origin: no query, fragment, parameters or
+# whitespace, and (checked separately) no dot segments
+_PLAIN_LINK = re.compile(r"(?:https?://[^/?#;\s]+)?/(?!/)[^?#;\s]*\Z")
+_WHITESPACE = re.compile(r"\s+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def wants_extraction(mode: str, content_type: Optional[str]) -> bool:
+    """Whether a response of ``content_type`` is extracted under ``mode``."""
+    if mode == "markdown":
+        return True
+    if mode == "raw":
+        return False
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    return media_type in _HTML_TYPES
+
+
+class HtmlExtractor(HTMLParser):
+    """Turn HTML into compact Markdown-flavoured text as it is fed.
+
+    Scripts, styles, navigation, headers, footers and forms are dropped.
+    Headings, list items, links, code blocks and paragraph breaks are kept as
+    Markdown. If the page marks its main content (``<main>``, ``<article>`` or
+    ``role="main"``), only that content is returned.
+
+    Feed decoded chunks with :meth:`feed` as they arrive and call
+    :meth:`result` once at the end; the parser only buffers an unfinished tag,
+    so chunk boundaries may fall anywhere.
+    """
+
+    def __init__(self, base_url: Optional[str] = None) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        base = urlsplit(base_url or "")
+        self._origin = (
+            f"{base.scheme}://{base.netloc}"
+            if base.scheme in ("http", "https") and base.netloc
+            else None
+        )
+        self._skip: List[str] = []
+        self._main: List[str] = []
+        # Output outside and inside the main content
+        self._parts: Tuple[List[str], List[str]] = ([], [])
+        self._break = 0
+        self._space = False
+        self._prefix = ""
+        self._pre = 0
+        self._lists: List[List[int]] = []
+        self._link: Optional[str] = None
+        self._links: List[Tuple[List[str], int, str]] = []
+
+    @property
+    def _out(self) -> List[str]:
+        return self._parts[bool(self._main)]
+
+    def _emit(self, text: str) -> None:
+        out = self._out
+        if out and self._break:
+            out.append("\n" * self._break)
+        elif out and self._space and not out[-1].endswith((" ", "\n")):
+            out.append(" ")
+        if self._link is not None:
+            self._links.append((out, len(out), self._link))
+            self._link = None
+        out.append(self._prefix + text)
+        self._break = 0
+        self._space = False
+        self._prefix = ""
+
+    def _block(self, newlines: int = 2) -> None:
+        self._break = max(self._break, newlines)
+        self._space = False
+
+    def _resolve(self, href: str) -> str:
+        """``href`` made absolute against the page URL."""
+        if self._origin and _PLAIN_LINK.match(href) and "/." not in href:
+            # What urljoin() returns, without parsing either URL
+            return href if href[0] != "/" else self._origin + href
+        return urljoin(self.base_url, href) if self.base_url else href
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if self._skip:
+            if "head" in self._skip and tag not in _HEAD_CONTENT:
+                del self._skip[self._skip.index("head") :]
+            if self._skip:
+                if tag in _SKIP:
+                    self._skip.append(tag)
+                return
+        if tag in _SKIP:
+            self._skip.append(tag)
+            return
+        # Most tags have no attribute the extractor reads, so attrs is only
+        # scanned for the few that do
+        if tag in ("main", "article") or (attrs and ("role", "main") in attrs):
+            self._main.append(tag)
+        if tag in _HEADINGS:
+            self._block()
+            self._prefix = _HEADINGS[tag]
+        elif tag in ("ul", "ol"):
+            self._block(1 if self._lists else 2)
+            self._lists.append([tag == "ol", 0])
+        elif tag == "li":
+            self._block(1)
+            indent = "  " * max(0, len(self._lists) - 1)
+            if self._lists and self._lists[-1][0]:
+                self._lists[-1][1] += 1
+                self._prefix = f"{indent}{self._lists[-1][1]}. "
+            else:
+                self._prefix = f"{indent}- "
+        elif tag == "pre":
+            self._block()
+            self._emit("```")
+            self._block(1)
+            self._pre += 1
+        elif tag == "code" and not self._pre:
+            self._prefix += "`"
+        elif tag == "a":
+            href = next((value for name, value in attrs if name == "href"), None)
+            if href and not href.startswith(("#", "javascript:")):
+                self._link = self._resolve(href)
+        elif tag in ("br", "tr"):
+            self._block(1)
+        elif tag == "hr":
+            self._block()
+            self._emit("---")
+            self._block()
+        elif tag in ("td", "th"):
+            self._space = True
+        elif tag in _BLOCK:
+            self._block()
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._skip:
+            if tag in self._skip:
+                while self._skip.pop() != tag:
+                    pass
+            return
+        if tag in _HEADINGS or tag in _BLOCK:
+            self._block()
+        if tag in ("ul", "ol") and self._lists:
+            self._lists.pop()
+            self._block(1 if self._lists else 2)
+        elif tag == "pre" and self._pre:
+            self._pre -= 1
+            out = self._out
+            if out and out[-1].endswith("\n"):
+                out[-1] = out[-1].rstrip("\n")
+            self._block(1)
+            self._emit("```")
+            self._block()
+        elif tag == "code" and not self._pre:
+            if self._prefix.endswith("`"):
+                self._prefix = self._prefix[:-1]
+            else:
+                self._out.append("`")
+        elif tag == "a":
+            self._link = None
+            if self._links:
+                out, start, href = self._links.pop()
+                out.insert(start, "[")
+                out.append(f"]({href})")
+        if self._main and tag == self._main[-1]:
+            self._main.pop()
+            self._block()
+
+    def handle_data(self, data: str) -> None:
+        if self._skip:
+            return
+        if self._pre:
+            self._emit(data)
+            return
+        text = _WHITESPACE.sub(" ", data)
+        if text.startswith(" "):
+            self._space = True
+        if text.strip():
+            self._emit(text.strip())
+            self._space = text.endswith(" ")
+
+    def result(self) -> str:
+        """Finish parsing and return the extracted text."""
+        self.close()
+        outside, inside = self._parts
+        text = "".join(inside if "".join(inside).strip() else outside)
+        return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def html_to_text(html: str, base_url: Optional[str] = None) -> str:
+    """Extract the readable text of a complete HTML document."""
+    extractor = HtmlExtractor(base_url)
+    extractor.feed(html)
+    return extractor.result()
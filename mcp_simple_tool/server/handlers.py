@@ -2,43 +2,244 @@
 
 from __future__ import annotations
 
-from typing import Annotated, List
+import logging
+from typing import Annotated, Any, Callable, Dict, List, Literal, Optional
 
 import mcp.types as types
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 from pydantic import Field
 
-from mcp_simple_tool.semantic_search.search import semantic_search
-from mcp_simple_tool.server.doc_reader import read_local_doc
+from mcp_simple_tool.semantic_search.search import (
+    IndexGeneration,
+    loaded_generation,
+    on_generation_change,
+    semantic_search,
+    semantic_search_many,
+)
+from mcp_simple_tool.server.doc_reader import CHUNK_SIZE, read_local_doc
 
+from .admin import register_stats
+from .batch_fetch import BatchFetcher, FetchOutcome
 from .config import Settings
-from .http import fetch
+from .doc_cache import DocCache
+from .http import Page, fetch, inflight
+from .http_cache import ResponseCache
+from .loop_monitor import LoopMonitor
+from .metrics import add_call_hook, instrument_tool, registry
+from .profiling import ToolProfiler
+from .search_cache import QueryCache
+from .search_pool import SearchPool
+
+logger = logging.getLogger(__name__)
 
 settings = Settings()
 mcp = FastMCP("mcp-website-fetcher-sse")
+search_pool = SearchPool(
+    settings.search_workers, settings.search_queue_limit, settings.search_pool
+)
+register_stats("search_pool", search_pool.stats)
+search_cache = QueryCache(settings.search_cache_bytes, settings.search_cache_ttl)
+on_generation_change(lambda generation: search_cache.invalidate(generation.number))
+register_stats("search_cache", search_cache.stats)
+response_cache = ResponseCache(
+    settings.http_cache_bytes, settings.http_cache_dir, settings.http_cache_disk_bytes
+)
+register_stats("http_cache", response_cache.stats)
+register_stats("http_inflight", inflight.stats)
+batch_fetcher = BatchFetcher(
+    settings.http_batch_concurrency,
+    settings.http_host_concurrency,
+    settings.http_host_rate,
+    settings.http_host_burst,
+    settings.http_url_timeout,
+)
+register_stats("http_batch", batch_fetcher.stats)
+doc_cache = DocCache(settings.doc_cache_bytes, settings.doc_cache_check_interval)
+register_stats("doc_cache", doc_cache.stats)
+
+fetch_bytes = registry.counter(
+    "mcp_fetch_bytes_total", "Body bytes of pages returned by the fetch tools"
+)
+index_generation = registry.gauge(
+    "mcp_search_index_generation", "Number of the index generation being served"
+)
+index_chunks = registry.gauge("mcp_search_index_chunks", "Chunks in the served index")
+index_bytes = registry.gauge(
+    "mcp_search_index_bytes", "Size of the served index's document vectors"
+)
+
+
+def _index_metrics(generation: IndexGeneration) -> None:
+    index_generation.set(generation.number)
+    index_chunks.set(len(generation.meta))
+    index_bytes.set(generation.matrix_bytes)
+
+
+on_generation_change(_index_metrics)
+
+
+def _hit_ratio(cache: str, stats: Callable[[], Dict[str, Any]]) -> None:
+    registry.gauge(
+        "mcp_cache_hit_ratio",
+        "Share of lookups answered from the cache",
+        lambda: float(stats()["hit_ratio"]),
+        cache=cache,
+    )
+
+
+_hit_ratio("search", search_cache.stats)
+_hit_ratio("http", response_cache.stats)
+_hit_ratio("doc", doc_cache.stats)
+
+loop_monitor = LoopMonitor(settings.loop_monitor_threshold)
+if settings.loop_monitor:
+    add_call_hook(loop_monitor.call_started)
+    register_stats("loop_monitor", loop_monitor.stats)
+
+profiler = ToolProfiler(
+    settings.profile_rate, settings.profile_keep, settings.profile_interval
+)
+if settings.profile_rate > 0:
+    add_call_hook(profiler.call_started)
+    register_stats("profiler", profiler.stats)
+
+ExtractMode = Literal["auto", "markdown", "raw"]
+_EXTRACT_DESCRIPTION = (
+    "``auto`` converts HTML responses to Markdown text and returns other types "
+    "as-is, ``markdown`` always converts, ``raw`` returns the body unchanged"
+)
+
+
+def _format_page(page: Page) -> str:
+    """Page text as shown to the agent, noting a truncated download."""
+    if not page.truncated:
+        return page.text
+    return f"{page.text}\n\n[Truncated: {page.truncated}; {page.size} bytes received]"
+
+
+def _format_match(r: Dict[str, Any]) -> str:
+    """Render one search result as shown to the agent.
+
+    When the index recorded where the excerpt came from, the heading path is
+    shown next to the file and a footer names the ``get_local_content_tool``
+    chunks covering it, so the agent can read just that section.
+    """
+    title = f"**{r['file']}**"
+    if r.get("heading"):
+        title += f" › {r['heading']}"
+    text = f"{title}  (score {r['score']:.3f})\n\n{r['excerpt'].strip()}\n\n"
+    start, end = r.get("start", 0), r.get("end", 0)
+    if end > start:
+        first, last = start // CHUNK_SIZE, (end - 1) // CHUNK_SIZE
+        text += (
+            f"_chars {start}–{end}: get_local_content_tool offset={first} "
+            f"limit={last - first + 1}_\n\n"
+        )
+    return text + "---\n"
 
 
 @mcp.tool(
-    description="Fetch a remote web page over HTTP and return its full text.",
+    description=(
+        "Fetch a remote web page over HTTP and return its text; HTML pages are "
+        "reduced to their readable content as Markdown by default."
+    ),
 )
+@instrument_tool
 async def http_fetch_tool(
     url: Annotated[str, Field(description="Absolute HTTP/HTTPS URL to retrieve")],
+    extract: Annotated[ExtractMode, Field(description=_EXTRACT_DESCRIPTION)] = "auto",
 ) -> Annotated[
     List[types.TextContent],
     Field(
         description=(
-            "Single‑element list where the only TextContent item contains the raw "
-            "response body as plain text."
+            "Single‑element list where the only TextContent item contains the "
+            "response body (or its extracted text) as plain text."
         )
     ),
 ]:
     """Fetch a URL via HTTP (uses server‑side network access).
 
     The returned list always has exactly one TextContent object whose ``text`` field
-    is the full response body.
+    is the response body, or for HTML its main content as Markdown with scripts,
+    styles and navigation removed. Bodies over the size limit or still downloading
+    at the deadline are cut short and end with a ``[Truncated: ...]`` note.
+    """
+    page = await fetch(
+        url,
+        headers={"User-Agent": settings.user_agent},
+        cache=response_cache,
+        max_bytes=settings.http_max_bytes,
+        deadline=settings.http_deadline,
+        extract=extract,
+    )
+    fetch_bytes.inc(page.size)
+    return [types.TextContent(type="text", text=_format_page(page))]
+
+
+@mcp.tool(
+    description=(
+        "Fetch several web pages concurrently and return the text of each, in "
+        "input order; failures are reported per URL."
+    ),
+)
+@instrument_tool
+async def http_fetch_many_tool(
+    urls: Annotated[
+        List[str],
+        Field(
+            description="Absolute HTTP/HTTPS URLs to retrieve (1–50)",
+            min_length=1,
+            max_length=50,
+        ),
+    ],
+    extract: Annotated[ExtractMode, Field(description=_EXTRACT_DESCRIPTION)] = "auto",
+    ctx: Optional[Context[Any, Any, Any]] = None,
+) -> Annotated[
+    List[types.TextContent],
+    Field(
+        description=(
+            "One TextContent item per URL, in input order, headed by the URL and "
+            "holding its text or an ``Error: ...`` line."
+        )
+    ),
+]:
+    """Fetch many URLs in one call instead of one ``http_fetch_tool`` call each.
+
+    Fetches run concurrently under server-wide limits (overall, per host and a
+    per-host request rate). Each URL has a deadline counted from the call,
+    waiting for the limits included, and is reported as timed out if it
+    misses it. Progress notifications
+    are sent as pages complete when the client asked for them.
     """
-    content = await fetch(url, headers={"User-Agent": settings.user_agent})
-    return [types.TextContent(type="text", text=content)]
+
+    async def fetch_url(url: str) -> Page:
+        page = await fetch(
+            url,
+            headers={"User-Agent": settings.user_agent},
+            cache=response_cache,
+            max_bytes=settings.http_max_bytes,
+            deadline=settings.http_deadline,
+            extract=extract,
+        )
+        fetch_bytes.inc(page.size)
+        return page
+
+    outcomes: List[Optional[FetchOutcome]] = [None] * len(urls)
+    done = 0
+    async for i, outcome in batch_fetcher.as_completed(urls, fetch_url):
+        outcomes[i] = outcome
+        done += 1
+        if ctx is not None:
+            await ctx.report_progress(done, len(urls), outcome.url)
+
+    contents: List[types.TextContent] = []
+    for url, result in zip(urls, outcomes):
+        if result is not None and result.page is not None:
+            body = _format_page(result.page)
+        else:
+            body = f"Error: {result.error if result else 'not fetched'}"
+        contents.append(types.TextContent(type="text", text=f"### {url}\n\n{body}"))
+    return contents
 
 
 @mcp.tool(
@@ -47,6 +248,7 @@ async def http_fetch_tool(
         "and return the top‑k excerpts."
     ),
 )
+@instrument_tool
 async def search_docs_tool(
     query: Annotated[
         str, Field(description="Search phrase or question to look up in the docs")
@@ -64,7 +266,8 @@ async def search_docs_tool(
     Field(
         description=(
             "Each TextContent item contains a formatted excerpt with the file path, "
-            "similarity score, and a snippet separated by an HR."
+            "section heading, similarity score, a snippet and the chunks to read "
+            "with get_local_content_tool, separated by an HR."
         )
     ),
 ]:
@@ -73,21 +276,34 @@ async def search_docs_tool(
     Returns a pretty‑formatted excerpt for each match so the agent can decide which
     file to read in full with ``get_local_content_tool``.
     """
-    results = semantic_search(query, k)
+    cached = search_cache.get(query, k)
+    if cached is not None:
+        results = cached
+    else:
+        generation = loaded_generation()
+        results, timing = await search_pool.run(
+            semantic_search, query, k, settings.search_backend
+        )
+        search_cache.put(query, k, generation, results)
+        logger.debug(
+            "search_docs_tool wait=%.1fms compute=%.1fms",
+            timing.wait * 1000,
+            timing.compute * 1000,
+        )
 
     contents: List[types.TextContent] = []
     for r in results:
-        pretty = (
-            f"**{r['file']}**  (score {r['score']:.3f})\n\n"
-            f"{r['excerpt'].strip()}\n\n---\n"
-        )
-        contents.append(types.TextContent(type="text", text=pretty))
+        contents.append(types.TextContent(type="text", text=_format_match(r)))
     return contents
 
 
 @mcp.tool(
-    description="Return the full contents of a local documentation file.",
+    description=(
+        "Return the contents of a local documentation file, whole or a page of "
+        "chunks / a byte range at a time."
+    ),
 )
+@instrument_tool
 async def get_local_content_tool(
     file: Annotated[
         str,
@@ -98,18 +314,98 @@ async def get_local_content_tool(
             )
         ),
     ],
+    offset: Annotated[
+        int, Field(description="Index of the first chunk to return", ge=0)
+    ] = 0,
+    limit: Annotated[
+        Optional[int],
+        Field(description="Number of chunks to return (default: all remaining)", ge=1),
+    ] = None,
+    byte_start: Annotated[
+        Optional[int],
+        Field(description="Start of a byte range to return instead of chunks", ge=0),
+    ] = None,
+    byte_end: Annotated[
+        Optional[int],
+        Field(description="End (exclusive) of the byte range", ge=0),
+    ] = None,
 ) -> Annotated[
     List[types.TextContent],
     Field(
         description=(
             "The file split into ≈1 000‑character TextContent chunks, in order. "
-            "Concatenate ``text`` fields to reconstruct the original file."
+            "Concatenate ``text`` fields to reconstruct the requested part. Each "
+            "item's ``_meta`` holds ``chunk``, ``byte_start``, ``byte_end``, "
+            "``total_chunks`` and ``total_bytes``."
         )
     ),
 ]:
-    """Load the entire markdown / YAML / text document from the local docs folder.
+    """Load a markdown / YAML / text document from the local docs folder.
 
     Use this after ``search_docs_tool`` to read a file that was referenced in the
-    search results.
+    search results. Large files can be paged through with ``offset``/``limit``
+    using ``total_chunks`` from ``_meta``, or read by ``byte_start``/``byte_end``.
     """
-    return read_local_doc(file)
+    return read_local_doc(
+        file,
+        offset,
+        limit,
+        byte_start,
+        byte_end,
+        cache=doc_cache if settings.doc_cache_bytes > 0 else None,
+    )
+
+
+@mcp.tool(
+    description=(
+        "Run several search queries (e.g. reformulations of one question) over "
+        "the ``docs`` folder in a single call and return the top‑k excerpts of each."
+    ),
+)
+@instrument_tool
+async def search_docs_many_tool(
+    queries: Annotated[
+        List[str],
+        Field(
+            description="Search phrases or questions to look up (1–10)",
+            min_length=1,
+            max_length=10,
+        ),
+    ],
+    k: Annotated[
+        int,
+        Field(
+            description="Number of top matches to return per query (1–20)",
+            ge=1,
+            le=20,
+        ),
+    ] = 3,
+) -> Annotated[
+    List[types.TextContent],
+    Field(
+        description=(
+            "One TextContent item per query, in input order, headed by the query "
+            "and listing its formatted excerpts separated by HRs."
+        )
+    ),
+]:
+    """Perform several semantic searches in one round-trip.
+
+    All queries are scored together against the same index generation, which is
+    cheaper than calling ``search_docs_tool`` once per query.
+    """
+    results, timing = await search_pool.run(
+        semantic_search_many, queries, k, settings.search_backend
+    )
+    logger.debug(
+        "search_docs_many_tool queries=%d wait=%.1fms compute=%.1fms",
+        len(queries),
+        timing.wait * 1000,
+        timing.compute * 1000,
+    )
+
+    contents: List[types.TextContent] = []
+    for query, matches in zip(queries, results):
+        pretty = f"### {query}\n\n" + "".join(_format_match(r) for r in matches)
+        contents.append(types.TextContent(type="text", text=pretty))
+    return contents
@@ -1,22 +1,297 @@
 """HTTP utilities for the MCP server."""
 
-from typing import Dict
+from __future__ import annotations
 
-from mcp.shared._httpx_utils import create_mcp_http_client
+import codecs
+import importlib.util
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
+import anyio
+import httpx
 
-async def fetch(url: str, headers: Dict[str, str]) -> str:
+from .config import Settings
+from .extract import HtmlExtractor, html_to_text, wants_extraction
+from .http_cache import CachedResponse, ResponseCache
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30.0  # seconds
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_DEADLINE = 60.0  # seconds for the whole download
+# Decoded characters gathered before they are handed to the extractor thread
+EXTRACT_BATCH = 64 * 1024
+
+
+@dataclass(frozen=True)
+class Page:
+    """Text of a fetched page and why it was cut short, if it was."""
+
+    text: str
+    # Body bytes received
+    size: int
+    truncated: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+# Long-lived client shared by every fetch while the app is running
+_client: Optional[httpx.AsyncClient] = None
+
+# Concurrent fetches of the same page share one request
+inflight: SingleFlight[Page] = SingleFlight()
+
+
+def create_client(settings: Optional[Settings] = None) -> httpx.AsyncClient:
+    """Create an ``httpx.AsyncClient`` with the pool limits from ``settings``.
+
+    HTTP/2 is only enabled if requested and the optional ``h2`` package is
+    installed (``pip install 'mcp-simple-tool[http2]'``).
+    """
+    settings = settings or Settings()
+    http2 = settings.http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("MCP_HTTP2 is set but 'h2' is not installed; using HTTP/1.1")
+        http2 = False
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=httpx.Timeout(settings.http_timeout),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        http2=http2,
+    )
+
+
+@asynccontextmanager
+async def shared_client(settings: Settings) -> AsyncIterator[httpx.AsyncClient]:
+    """Install one pooled client for the app's lifetime and close it on exit.
+
+    Reusing the client keeps TCP/TLS connections alive between fetches instead
+    of paying a fresh handshake on every call.
+    """
+    global _client
+    client = create_client(settings)
+    _client = client
+    try:
+        yield client
+    finally:
+        _client = None
+        await client.aclose()
+
+
+async def fetch(
+    url: str,
+    headers: Dict[str, str],
+    cache: Optional[ResponseCache] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    deadline: float = DEFAULT_DEADLINE,
+    extract: str = "raw",
+) -> Page:
     """
     Fetch a website and return its content as text.
 
+    Uses the shared client when the app lifespan is running, otherwise a
+    short-lived client for this call only. Concurrent fetches of the same URL
+    with the same headers share a single request and its outcome.
+
+    The body is streamed and decoded as it arrives. Reading stops after
+    ``max_bytes`` or once ``deadline`` seconds have passed, and the page keeps
+    what was received with ``truncated`` set, so memory and time per fetch stay
+    bounded whatever the server sends.
+
+    With ``extract`` set to ``"markdown"``, or to ``"auto"`` for HTML responses,
+    the body is fed to an :class:`~.extract.HtmlExtractor` while it streams and
+    the page holds the readable text instead of the markup. Parsing runs in
+    worker threads, a batch of text at a time, so large pages do not hold up
+    the event loop.
+
     Args:
         url: The URL to fetch
         headers: HTTP headers to include in the request
+        cache: Response cache to serve fresh pages from and revalidate stale ones
+        max_bytes: Most body bytes to read
+        deadline: Seconds allowed for the whole fetch
+        extract: ``"auto"``, ``"markdown"`` or ``"raw"`` (see :data:`EXTRACT_MODES`)
 
     Returns:
         The text content of the response
+
+    Raises:
+        TimeoutError: If no response arrived before the deadline
+    """
+    key = (*fetch_key(url, headers), str(max_bytes), str(deadline), extract)
+    return await inflight.run(
+        key, lambda: _fetch(url, headers, cache, max_bytes, deadline, extract)
+    )
+
+
+def fetch_key(url: str, headers: Dict[str, str]) -> Tuple[str, ...]:
+    """Identify requests that would get the same response.
+
+    The URL is normalised (lower-case scheme and host, default port and
+    fragment dropped, empty path made ``/``) and the request headers are
+    compared with case-insensitive names.
     """
-    async with create_mcp_http_client(headers=headers) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        return response.text
+    parsed = httpx.URL(url)
+    normalised = str(parsed.copy_with(path=parsed.path, fragment=None))
+    header_items = sorted((name.lower(), value) for name, value in headers.items())
+    return (normalised, *(f"{name}: {value}" for name, value in header_items))
+
+
+async def _fetch(
+    url: str,
+    headers: Dict[str, str],
+    cache: Optional[ResponseCache],
+    max_bytes: int,
+    deadline: float,
+    extract: str,
+) -> Page:
+    client = _client
+    if client is None:
+        async with create_client() as one_shot:
+            return await _get_page(
+                one_shot, url, headers, cache, max_bytes, deadline, extract
+            )
+    return await _get_page(client, url, headers, cache, max_bytes, deadline, extract)
+
+
+async def _get_page(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: Dict[str, str],
+    cache: Optional[ResponseCache],
+    max_bytes: int,
+    deadline: float,
+    extract: str,
+) -> Page:
+    entry = await cache.get(url) if cache is not None else None
+    if cache is not None and entry is not None:
+        if entry.is_fresh():
+            cache.record_hit(entry)
+            return await _cached_page(entry, url, extract)
+        headers = {**headers, **entry.validators()}
+
+    body: Optional[_BodyReader] = None
+    with anyio.move_on_after(deadline) as scope:
+        async with client.stream("GET", url, headers=headers) as response:
+            if cache is not None and entry is not None and response.status_code == 304:
+                await cache.refresh(url, entry, response.headers)
+                cache.record_hit(entry, revalidated=True)
+                return await _cached_page(entry, url, extract)
+            response.raise_for_status()
+            content_type = response.headers.get("content-type")
+            extractor = (
+                HtmlExtractor(url) if wants_extraction(extract, content_type) else None
+            )
+            store = cache is not None and cache.stores(response.headers)
+            body = _BodyReader(
+                response.charset_encoding,
+                max_bytes,
+                extractor,
+                keep_raw=extractor is None or store,
+            )
+            await body.read(response)
+
+    if body is None:
+        raise TimeoutError(f"No response from {url} within {deadline:g} s")
+    if scope.cancelled_caught:
+        body.truncated = f"download stopped after the {deadline:g} s deadline"
+    page = await body.page(content_type)
+    if cache is not None and page.truncated is None:
+        cache.record_miss()
+        if store:
+            await cache.put(url, response.headers, body.raw_text(), page.size)
+        elif entry is not None:
+            await cache.discard(url)
+    return page
+
+
+async def _cached_page(entry: CachedResponse, url: str, extract: str) -> Page:
+    text = entry.body
+    if wants_extraction(extract, entry.content_type):
+        text = await anyio.to_thread.run_sync(html_to_text, text, url)
+    return Page(text, entry.size, content_type=entry.content_type)
+
+
+def _codec(encoding: Optional[str]) -> str:
+    """``encoding`` if Python knows the label, else UTF-8 (as ``response.text``)."""
+    if encoding:
+        try:
+            return codecs.lookup(encoding).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+class _BodyReader:
+    """Decode a streamed body incrementally, keeping at most ``max_bytes``.
+
+    Decoded text goes to ``extractor`` in a worker thread once
+    :data:`EXTRACT_BATCH` characters have arrived, and is only kept verbatim
+    when ``keep_raw`` is set (for the page itself or the response cache).
+    State lives on the reader so the text received so far survives a deadline
+    cancelling :meth:`read` part-way.
+    """
+
+    def __init__(
+        self,
+        encoding: Optional[str],
+        max_bytes: int,
+        extractor: Optional[HtmlExtractor] = None,
+        keep_raw: bool = True,
+    ) -> None:
+        self._decoder = codecs.getincrementaldecoder(_codec(encoding))(errors="replace")
+        self._extractor = extractor
+        self._keep_raw = keep_raw
+        self._parts: List[str] = []
+        # Text not yet fed to the extractor
+        self._pending: List[str] = []
+        self._pending_size = 0
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.truncated: Optional[str] = None
+
+    async def read(self, response: httpx.Response) -> None:
+        async for chunk in response.aiter_bytes():
+            if self.size + len(chunk) > self.max_bytes:
+                chunk = chunk[: self.max_bytes - self.size]
+                self.truncated = f"response exceeded {self.max_bytes} bytes"
+            self._add(self._decoder.decode(chunk))
+            self.size += len(chunk)
+            if self._pending_size >= EXTRACT_BATCH:
+                await self._feed()
+            if self.truncated:
+                return
+
+    def _add(self, text: str) -> None:
+        if self._keep_raw:
+            self._parts.append(text)
+        if self._extractor is not None:
+            self._pending.append(text)
+            self._pending_size += len(text)
+
+    async def _feed(self) -> None:
+        assert self._extractor is not None
+        # The worker thread is shielded from cancellation once it starts, so
+        # the batch is only cleared after the extractor has taken it
+        await anyio.to_thread.run_sync(self._extractor.feed, "".join(self._pending))
+        self._pending.clear()
+        self._pending_size = 0
+
+    async def page(self, content_type: Optional[str] = None) -> Page:
+        """Flush the decoder and return the page text (extracted if requested)."""
+        self._add(self._decoder.decode(b"", final=True))
+        if self._extractor is not None:
+            await self._feed()
+            text = await anyio.to_thread.run_sync(self._extractor.result)
+        else:
+            text = self.raw_text()
+        return Page(text, self.size, self.truncated, content_type)
+
+    def raw_text(self) -> str:
+        return "".join(self._parts)
@@ -0,0 +1,294 @@
+"""HTTP response cache for fetched pages, with an optional on-disk tier."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+import anyio
+
+__all__ = ["CachedResponse", "ResponseCache", "freshness"]
+
+_ENTRY_OVERHEAD = 256  # rough per-entry bookkeeping (headers, key), in bytes
+
+
+@dataclass
+class CachedResponse:
+    """A stored response body with the validators needed to revalidate it."""
+
+    body: str
+    size: int
+    # Wall-clock time after which the entry must be revalidated
+    expires: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_type: Optional[str] = None
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (time.time() if now is None else now) < self.expires
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that turn an unchanged refetch into a 304."""
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _lower(headers: Mapping[str, str]) -> Dict[str, str]:
+    return {name.lower(): value for name, value in headers.items()}
+
+
+def freshness(headers: Mapping[str, str], now: float) -> Optional[float]:
+    """Return when a response with ``headers`` goes stale, or ``None`` if uncacheable.
+
+    ``Cache-Control: no-store`` and ``private`` responses are not stored, since
+    the cache is shared by every session of the server. ``no-cache`` responses
+    are stored but revalidated on every use. Freshness comes from ``s-maxage``
+    or ``max-age``, then ``Expires``; without either the entry is stale
+    immediately and only useful for revalidation.
+    """
+    headers = _lower(headers)
+    directives: Dict[str, Optional[str]] = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+
+    if "no-store" in directives or "private" in directives:
+        return None
+    if "no-cache" in directives:
+        return now
+    for name in ("s-maxage", "max-age"):
+        seconds = directives.get(name)
+        if seconds is not None and seconds.isdigit():
+            return now + int(seconds)
+
+    expires = headers.get("expires")
+    if expires:
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return now  # invalid Expires means "already expired"
+    return now
+
+
+class ResponseCache:
+    """Byte-bounded LRU of fetched pages keyed by URL.
+
+    Entries are served without a request while fresh. Stale entries are kept
+    for revalidation: the fetcher sends their ``ETag``/``Last-Modified`` back as
+    ``If-None-Match``/``If-Modified-Since`` and reuses the cached body on a 304.
+
+    With ``disk_dir`` set, entries are also written there as JSON files so they
+    survive restarts and can outgrow the in-memory budget; the oldest files are
+    removed once the directory exceeds ``disk_max_bytes``.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._disk: OrderedDict[Path, int] = OrderedDict()
+        self._disk_lock = threading.RLock()
+        self.size = 0
+        self.disk_size = 0
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        if self.disk_dir is not None:
+            self._scan_disk(self.disk_dir)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 or self.disk_dir is not None
+
+    async def get(self, url: str) -> Optional[CachedResponse]:
+        """Return the entry for ``url``, fresh or stale, or ``None``."""
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+            return entry
+        if self.disk_dir is None:
+            return None
+        entry = await anyio.to_thread.run_sync(self._read_disk, url)
+        if entry is not None:
+            self._remember(url, entry)
+        return entry
+
+    def stores(self, headers: Mapping[str, str]) -> bool:
+        """Whether :meth:`put` would keep a response with ``headers``.
+
+        Lets the fetcher skip holding on to a body nothing will store.
+        """
+        if not self.enabled:
+            return False
+        headers = _lower(headers)
+        now = time.time()
+        expires = freshness(headers, now)
+        # Nothing to gain from a response that is stale and cannot be revalidated
+        return expires is not None and (
+            expires > now or bool(headers.get("etag") or headers.get("last-modified"))
+        )
+
+    async def put(
+        self, url: str, headers: Mapping[str, str], body: str, size: int
+    ) -> Optional[CachedResponse]:
+        """Store a 200 response if its headers allow it and return the entry."""
+        if not self.enabled:
+            return None
+        if not self.stores(headers):
+            await self.discard(url)
+            return None
+        headers = _lower(headers)
+        now = time.time()
+        entry = CachedResponse(
+            body=body,
+            size=size,
+            expires=freshness(headers, now) or now,
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            content_type=headers.get("content-type"),
+        )
+        await self._store(url, entry)
+        return entry
+
+    async def refresh(
+        self, url: str, entry: CachedResponse, headers: Mapping[str, str]
+    ) -> None:
+        """Update ``entry``'s freshness from the headers of a 304 response."""
+        headers = _lower(headers)
+        expires = freshness(headers, time.time())
+        if expires is None:
+            await self.discard(url)
+            return
+        entry.expires = expires
+        entry.etag = headers.get("etag", entry.etag)
+        entry.last_modified = headers.get("last-modified", entry.last_modified)
+        await self._store(url, entry)
+
+    async def discard(self, url: str) -> None:
+        """Forget ``url`` in both tiers."""
+        if url in self._entries:
+            self._drop(url)
+        if self.disk_dir is not None:
+            await anyio.to_thread.run_sync(self._remove_disk, self._disk_path(url))
+
+    def record_hit(self, entry: CachedResponse, revalidated: bool = False) -> None:
+        """Count a fetch answered from ``entry`` (after a 304 if ``revalidated``)."""
+        if revalidated:
+            self.revalidations += 1
+        else:
+            self.hits += 1
+        self.bytes_saved += entry.size
+
+    def record_miss(self) -> None:
+        """Count a fetch that had to download the body."""
+        self.misses += 1
+
+    async def _store(self, url: str, entry: CachedResponse) -> None:
+        self._remember(url, entry)
+        if self.disk_dir is not None:
+            await anyio.to_thread.run_sync(self._write_disk, url, entry)
+
+    def _remember(self, url: str, entry: CachedResponse) -> None:
+        if url in self._entries:
+            self._drop(url)
+        cost = entry.size + _ENTRY_OVERHEAD
+        if cost > self.max_bytes:
+            return
+        self._entries[url] = entry
+        self.size += cost
+        while self.size > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, url: str) -> None:
+        self.size -= self._entries.pop(url).size + _ENTRY_OVERHEAD
+
+    # -- disk tier (runs in a worker thread) ---------------------------------
+
+    def _disk_path(self, url: str) -> Path:
+        assert self.disk_dir is not None
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.disk_dir / f"{digest}.json"
+
+    def _scan_disk(self, root: Path) -> None:
+        root.mkdir(parents=True, exist_ok=True)
+        files = sorted(root.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._disk[path] = size
+            self.disk_size += size
+
+    def _read_disk(self, url: str) -> Optional[CachedResponse]:
+        path = self._disk_path(url)
+        try:
+            data: Dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.pop("url", None) != url:
+            return None  # hash collision or foreign file
+        try:
+            return CachedResponse(**data)
+        except TypeError:
+            return None
+
+    def _write_disk(self, url: str, entry: CachedResponse) -> None:
+        path = self._disk_path(url)
+        payload = json.dumps({"url": url, **asdict(entry)}).encode("utf-8")
+        with self._disk_lock:
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+            self.disk_size -= self._disk.pop(path, 0)
+            self._disk[path] = len(payload)
+            self.disk_size += len(payload)
+            while self.disk_max_bytes and self.disk_size > self.disk_max_bytes:
+                self._remove_disk(next(iter(self._disk)))
+
+    def _remove_disk(self, path: Path) -> None:
+        with self._disk_lock:
+            self.disk_size -= self._disk.pop(path, 0)
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the admin stats endpoint."""
+        lookups = self.hits + self.revalidations + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self.disk_size,
+            "disk_max_bytes": self.disk_max_bytes,
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "hit_ratio": (
+                (self.hits + self.revalidations) / lookups if lookups else 0.0
+            ),
+            "evictions": self.evictions,
+            "bytes_saved": self.bytes_saved,
+        }
@@ -0,0 +1,152 @@
+"""Watchdog that reports event-loop stalls and the tool call behind them.
+
+A tool handler that blocks (sync file I/O, NumPy work, ``time.sleep``) stalls
+every SSE stream served by the same loop. :class:`LoopMonitor` keeps a
+heartbeat coroutine ticking on the loop and a watchdog thread that notices
+when the heartbeat stops. While the loop is stuck the watchdog records which
+task is running on it, the tool call that task belongs to, and the line it is
+executing; once the loop resumes, the stall is logged with its duration.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .metrics import format_call
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["LoopMonitor"]
+
+_SOURCE_ROOT = "mcp_simple_tool"
+_LIBRARY_PATHS = tuple(
+    {sysconfig.get_paths()[key] for key in ("stdlib", "purelib", "platlib")}
+)
+
+
+def _location(frame: Optional[FrameType]) -> str:
+    """Innermost line in ``frame``'s stack that is not library code.
+
+    A handler blocked in ``pathlib`` or NumPy is reported at its own line that
+    called into them.
+    """
+    if frame is None:
+        return "unknown location"
+    stack = traceback.extract_stack(frame)
+    ours = [
+        f
+        for f in stack
+        if _SOURCE_ROOT in f.filename or not f.filename.startswith(_LIBRARY_PATHS)
+    ]
+    entry = (ours or stack)[-1]
+    return f"{entry.filename}:{entry.lineno} in {entry.name}"
+
+
+class LoopMonitor:
+    """Detect event-loop stalls longer than ``threshold`` seconds.
+
+    Register :meth:`call_started` with
+    :func:`~mcp_simple_tool.server.metrics.add_call_hook` so stalls are
+    attributed to tool calls, and run :meth:`run` on the loop to watch it.
+    """
+
+    def __init__(self, threshold: float = 0.1) -> None:
+        self.threshold = threshold
+        # Heartbeat period; a stall is seen within about a quarter threshold
+        self.interval = threshold / 4
+        self.active: Dict["asyncio.Task[Any]", Tuple[str, Dict[str, Any]]] = {}
+        self.stalls = 0
+        self.max_stall = 0.0
+        self.last_stall: Optional[str] = None
+        self._beat = time.monotonic()
+        # What blocked the loop: as logged, and without tool arguments
+        self._culprit: Optional[Tuple[str, str]] = None
+
+    def call_started(
+        self, tool: str, arguments: Dict[str, Any]
+    ) -> Optional[Callable[[float], None]]:
+        """Call hook: remember which tool call the current task is running."""
+        task = asyncio.current_task()
+        if task is None:
+            return None
+        self.active[task] = (tool, arguments)
+
+        def ended(elapsed: float) -> None:
+            self.active.pop(task, None)
+
+        return ended
+
+    async def run(self) -> None:
+        """Tick the heartbeat and run the watchdog thread until cancelled."""
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+        watchdog = threading.Thread(
+            target=self._watch,
+            args=(loop, threading.get_ident(), stop),
+            name="loop-monitor",
+            daemon=True,
+        )
+        watchdog.start()
+        try:
+            while True:
+                self._beat = time.monotonic()
+                await asyncio.sleep(self.interval)
+                lag = time.monotonic() - self._beat - self.interval
+                culprit, self._culprit = self._culprit, None
+                if culprit is not None or lag > self.threshold:
+                    unknown = "an unknown callback"
+                    self._report(lag, *(culprit or (unknown, unknown)))
+        finally:
+            stop.set()
+
+    def _report(self, lag: float, culprit: str, public: str) -> None:
+        self.stalls += 1
+        self.max_stall = max(self.max_stall, lag)
+        # Tool arguments (queries, URLs, paths) stay in the server log
+        self.last_stall = public
+        logger.warning("Event loop blocked for %.3f s by %s", lag, culprit)
+
+    def _watch(
+        self, loop: asyncio.AbstractEventLoop, thread_id: int, stop: threading.Event
+    ) -> None:
+        while not stop.wait(self.interval):
+            stalled = time.monotonic() - self._beat - self.interval
+            if self._culprit is None and stalled > self.threshold:
+                self._culprit = self._describe(loop, thread_id)
+
+    def _describe(
+        self, loop: asyncio.AbstractEventLoop, thread_id: int
+    ) -> Tuple[str, str]:
+        """Name what the loop thread is running right now.
+
+        Returns:
+            The description with the tool call's arguments, and without them
+        """
+        task = asyncio.current_task(loop)
+        where = _location(sys._current_frames().get(thread_id))
+        call = self.active.get(task) if task is not None else None
+        if call is not None:
+            return f"{format_call(*call)} at {where}", f"{call[0]} at {where}"
+        if task is not None:
+            text = f"task {task.get_name()} at {where}"
+        else:
+            text = f"a callback at {where}"
+        return text, text
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the admin stats endpoint."""
+        return {
+            "threshold": self.threshold,
+            "stalls": self.stalls,
+            "max_stall": self.max_stall,
+            "last_stall": self.last_stall,
+            "active_calls": len(self.active),
+        }
@@ -0,0 +1,361 @@
+"""Prometheus text-format metrics for ``GET /metrics``.
+
+Metrics are plain objects with ``__slots__`` whose values are updated in
+place, without locks. Every update happens on the event loop thread (or is a
+single ``+=`` under the GIL), and a scrape that races an update reads a value
+that is at most one observation old. A histogram keeps one count per bucket;
+observing a value is a bisect and two additions. Values that already live
+elsewhere (cache hit ratios, the index generation) are read when scraped.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import os
+import reprlib
+import resource
+import sys
+import time
+from bisect import bisect_left
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+__all__ = [
+    "LATENCY_BUCKETS",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "CallHook",
+    "SessionGauge",
+    "add_call_hook",
+    "format_call",
+    "instrument_tool",
+    "metrics_endpoint",
+    "monitor_loop_lag",
+    "registry",
+]
+
+# Seconds; tool calls range from cached reads to deadline-bound fetches
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+Labels = Tuple[Tuple[str, str], ...]
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+# Called with the tool name and arguments as a tool call starts; a returned
+# callable is called with the call's duration in seconds when it ends
+CallHook = Callable[[str, Dict[str, Any]], Optional[Callable[[float], None]]]
+
+_call_hooks: List[CallHook] = []
+
+_repr = reprlib.Repr()
+_repr.maxstring = 80
+_repr.maxother = 80
+
+
+class Counter:
+    """Monotonically increasing value."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def samples(self, name: str, labels: Labels) -> Iterator[str]:
+        yield _sample(name, labels, self.value)
+
+
+class Gauge:
+    """Value that goes up and down, or is read from ``fn`` at scrape time."""
+
+    __slots__ = ("value", "fn")
+
+    def __init__(self, fn: Optional[Callable[[], float]] = None) -> None:
+        self.value = 0.0
+        self.fn = fn
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def samples(self, name: str, labels: Labels) -> Iterator[str]:
+        yield _sample(name, labels, self.fn() if self.fn else self.value)
+
+
+class Histogram:
+    """Distribution of observations over fixed upper bounds.
+
+    ``counts[i]`` counts values in ``(bounds[i - 1], bounds[i]]``; the last
+    slot counts values above every bound.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def samples(self, name: str, labels: Labels) -> Iterator[str]:
+        cumulative = 0
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            cumulative += count
+            le = (("le", _number(bound)),)
+            yield _sample(f"{name}_bucket", labels + le, cumulative)
+        yield _sample(f"{name}_sum", labels, self.sum)
+        yield _sample(f"{name}_count", labels, cumulative)
+
+
+Metric = Any  # Counter, Gauge or Histogram
+
+
+def _sample(name: str, labels: Labels, value: float) -> str:
+    if labels:
+        body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+        name = f"{name}{{{body}}}"
+    return f"{name} {_number(value)}"
+
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value == int(value) else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Registry:
+    """Metric families by name, each with one child per label set."""
+
+    def __init__(self) -> None:
+        self._families: Dict[str, Tuple[str, str, Dict[Labels, Metric]]] = {}
+
+    def _child(
+        self,
+        kind: str,
+        name: str,
+        help: str,
+        labels: Dict[str, str],
+        make: Callable[[], Metric],
+    ) -> Any:
+        family = self._families.setdefault(name, (kind, help, {}))
+        if family[0] != kind:
+            raise ValueError(f"{name} is already registered as a {family[0]}")
+        key = tuple(sorted(labels.items()))
+        children = family[2]
+        if key not in children:
+            children[key] = make()
+        return children[key]
+
+    def counter(self, name: str, help: str, **labels: str) -> Counter:
+        child: Counter = self._child("counter", name, help, labels, Counter)
+        return child
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        fn: Optional[Callable[[], float]] = None,
+        **labels: str,
+    ) -> Gauge:
+        """Return the gauge ``name{labels}``; with ``fn``, it reads ``fn()``."""
+        child: Gauge = self._child("gauge", name, help, labels, lambda: Gauge(fn))
+        return child
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        **labels: str,
+    ) -> Histogram:
+        child: Histogram = self._child(
+            "histogram", name, help, labels, lambda: Histogram(buckets)
+        )
+        return child
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format (0.0.4)."""
+        lines: List[str] = []
+        for name, (kind, help, children) in self._families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, metric in list(children.items()):
+                lines.extend(metric.samples(name, labels))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def _resident_memory() -> float:
+    """Resident set size of this process in bytes.
+
+    Read from ``/proc`` on Linux; elsewhere the peak resident size is the
+    closest value the standard library offers.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+registry.gauge(
+    "process_resident_memory_bytes", "Resident memory size", fn=_resident_memory
+)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """``GET /metrics`` – every metric in the Prometheus text format."""
+    return Response(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def add_call_hook(hook: CallHook) -> None:
+    """Run ``hook`` around every call of an :func:`instrument_tool` handler."""
+    _call_hooks.append(hook)
+
+
+def format_call(tool: str, arguments: Dict[str, Any]) -> str:
+    """Render a tool call for logs, shortening long argument values."""
+    args = ", ".join(f"{k}={_repr.repr(v)}" for k, v in arguments.items())
+    return f"{tool}({args})"
+
+
+def instrument_tool(fn: F) -> F:
+    """Count calls and errors of an async tool handler and time each call.
+
+    Apply it below ``@mcp.tool`` so FastMCP still sees ``fn``'s signature. The
+    metric objects are looked up once here, not per call. Hooks added with
+    :func:`add_call_hook` run on the handler's task around the call; with
+    none added, they cost one truth test.
+    """
+    tool = fn.__name__
+    latency = registry.histogram(
+        "mcp_tool_duration_seconds", "Tool call latency", tool=tool
+    )
+    calls = registry.counter("mcp_tool_calls_total", "Tool calls", tool=tool)
+    errors = registry.counter(
+        "mcp_tool_errors_total", "Tool calls that raised", tool=tool
+    )
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        # FastMCP passes tool arguments by keyword
+        ends = [hook(tool, kwargs) for hook in _call_hooks] if _call_hooks else None
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            calls.inc()
+            latency.observe(elapsed)
+            if ends:
+                for end in ends:
+                    if end is not None:
+                        end(elapsed)
+
+    return cast(F, wrapper)
+
+
+class SessionGauge:
+    """ASGI middleware counting open requests to ``path`` (the SSE stream)."""
+
+    def __init__(self, app: ASGIApp, path: str = "/sse") -> None:
+        self.app = app
+        self.path = path
+        self.open = registry.gauge("mcp_sse_sessions", "Open SSE connections")
+        self.total = registry.counter(
+            "mcp_sse_sessions_total", "SSE connections accepted"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+        self.open.inc()
+        self.total.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.open.dec()
+
+
+async def monitor_loop_lag(interval: float) -> None:
+    """Record how late the event loop wakes from ``interval``-second sleeps.
+
+    A handler that blocks the loop delays every other coroutine, including
+    this one; the overshoot is that delay. Runs until cancelled.
+    """
+    lag = registry.histogram(
+        "mcp_event_loop_lag_seconds", "Event loop wake-up delay", LAG_BUCKETS
+    )
+    last = registry.gauge(
+        "mcp_event_loop_lag_last_seconds", "Event loop wake-up delay, last sample"
+    )
+    while True:
+        start = time.perf_counter()
+        await anyio.sleep(interval)
+        delay = max(0.0, time.perf_counter() - start - interval)
+        last.set(delay)
+        lag.observe(delay)
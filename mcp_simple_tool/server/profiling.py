@@ -0,0 +1,280 @@
+"""Sampled profiles of slow tool calls, served at ``GET /admin/profiles``.
+
+A fraction of tool calls (``MCP_PROFILE_RATE``) is profiled by a sampling
+profiler: while sampled calls run, one thread reads stacks every few
+milliseconds and attributes them to the call they belong to. On the event
+loop thread that is the call whose task is running; a worker thread belongs
+to a call while it runs a function wrapped with :func:`attributed`, which the
+search pool does. Searches a handler hands to the pool therefore show up in
+its profile, where ``cProfile`` on the event loop would miss them. Threads
+waiting on a selector, lock or queue are idle and not counted. The slowest
+profiles are kept in memory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+
+from .metrics import format_call
+
+__all__ = ["Profile", "ToolProfiler", "attributed", "profiles_endpoint"]
+
+T = TypeVar("T")
+
+# A thread whose innermost Python frame is in one of these is waiting, not busy
+_IDLE_FILES = (
+    "selectors.py",
+    "threading.py",
+    "queue.py",
+    os.path.join("concurrent", "futures", "thread.py"),
+)
+_MAX_DEPTH = 64
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def _stack(
+    frame: Optional[FrameType], root: Optional[FrameType] = None
+) -> Optional[Tuple[str, ...]]:
+    """Labels of ``frame``'s stack, outermost first.
+
+    None for an idle thread, or if ``root`` is given but not on the stack.
+    """
+    if frame is None or frame.f_code.co_filename.endswith(_IDLE_FILES):
+        return None
+    labels: List[str] = []
+    found = root is None
+    while frame is not None:
+        if len(labels) < _MAX_DEPTH:
+            labels.append(_label(frame))
+        found = found or frame is root
+        frame = frame.f_back
+    return tuple(reversed(labels)) if found else None
+
+
+class _Call:
+    """A call being sampled, with the threads that work for it."""
+
+    __slots__ = ("thread", "root", "workers", "stacks")
+
+    def __init__(self, thread: int, root: Optional[FrameType]) -> None:
+        self.thread = thread
+        # Outermost frame of the call's task: the event loop thread runs other
+        # tasks too, and its stacks count only while this frame is on them
+        self.root = root
+        self.workers: Set[int] = set()
+        self.stacks: Counter[Tuple[str, ...]] = Counter()
+
+
+_current_call: contextvars.ContextVar[Optional[_Call]] = contextvars.ContextVar(
+    "profiled_call", default=None
+)
+
+
+def attributed(fn: Callable[..., T]) -> Callable[..., T]:
+    """Wrap ``fn`` so the thread that runs it is sampled for the current call.
+
+    Use it on functions a tool handler submits to a thread pool. When the
+    current call is not being profiled ``fn`` is returned unchanged.
+    """
+    call = _current_call.get()
+    if call is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args: Any, **kwargs: Any) -> T:
+        thread = threading.get_ident()
+        call.workers.add(thread)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            call.workers.discard(thread)
+
+    return run
+
+
+@dataclass
+class Profile:
+    """Stack samples of one tool call.
+
+    ``stacks`` maps ``(thread name, outermost frame, ..., innermost frame)`` to
+    the number of samples that saw it.
+    """
+
+    call: str
+    started: float
+    duration: float
+    interval: float
+    stacks: Dict[Tuple[str, ...], int] = field(default_factory=dict)
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def top(self, n: int = 15) -> List[Tuple[str, int]]:
+        """The ``n`` frames most often on top of a stack (self time)."""
+        counts: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            counts[stack[-1]] += count
+        return counts.most_common(n)
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope."""
+        return "".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in sorted(self.stacks.items())
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "call": self.call,
+            "started": self.started,
+            "duration": self.duration,
+            "samples": self.samples,
+            "interval": self.interval,
+            "top": [{"frame": frame, "samples": n} for frame, n in self.top()],
+        }
+
+
+class ToolProfiler:
+    """Profile a random ``rate`` of tool calls and keep the ``keep`` slowest.
+
+    Register :meth:`call_started` with
+    :func:`~mcp_simple_tool.server.metrics.add_call_hook`. Calls that are not
+    sampled cost one random number. One sampler thread runs while any sampled
+    call does.
+    """
+
+    def __init__(self, rate: float, keep: int = 20, interval: float = 0.005) -> None:
+        self.rate = rate
+        self.keep = keep
+        self.interval = interval
+        self.sampled = 0
+        # Min-heap on duration: the fastest kept profile is evicted first
+        self._heap: List[Tuple[float, int, Profile]] = []
+        self._seq = itertools.count()
+        self._random = random.Random()
+        self._active: List[_Call] = []
+        self._lock = threading.Lock()
+        self._sampler: Optional[threading.Thread] = None
+
+    def call_started(
+        self, tool: str, arguments: Dict[str, Any]
+    ) -> Optional[Callable[[float], None]]:
+        """Call hook: sample a ``rate`` share of calls until they end."""
+        if self._random.random() >= self.rate:
+            return None
+        self.sampled += 1
+        name = format_call(tool, arguments)
+        started = time.time()
+        try:
+            task: Optional[asyncio.Task[Any]] = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        root = getattr(task.get_coro(), "cr_frame", None) if task else None
+        call = _Call(threading.get_ident(), root)
+        token = _current_call.set(call)
+        with self._lock:
+            self._active.append(call)
+            if self._sampler is None:
+                self._sampler = threading.Thread(
+                    target=self._sample, name="tool-profiler", daemon=True
+                )
+                self._sampler.start()
+
+        def ended(elapsed: float) -> None:
+            _current_call.reset(token)
+            with self._lock:
+                self._active.remove(call)
+                stacks = dict(call.stacks)
+            self._record(Profile(name, started, elapsed, self.interval, stacks))
+
+        return ended
+
+    def _sample(self) -> None:
+        """Attribute stacks to the active calls every ``interval`` until none are."""
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                if not self._active:
+                    self._sampler = None
+                    return
+                for call in self._active:
+                    threads = [(call.thread, call.root)]
+                    threads += [(worker, None) for worker in call.workers]
+                    for thread_id, root in threads:
+                        stack = _stack(frames.get(thread_id), root)
+                        if stack is None:
+                            continue
+                        if thread_id not in names:
+                            names = {t.ident: t.name for t in threading.enumerate()}
+                        thread = names.get(thread_id, str(thread_id))
+                        call.stacks[(thread,) + stack] += 1
+
+    def _record(self, profile: Profile) -> None:
+        entry = (profile.duration, next(self._seq), profile)
+        if len(self._heap) < self.keep:
+            heapq.heappush(self._heap, entry)
+        elif self._heap and profile.duration > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def profiles(self) -> List[Profile]:
+        """Kept profiles, slowest first."""
+        return [p for _, _, p in sorted(self._heap, reverse=True)]
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the admin stats endpoint."""
+        return {
+            "rate": self.rate,
+            "sampled": self.sampled,
+            "kept": len(self._heap),
+            "slowest": max((d for d, _, _ in self._heap), default=0.0),
+        }
+
+
+def profiles_endpoint(
+    profiler: ToolProfiler,
+) -> Callable[[Request], Awaitable[Response]]:
+    """Build ``GET /admin/profiles`` over ``profiler``.
+
+    Without parameters it lists the kept profiles (slowest first) with their
+    top frames; ``?index=N`` returns profile ``N`` in full, and
+    ``?index=N&format=collapsed`` its stacks as flame graph input.
+    """
+
+    async def endpoint(request: Request) -> Response:
+        profiles = profiler.profiles()
+        if "index" not in request.query_params:
+            return JSONResponse([p.summary() for p in profiles])
+        try:
+            profile = profiles[int(request.query_params["index"])]
+        except (ValueError, IndexError):
+            return JSONResponse({"error": "no such profile"}, status_code=404)
+        if request.query_params.get("format") == "collapsed":
+            return PlainTextResponse(profile.collapsed())
+        return JSONResponse({**profile.summary(), "collapsed": profile.collapsed()})
+
+    return endpoint
@@ -0,0 +1,46 @@
+"""Zero-downtime refresh of the semantic search index."""
+
+from __future__ import annotations
+
+import logging
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from mcp_simple_tool.semantic_search.search import reload_index
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_index() -> int:
+    """Rebuild the index in a worker thread and swap it in.
+
+    The event loop keeps serving SSE sessions and ``search_docs_tool`` calls
+    (on the previous generation) while the build runs.
+
+    Returns:
+        The generation number being served afterwards
+    """
+    return await anyio.to_thread.run_sync(reload_index)
+
+
+async def watch_index(interval: float) -> None:
+    """Check the docs folder every ``interval`` seconds and hot-swap changes."""
+    generation = 0
+    while True:
+        try:
+            new_generation = await refresh_index()
+        except Exception:  # keep watching after a failed build
+            logger.exception("Index refresh failed")
+        else:
+            if new_generation != generation:
+                logger.info("Serving search index generation %d", new_generation)
+            generation = new_generation
+        await anyio.sleep(interval)
+
+
+async def reindex_endpoint(request: Request) -> JSONResponse:
+    """``POST /admin/reindex`` – refresh the index and report the generation."""
+    generation = await refresh_index()
+    return JSONResponse({"generation": generation})
@@ -0,0 +1,112 @@
+"""Byte-bounded LRU cache of search results, scoped to one index generation."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp_simple_tool.semantic_search.store import tokenize
+
+__all__ = ["QueryCache"]
+
+Results = List[Dict[str, Any]]
+_ENTRY_OVERHEAD = 64  # rough per-entry/per-result bookkeeping, in bytes
+
+
+def _result_bytes(key: Tuple[str, int], results: Results) -> int:
+    size = len(key[0]) + _ENTRY_OVERHEAD
+    for r in results:
+        size += len(r["file"]) + len(r["excerpt"]) + _ENTRY_OVERHEAD
+    return size
+
+
+class QueryCache:
+    """LRU (optionally TTL) cache of ``search_docs_tool`` results.
+
+    Keys are the tokenised query and ``k``, so queries that differ only in case,
+    punctuation or spacing share an entry. Every entry belongs to the index
+    generation it was computed on: :meth:`invalidate` drops them all when a new
+    generation is swapped in, and results computed on an older generation are
+    never stored. Generation swaps happen on worker threads, so every method
+    holds a lock while it touches the entries.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float = 0.0) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: OrderedDict[Tuple[str, int], Tuple[float, int, Results]] = (
+            OrderedDict()
+        )
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query: str, k: int) -> Tuple[str, int]:
+        return " ".join(tokenize(query)), k
+
+    def get(self, query: str, k: int) -> Optional[Results]:
+        """Return cached results for ``query`` and ``k``, or ``None``."""
+        key = self.key(query, k)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl:
+                if time.monotonic() - entry[0] > self.ttl:
+                    self._drop(key)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, query: str, k: int, generation: int, results: Results) -> None:
+        """Store ``results`` if they were computed on the current generation."""
+        if self.max_bytes <= 0:
+            return
+        key = self.key(query, k)
+        size = _result_bytes(key, results)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic(), size, results)
+            self.size += size
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, generation: int) -> None:
+        """Forget every entry; only results of ``generation`` are cached from now."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.generation = generation
+
+    def _drop(self, key: Tuple[str, int]) -> None:
+        self.size -= self._entries.pop(key)[1]
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the admin stats endpoint."""
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "generation": self.generation,
+            "entries": entries,
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,140 @@
+"""Bounded worker pool that keeps CPU-bound search off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, get_args
+
+from mcp_simple_tool.semantic_search import search
+
+from .config import SearchPoolKind
+from .profiling import attributed
+
+T = TypeVar("T")
+
+__all__ = ["PoolTiming", "SearchPool", "SearchQueueFull"]
+
+
+class SearchQueueFull(RuntimeError):
+    """Raised when every worker is busy and the wait queue is at its limit."""
+
+
+@dataclass(frozen=True)
+class PoolTiming:
+    """Seconds a call spent queued versus running in a worker."""
+
+    wait: float
+    compute: float
+
+
+# Generation last opened by this worker process (process pools only)
+_worker_generation: Optional[int] = None
+
+
+def _timed_call(
+    generation: Optional[int], fn: Callable[..., T], *args: Any
+) -> Tuple[T, float]:
+    """Run ``fn`` in a worker and return its result with its compute time.
+
+    Process workers keep their own memory-mapped index, so they reopen it
+    whenever the parent has swapped in a new generation since their last call.
+    """
+    global _worker_generation
+    if generation and generation != _worker_generation:
+        search.reload_index(rebuild=False)
+        _worker_generation = generation
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class SearchPool:
+    """Run blocking calls in a thread or process pool with a bounded queue.
+
+    At most ``workers`` calls run at once and at most ``max_queue`` more wait
+    for a worker; further calls fail fast with :class:`SearchQueueFull` rather
+    than piling up behind a slow backlog.
+    """
+
+    def __init__(
+        self, workers: int, max_queue: int, kind: SearchPoolKind = "thread"
+    ) -> None:
+        if kind not in get_args(SearchPoolKind):
+            raise ValueError(f"Unknown pool kind: {kind!r}")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.compute_total = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="search"
+                )
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls submitted but not yet picked up by a worker."""
+        return max(0, self._in_flight - self.workers)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> Tuple[T, PoolTiming]:
+        """Run ``fn(*args)`` in the pool and return its result and timing."""
+        if self._in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise SearchQueueFull(
+                f"Search queue is full ({self.max_queue} waiting); retry later"
+            )
+
+        if self.kind == "process":
+            generation = search.loaded_generation()
+        else:
+            # Sample this worker with the calling tool call's profile
+            fn, generation = attributed(fn), None
+
+        self._in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            future = self._get_executor().submit(_timed_call, generation, fn, *args)
+            result, compute = await asyncio.wrap_future(future)
+        finally:
+            self._in_flight -= 1
+
+        timing = PoolTiming(
+            wait=max(0.0, time.perf_counter() - submitted - compute), compute=compute
+        )
+        self.completed += 1
+        self.wait_total += timing.wait
+        self.compute_total += timing.compute
+        return result, timing
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the admin stats endpoint."""
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds_total": self.wait_total,
+            "compute_seconds_total": self.compute_total,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the workers; the pool is recreated lazily on next use."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,49 @@
+"""Shared helpers for the ``scripts/bench_*.py`` benchmarks.
+
+The corpus, timing and stand-in server helpers live in
+:mod:`mcp_simple_tool.benchmarks` so the ``bench`` command can use them.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+from mcp_simple_tool.benchmarks import (  # noqa: F401  (re-exported)
+    standin_server,
+    synthetic_corpus,
+    time_calls,
+    write_corpus,
+)
+
+
+def clustered_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Return ``n`` unit float32 vectors scattered around ``n / 1000`` centres.
+
+    A stand-in for embeddings, which cluster by topic.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, n // 1000), dim)).astype(np.float32)
+    rows = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        stop = min(n, start + 100_000)
+        rows[start:stop] = centers[rng.integers(0, len(centers), stop - start)]
+        rows[start:stop] += 0.5 * rng.normal(size=(stop - start, dim))
+    rows /= np.linalg.norm(rows, axis=1, keepdims=True)
+    return rows
+
+
+def percentiles(samples_ms: Sequence[float]) -> Dict[str, float]:
+    """Return p50/p95/p99/max of ``samples_ms``."""
+    ordered = sorted(samples_ms)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    return {
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1],
+    }
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""Measure recall and throughput of the IVF index against exact search.
+
+Generates clustered unit vectors (a stand-in for embeddings), trains an
+:class:`IVFIndex` once and sweeps ``nprobe``. Ground truth comes from
+:class:`ExactIndex`; recall@k is the share of the exact top k the IVF index
+returns.
+
+Usage::
+
+    python scripts/bench_ann.py --n 1000000 --dim 64 --nlist 1024 \\
+        --nprobe 1 2 4 8 16 32 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import List, Tuple
+
+import numpy as np
+from _bench_common import clustered_vectors
+
+from mcp_simple_tool.semantic_search.vector_index import (
+    ExactIndex,
+    IVFIndex,
+    VectorIndex,
+)
+
+
+def timed(index: VectorIndex, queries: np.ndarray, k: int) -> Tuple[List, float]:
+    start = time.perf_counter()
+    results = [index.search(q, k) for q in queries]
+    return results, len(queries) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument(
+        "--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64]
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    matrix = clustered_vectors(args.n, args.dim)
+    queries = matrix[rng.choice(args.n, args.queries, replace=False)]
+    queries += 0.1 * rng.normal(size=queries.shape).astype(np.float32)
+
+    truth, exact_qps = timed(ExactIndex(matrix), queries, args.k)
+    print(f"{args.n} x {args.dim} vectors, k={args.k}")
+    print(f"exact              {exact_qps:9.1f} q/s  recall 1.000")
+
+    start = time.perf_counter()
+    ivf = IVFIndex.train(matrix, args.nlist, 1)
+    print(f"IVF training ({args.nlist} lists): {time.perf_counter() - start:.1f} s")
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        results, qps = timed(ivf, queries, args.k)
+        found = sum(
+            len({i for i, _ in got} & {i for i, _ in want})
+            for got, want in zip(results, truth)
+        )
+        recall = found / sum(len(want) for want in truth)
+        print(
+            f"ivf nprobe={nprobe:<4}  {qps:9.1f} q/s  recall {recall:.3f}  "
+            f"speedup {qps / exact_qps:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
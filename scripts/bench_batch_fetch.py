@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Load-test batch fetching against local stand-in servers.
+
+Fetches ``--urls`` pages spread over ``--hosts`` stand-in servers (each answers
+after ``--delay`` seconds) one after another, as an agent making sequential
+``http_fetch_tool`` calls would, and then through ``BatchFetcher`` with the
+given global and per-host caps. Reports wall time and pages per second.
+
+Usage::
+
+    python scripts/bench_batch_fetch.py --urls 30 --hosts 3 --delay 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from contextlib import ExitStack
+from typing import List
+
+from _bench_common import standin_server
+
+from mcp_simple_tool.server import http
+from mcp_simple_tool.server.batch_fetch import BatchFetcher
+from mcp_simple_tool.server.config import Settings
+
+BODY = b"<html><body><main><p>" + b"stand-in page " * 500 + b"</p></main></body></html>"
+
+
+async def fetch_url(url: str) -> http.Page:
+    return await http.fetch(url, headers={"User-Agent": "bench"})
+
+
+async def run(urls: List[str], args: argparse.Namespace) -> None:
+    async with http.shared_client(Settings()):
+        start = time.perf_counter()
+        for url in urls:
+            await fetch_url(url)
+        sequential = time.perf_counter() - start
+        print(
+            f"sequential          {sequential * 1000:8.1f} ms  "
+            f"{len(urls) / sequential:7.1f} pages/s"
+        )
+
+        for rate in (0.0, args.host_rate):
+            fetcher = BatchFetcher(
+                args.concurrency, args.host_concurrency, rate, args.host_burst
+            )
+            start = time.perf_counter()
+            outcomes = await fetcher.fetch_all(urls, fetch_url)
+            elapsed = time.perf_counter() - start
+            assert all(o.page is not None for o in outcomes), outcomes
+            label = f"batch rate={rate:g}/s" if rate else "batch no rate limit"
+            print(
+                f"{label:<19} {elapsed * 1000:8.1f} ms  "
+                f"{len(urls) / elapsed:7.1f} pages/s  "
+                f"({sequential / elapsed:.1f}× sequential)"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--urls", type=int, default=30)
+    parser.add_argument("--hosts", type=int, default=3)
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--host-concurrency", type=int, default=2)
+    parser.add_argument("--host-rate", type=float, default=20.0)
+    parser.add_argument("--host-burst", type=int, default=5)
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        bases = [
+            stack.enter_context(standin_server(BODY, delay=args.delay))
+            for _ in range(args.hosts)
+        ]
+        urls = [f"{bases[i % len(bases)]}/page{i}" for i in range(args.urls)]
+        print(
+            f"{args.urls} URLs over {args.hosts} hosts, {args.delay * 1000:.0f} ms "
+            f"server delay, caps {args.concurrency} total / "
+            f"{args.host_concurrency} per host"
+        )
+        asyncio.run(run(urls, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""Measure index open + first-query latency as the corpus grows.
+
+Usage::
+
+    python scripts/bench_cold_start.py --docs 1000 10000 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import tempfile
+import time
+
+from _bench_common import synthetic_corpus
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from mcp_simple_tool.semantic_search.search import _sparse_cosine_similarity_search
+from mcp_simple_tool.semantic_search.store import (
+    IndexLayout,
+    analyze,
+    load_chunks,
+    load_matrix,
+    load_vocabulary,
+    read_header,
+    write_index,
+)
+
+
+def run(n_docs: int) -> None:
+    corpus = synthetic_corpus(n_docs)
+    vectorizer = TfidfVectorizer(analyzer=analyze)
+    matrix = vectorizer.fit_transform(corpus)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        layout = IndexLayout(pathlib.Path(tmp))
+        write_index(
+            layout,
+            matrix,
+            "sparse",
+            vectorizer.vocabulary_,
+            vectorizer.idf_,
+            [f"doc{i // 10}.md" for i in range(n_docs)],
+            corpus,
+        )
+
+        start = time.perf_counter()
+        header = read_header(layout)
+        vocab = load_vocabulary(layout)
+        csr = load_matrix(layout, header)
+        meta = load_chunks(layout)
+        opened = time.perf_counter()
+        results = _sparse_cosine_similarity_search(
+            csr, vocab.transform(["server session transport"]), 3
+        )
+        _ = [meta[i] for i, _score in results]
+        done = time.perf_counter()
+
+    print(
+        f"{n_docs:>8} chunks  open {(opened - start) * 1000:7.2f} ms  "
+        f"first query {(done - opened) * 1000:7.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+    for n_docs in args.docs:
+        run(n_docs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Benchmark ``read_local_doc`` with and without the chunk cache.
+
+Writes a synthetic docs folder and times two workloads: repeated reads of one
+document, and a Zipf-distributed mix over every document (a few hot docs, a
+long tail), with the cache budget set to a fraction of the corpus so the tail
+causes evictions.
+
+Usage::
+
+    python scripts/bench_doc_cache.py --docs 500 --words 3000 --budget 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+import tempfile
+import time
+from typing import List, Optional
+
+from _bench_common import percentiles, write_corpus
+
+from mcp_simple_tool.server import doc_reader
+from mcp_simple_tool.server.doc_cache import DocCache
+
+
+def run(names: List[str], cache: Optional[DocCache]) -> List[float]:
+    samples = []
+    for name in names:
+        start = time.perf_counter()
+        doc_reader.read_local_doc(name, cache=cache)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: List[float], cache: Optional[DocCache]) -> None:
+    stats = percentiles(samples)
+    line = (
+        f"{label:<22} p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms  "
+        f"p99 {stats['p99_ms']:7.3f} ms"
+    )
+    if cache is not None:
+        line += f"  hit ratio {cache.stats()['hit_ratio']:.2f}"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--words", type=int, default=3000)
+    parser.add_argument("--reads", type=int, default=5000)
+    parser.add_argument(
+        "--budget", type=float, default=0.25, help="cache size / corpus size"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib.Path(tmp)
+        write_corpus(root, args.docs, args.words)
+        doc_reader.DOC_ROOT = root
+        names = sorted(p.name for p in root.glob("*.md"))
+        corpus_bytes = sum(p.stat().st_size for p in root.glob("*.md"))
+        print(
+            f"{len(names)} docs, {corpus_bytes / 1e6:.1f} MB, "
+            f"cache budget {args.budget:.0%} of corpus"
+        )
+
+        rng = random.Random(0)
+        weights = [1.0 / (rank + 1) for rank in range(len(names))]
+        workloads = {
+            "same doc": [names[0]] * args.reads,
+            "zipf mix": rng.choices(names, weights=weights, k=args.reads),
+        }
+        for workload, sequence in workloads.items():
+            print(f"-- {workload}")
+            report("uncached", run(sequence, None), None)
+            cache = DocCache(int(corpus_bytes * args.budget), check_interval=1.0)
+            report("cached (mtime check)", run(sequence, cache), cache)
+            cache = DocCache(int(corpus_bytes * args.budget), check_interval=1.0)
+            cache.watching = True  # as with MCP_DOC_CACHE_WATCH: no stat at all
+            report("cached (watched)", run(sequence, cache), cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""Measure HTML-to-text extraction throughput and output size.
+
+Runs ``HtmlExtractor`` over a fixture corpus of HTML pages, fed in 16 KiB
+chunks as ``fetch`` does while streaming, and reports MB/s of HTML consumed and
+the extracted-to-raw size ratio. Without ``--corpus`` two synthetic corpora
+are generated: documentation-style pages (navigation, inline scripts and
+styles, an article with headings, lists, links and code), and link-dense index
+pages (tables of links, as on wiki category and search result pages). Markup
+with a tag every few characters costs far more per byte than prose, so the
+second is the one to watch.
+
+Usage::
+
+    python scripts/bench_html_extract.py --pages 200
+    python scripts/bench_html_extract.py --corpus ~/saved-pages
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import random
+import statistics
+import time
+from typing import List
+
+from _bench_common import synthetic_corpus
+
+from mcp_simple_tool.server.extract import HtmlExtractor
+
+CHUNK = 16 * 1024
+
+_BOILERPLATE_HEAD = """<!doctype html><html lang="en"><head><meta charset="utf-8">
+<title>{title}</title><link rel="stylesheet" href="/static/site.css">
+<style>{style}</style><script>{script}</script></head><body>
+<header class="site-header"><nav>{nav}</nav></header>
+<aside class="sidebar"><ul>{sidebar}</ul></aside><main><article>"""
+_BOILERPLATE_TAIL = """</article></main><footer><p>© Example Docs</p>
+<script src="/static/analytics.js"></script><script>{script}</script></footer>
+</body></html>"""
+
+
+def synthetic_pages(n_pages: int, seed: int = 0) -> List[str]:
+    """Documentation-like HTML pages with realistic amounts of boilerplate."""
+    rng = random.Random(seed)
+    texts = synthetic_corpus(n_pages * 12, words_per_doc=50, seed=seed)
+    links = "".join(f'<a href="/docs/page{i}.html">Page {i}</a>' for i in range(40))
+    sidebar = "".join(
+        f'<li><a href="/docs/s{i}.html">Section {i}</a></li>' for i in range(80)
+    )
+    style = ".x{color:#333;margin:0 auto;padding:4px}" * 150
+    script = (
+        "window.dataLayer=window.dataLayer||[];function g(){dataLayer.push(arguments)}"
+        * 60
+    )
+    pages = []
+    for p in range(n_pages):
+        body = [f"<h1>Page {p}</h1>"]
+        for s in range(4):
+            paragraphs = texts[p * 12 + s * 3 : p * 12 + s * 3 + 3]
+            body.append(f'<h2 id="s{s}">Section {s}</h2>')
+            body.extend(
+                f'<p>{text} <a href="../ref{rng.randrange(99)}.html">ref</a></p>'
+                for text in paragraphs
+            )
+            body.append(
+                "<ul>"
+                + "".join(f"<li><code>item{i}</code></li>" for i in range(5))
+                + "</ul>"
+            )
+            body.append(
+                "<pre><code>def handler(ctx):\n    return ctx.session\n</code></pre>"
+            )
+        pages.append(
+            _BOILERPLATE_HEAD.format(
+                title=f"Page {p}",
+                style=style,
+                script=script,
+                nav=links,
+                sidebar=sidebar,
+            )
+            + "\n".join(body)
+            + _BOILERPLATE_TAIL.format(script=script)
+        )
+    return pages
+
+
+def link_dense_pages(n_pages: int, rows: int = 400) -> List[str]:
+    """Index pages that are mostly tables of root-relative and external links."""
+    pages = []
+    for p in range(n_pages):
+        table = "".join(
+            f'<tr><td><a href="/wiki/Item_{p}_{i}" title="Item {i}">Item {i}</a></td>'
+            f'<td><a href="https://example.org/{p}/{i}">source</a> '
+            f'<span class="count">{i}</span></td></tr>'
+            for i in range(rows)
+        )
+        pages.append(
+            f"<!doctype html><html><head><title>Index {p}</title></head><body>"
+            f"<main><h1>Index {p}</h1><table>{table}</table></main></body></html>"
+        )
+    return pages
+
+
+def extract(page: str) -> str:
+    extractor = HtmlExtractor("https://docs.example.com/guide/")
+    for start in range(0, len(page), CHUNK):
+        extractor.feed(page[start : start + CHUNK])
+    return extractor.result()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--corpus", type=pathlib.Path, help="directory of .html files")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpora = {
+            str(args.corpus): [
+                path.read_text(encoding="utf-8", errors="replace")
+                for path in sorted(args.corpus.rglob("*.htm*"))
+            ]
+        }
+    else:
+        corpora = {
+            "documentation": synthetic_pages(args.pages),
+            "link-dense": link_dense_pages(max(1, args.pages // 10)),
+        }
+    for name, pages in corpora.items():
+        report(name, pages, args.repeat)
+
+
+def report(name: str, pages: List[str], repeat: int) -> None:
+    raw_bytes = sum(len(page.encode("utf-8")) for page in pages)
+    rates = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [extract(page) for page in pages]
+        rates.append(raw_bytes / (time.perf_counter() - start) / 1e6)
+    out_bytes = sum(len(text.encode("utf-8")) for text in outputs)
+
+    print(f"{name}: {len(pages)} pages, {raw_bytes / 1e6:.2f} MB of HTML")
+    print(f"  throughput   {statistics.median(rates):7.2f} MB/s (median of {repeat})")
+    print(
+        f"  output size  {out_bytes / 1e6:7.2f} MB  "
+        f"ratio {out_bytes / raw_bytes:.3f} ({raw_bytes / out_bytes:.1f}× smaller)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Per-request fetch latency with a fresh client per call versus a shared one.
+
+Runs against a local stand-in HTTP server, so it measures client set-up and
+connection handshakes rather than network distance.
+
+Usage::
+
+    python scripts/bench_http_client.py --requests 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from _bench_common import percentiles, standin_server
+
+from mcp_simple_tool.server import http
+from mcp_simple_tool.server.config import Settings
+
+
+async def measure(url: str, n: int) -> None:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        await http.fetch(url, headers={"User-Agent": "bench"})
+        samples.append((time.perf_counter() - start) * 1000)
+    stats = percentiles(samples)
+    print(
+        f"  p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms  "
+        f"p99 {stats['p99_ms']:7.3f} ms"
+    )
+
+
+async def run(url: str, n: int) -> None:
+    print("client per request:")
+    await measure(url, n)
+    print("shared client:")
+    async with http.shared_client(Settings()):
+        await measure(url, n)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    with standin_server(b"x" * 4096) as url:
+        asyncio.run(run(url, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""Time full index builds: single-process scikit-learn vs. the worker pool.
+
+Writes ``--files`` synthetic Markdown documents, then runs a full
+``build_index`` with the default scikit-learn vectorizer and with the parallel
+pipeline at each ``--workers`` count, reporting wall time, files per second
+and the speed-up over one worker. Speed-ups are bounded by the number of CPUs
+(``os.cpu_count()``), which is printed first.
+
+Usage::
+
+    python scripts/bench_index_build.py --files 5000 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import tempfile
+import time
+from typing import Optional
+
+from _bench_common import write_corpus
+
+from mcp_simple_tool.semantic_search import indexing
+
+
+def timed_build(workers: Optional[int]) -> float:
+    start = time.perf_counter()
+    indexing.build_index(full=True, workers=workers)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=600)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib.Path(tmp)
+        write_corpus(root, args.files, args.words)
+        indexing.DOC_DIR = root
+        corpus_bytes = sum(p.stat().st_size for p in root.glob("*.md"))
+        print(
+            f"{args.files} files, {corpus_bytes / 1e6:.1f} MB, "
+            f"{os.cpu_count()} CPU(s)"
+        )
+
+        elapsed = timed_build(None)
+        rate = args.files / elapsed
+        print(f"{'scikit-learn':<14} {elapsed:8.2f} s  {rate:8.0f} files/s")
+        baseline = None
+        for workers in args.workers:
+            elapsed = timed_build(workers)
+            baseline = baseline or elapsed
+            print(
+                f"{f'{workers} worker(s)':<14} {elapsed:8.2f} s  "
+                f"{args.files / elapsed:8.0f} files/s  "
+                f"({baseline / elapsed:.2f}× one worker)"
+            )
+
+
+if __name__ == "__main__":
+    main()
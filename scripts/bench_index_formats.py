@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""Compare memory and per-query latency of the dense and sparse index formats.
+
+Usage::
+
+    python scripts/bench_index_formats.py --docs 2000 5000 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+from _bench_common import synthetic_corpus, time_calls
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from mcp_simple_tool.semantic_search.search import (
+    _cosine_similarity_search,
+    _sparse_cosine_similarity_search,
+)
+
+QUERIES = [
+    "how does the server handle a tool request",
+    "session lifespan context",
+    "stream transport message schema",
+]
+
+
+def run(n_docs: int, repeat: int) -> None:
+    corpus = synthetic_corpus(n_docs)
+    vectorizer = TfidfVectorizer(lowercase=True, ngram_range=(1, 2))
+    csr = sparse.csr_matrix(vectorizer.fit_transform(corpus), dtype=np.float32)
+    n_rows, n_cols = csr.shape
+    sparse_bytes = csr.data.nbytes + csr.indices.nbytes + csr.indptr.nbytes
+    dense_bytes = n_rows * n_cols * 4
+
+    print(f"\n{n_docs} chunks × {n_cols} terms")
+    print(f"  sparse: {sparse_bytes / 2**20:10.1f} MiB")
+    print(f"  dense:  {dense_bytes / 2**20:10.1f} MiB")
+
+    q_sparse = [
+        sparse.csr_matrix(vectorizer.transform([q]), dtype=np.float32) for q in QUERIES
+    ]
+    stats = time_calls(
+        lambda: [_sparse_cosine_similarity_search(csr, q, 5) for q in q_sparse],
+        repeat,
+    )
+    print(f"  sparse query: {stats['mean_ms'] / len(QUERIES):8.3f} ms")
+
+    if dense_bytes > 2 * 2**30:
+        print("  dense query:  skipped (matrix would exceed 2 GiB)")
+        return
+    dense = csr.toarray()
+    q_dense = [q.toarray()[0] for q in q_sparse]
+    stats = time_calls(
+        lambda: [_cosine_similarity_search(dense, q, 5) for q in q_dense], repeat
+    )
+    print(f"  dense query:  {stats['mean_ms'] / len(QUERIES):8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, nargs="+", default=[1000, 4000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for n_docs in args.docs:
+        run(n_docs, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""Compare float32 scoring with float16/int8 quantized scoring plus re-ranking.
+
+Scores the same queries against the float32 matrix and against its float16
+and int8 copies, re-ranking the best k×N candidates of a quantized scan with
+the float32 rows. Reports the bytes scanned per query, latency and recall@k
+against the float32 top k. Two matrices are measured: a dense TF-IDF matrix
+of a synthetic corpus, as stored in ``.vector_index.npy``, and clustered unit
+vectors standing in for embeddings.
+
+Usage::
+
+    python scripts/bench_quantize.py --docs 20000 --vocab 2000 --n 1000000 --dim 64
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Dict, List, Tuple
+
+import numpy as np
+from _bench_common import clustered_vectors, synthetic_corpus, time_calls
+
+from mcp_simple_tool.semantic_search.store import analyze, tfidf_rows
+from mcp_simple_tool.semantic_search.vector_index import (
+    ExactIndex,
+    QuantizedVectors,
+    VectorIndex,
+)
+
+
+def tfidf_matrix(n_docs: int, vocab_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Dense TF-IDF rows of a synthetic corpus and TF-IDF rows of sampled queries."""
+    corpus = synthetic_corpus(n_docs, vocab_size=vocab_size)
+    vocabulary: Dict[str, int] = {}
+    for text in corpus:
+        # Unigrams only: with bigrams the dense matrix would not fit in memory
+        for term in analyze(text):
+            if " " not in term:
+                vocabulary.setdefault(term, len(vocabulary))
+    idf = np.ones(len(vocabulary))
+    csr = tfidf_rows(corpus, lambda t: vocabulary.get(t, -1), idf)
+    queries = [" ".join(text.split()[:4]) for text in corpus[:: max(1, n_docs // 50)]]
+    q_rows = tfidf_rows(queries, lambda t: vocabulary.get(t, -1), idf)
+    return csr.toarray().astype(np.float32), q_rows.toarray().astype(np.float32)
+
+
+def run(
+    label: str, matrix: np.ndarray, queries: np.ndarray, args: argparse.Namespace
+) -> None:
+    k = args.k
+    exact = ExactIndex(matrix)
+    truth = [[i for i, _ in exact.search(q, k)] for q in queries]
+    print(f"\n{label}: {matrix.shape[0]} x {matrix.shape[1]}, k={k}")
+    base = time_calls(lambda: [exact.search(q, k) for q in queries], args.repeat)
+    base_ms = base["mean_ms"] / len(queries)
+    print(
+        f"  {'float32':<18} {matrix.nbytes / 1e6:8.1f} MB  "
+        f"{base_ms:8.3f} ms/query  recall 1.000"
+    )
+    for dtype in ("float16", "int8"):
+        quantized = QuantizedVectors.encode(matrix, dtype)
+        size = quantized.codes.nbytes + quantized.scales.nbytes
+        for rerank in args.rerank:
+            index: VectorIndex = ExactIndex(matrix, quantized, rerank)
+            found: List[List[int]] = [
+                [i for i, _ in index.search(q, k)] for q in queries
+            ]
+            recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+            stats = time_calls(
+                lambda: [index.search(q, k) for q in queries], args.repeat
+            )
+            ms = stats["mean_ms"] / len(queries)
+            print(
+                f"  {f'{dtype} rerank={rerank}':<18} {size / 1e6:8.1f} MB  "
+                f"{ms:8.3f} ms/query  recall {recall:.3f}  "
+                f"speedup {base_ms / ms:4.2f}x"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=20_000)
+    parser.add_argument("--vocab", type=int, default=2000)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    matrix, queries = tfidf_matrix(args.docs, args.vocab)
+    run("TF-IDF", matrix, queries, args)
+    del matrix
+
+    vectors = clustered_vectors(args.n, args.dim)
+    rng = np.random.default_rng(1)
+    sample = vectors[rng.choice(args.n, args.queries, replace=False)]
+    noise = 0.1 * rng.normal(size=sample.shape).astype(np.float32)
+    run("embeddings", vectors, sample + noise, args)
+
+
+if __name__ == "__main__":
+    main()
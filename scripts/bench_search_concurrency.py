@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Show fetch latency while searches run inline versus in the search pool.
+
+A steady stream of ``fetch`` calls against a local stand-in server measures
+event-loop responsiveness while a burst of ``semantic_search`` calls runs
+either directly on the loop (the old behaviour) or through a thread or
+process ``SearchPool``.
+
+Usage::
+
+    python scripts/bench_search_concurrency.py --files 3000 --searches 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import pathlib
+import tempfile
+import time
+from typing import List
+
+from _bench_common import percentiles, standin_server, write_corpus
+
+from mcp_simple_tool.semantic_search import indexing, search
+from mcp_simple_tool.server.http import fetch
+from mcp_simple_tool.server.search_pool import SearchPool
+
+QUERY = "server session transport lifespan context"
+
+
+async def fetch_loop(url: str, stop: asyncio.Event) -> List[float]:
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await fetch(url, headers={"User-Agent": "bench"})
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+    return samples
+
+
+async def scenario(url: str, mode: str, searches: int, workers: int) -> None:
+    stop = asyncio.Event()
+    fetcher = asyncio.ensure_future(fetch_loop(url, stop))
+    await asyncio.sleep(0.2)
+
+    start = time.perf_counter()
+    if mode == "inline":
+        for _ in range(searches):
+            search.semantic_search(QUERY, 5)
+            await asyncio.sleep(0)
+    elif mode in ("thread", "process"):
+        pool = SearchPool(workers=workers, max_queue=searches, kind=mode)
+        await asyncio.gather(
+            *(pool.run(search.semantic_search, QUERY, 5) for _ in range(searches))
+        )
+        pool.shutdown()
+    else:
+        await asyncio.sleep(1.0)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    stats = percentiles(await fetcher)
+    print(
+        f"{mode:>7}: fetch p50 {stats['p50_ms']:7.2f} ms  p95 {stats['p95_ms']:7.2f} ms"
+        f"  max {stats['max_ms']:8.2f} ms  (search phase {elapsed:.2f} s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--searches", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        indexing.DOC_DIR = pathlib.Path(tmp)
+        write_corpus(indexing.DOC_DIR, args.files)
+        indexing.build_index()
+        search.current_generation()
+
+        with standin_server() as url:
+            for mode in ("idle", "inline", "thread", "process"):
+                asyncio.run(scenario(url, mode, args.searches, args.workers))
+
+
+if __name__ == "__main__":
+    main()
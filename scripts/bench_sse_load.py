@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+"""Drive concurrent MCP sessions over SSE and report latency under load.
+
+Opens ``--sessions`` MCP client sessions against a server's ``/sse``
+endpoint and calls a weighted mix of ``search_docs_tool``,
+``get_local_content_tool`` and ``http_fetch_tool`` at a total target rate.
+Calls are issued on schedule whether or not earlier ones have returned, and
+latency counts from the scheduled time, so a server that falls behind shows
+it in the tail instead of slowing the load down. Fetches go to a local
+stand-in server, so the run needs no network.
+
+Each level reports throughput, p50/p95/p99 latency, the error rate and the
+server's resident memory (from ``process_resident_memory_bytes`` on
+``/metrics``). Several ``--sessions`` values run one after the other to find
+where p99 starts to climb. Without ``--url`` a server is started on a free
+port for the run; a ``--url`` server must run on this host to reach the
+stand-in.
+
+Usage::
+
+    python scripts/bench_sse_load.py --sessions 1 10 50 100 --rate 100
+    python scripts/bench_sse_load.py --url http://localhost:7000 --sessions 20 \\
+        --mix search=6,read=3,fetch=1 --duration 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+from _bench_common import percentiles, standin_server, synthetic_corpus
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from mcp_simple_tool.server import doc_reader
+
+QUERIES = [
+    "how do I define a tool",
+    "server lifespan context",
+    "sse transport configuration",
+    "resources and prompts",
+    "client session initialize",
+    "streaming responses",
+]
+
+# Short mix names to the tool they call
+TOOLS = {
+    "search": "search_docs_tool",
+    "read": "get_local_content_tool",
+    "fetch": "http_fetch_tool",
+}
+
+
+@dataclass
+class Level:
+    """Calls made at one session count."""
+
+    sessions: int
+    samples: Dict[str, List[float]] = field(default_factory=dict)
+    errors: int = 0
+    rss: List[float] = field(default_factory=list)
+
+    @property
+    def calls(self) -> int:
+        return sum(map(len, self.samples.values())) + self.errors
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in TOOLS:
+            raise argparse.ArgumentTypeError(f"unknown tool {name!r} in --mix")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def arguments_for(
+    files: List[str], fetch_url: str
+) -> Dict[str, Callable[[random.Random, int], Dict[str, Any]]]:
+    """Build a random-arguments function per mix name."""
+    return {
+        "search": lambda rng, n: {"query": rng.choice(QUERIES), "k": 5},
+        "read": lambda rng, n: {"file": rng.choice(files), "offset": 0, "limit": 4},
+        # A fresh query string per call keeps the response cache out of it
+        "fetch": lambda rng, n: {"url": f"{fetch_url}/page?n={n}"},
+    }
+
+
+async def rss_bytes(client: httpx.AsyncClient) -> Optional[float]:
+    try:
+        response = await client.get("/metrics")
+    except httpx.HTTPError:
+        return None
+    for line in response.text.splitlines():
+        if line.startswith("process_resident_memory_bytes "):
+            return float(line.split()[1])
+    return None
+
+
+async def watch_memory(client: httpx.AsyncClient, level: Level) -> None:
+    while True:
+        rss = await rss_bytes(client)
+        if rss is not None:
+            level.rss.append(rss)
+        await asyncio.sleep(0.5)
+
+
+async def call(
+    session: ClientSession,
+    tool: str,
+    arguments: Dict[str, Any],
+    scheduled: float,
+    level: Optional[Level],
+) -> None:
+    try:
+        result = await session.call_tool(TOOLS[tool], arguments)
+        ok = not result.isError
+    except Exception:
+        ok = False
+    latency = (time.perf_counter() - scheduled) * 1000
+    if level is None:
+        return
+    if ok:
+        level.samples.setdefault(tool, []).append(latency)
+    else:
+        level.errors += 1
+
+
+async def run_session(
+    url: str,
+    schedule: Iterator[Tuple[float, str, Dict[str, Any]]],
+    start: asyncio.Future[Tuple[float, float]],
+    connected: asyncio.Queue[None],
+    level: Level,
+) -> None:
+    """Open one session, then make the calls of ``schedule`` at their times.
+
+    ``schedule`` yields (offset from the start in seconds, tool, arguments).
+    Calls scheduled before the warm-up ends are made but not recorded.
+    """
+    async with sse_client(f"{url}/sse") as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await connected.put(None)
+            t0, measure_from = await start
+            pending = set()
+            for offset, tool, arguments in schedule:
+                scheduled = t0 + offset
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                record = level if offset >= measure_from else None
+                task = asyncio.ensure_future(
+                    call(session, tool, arguments, scheduled, record)
+                )
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.wait(pending, timeout=30.0)
+
+
+def session_schedule(
+    seed: int,
+    interval: float,
+    total: float,
+    mix: Dict[str, float],
+    arguments: Dict[str, Callable[[random.Random, int], Dict[str, Any]]],
+    counter: Iterator[int],
+) -> Iterator[Tuple[float, str, Dict[str, Any]]]:
+    """Evenly spaced calls at a random phase, each tool drawn from ``mix``."""
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    offset = rng.uniform(0, interval)
+    while offset < total:
+        tool = rng.choices(names, weights)[0]
+        yield offset, tool, arguments[tool](rng, next(counter))
+        offset += interval
+
+
+async def run_level(args: argparse.Namespace, url: str, sessions: int) -> Level:
+    level = Level(sessions)
+    files = sorted(
+        str(p.relative_to(doc_reader.DOC_ROOT))
+        for p in doc_reader.DOC_ROOT.rglob("*.md")
+    )
+    arguments = arguments_for(files, args.fetch_url)
+    counter = itertools.count()
+    interval = sessions / args.rate
+    total = args.warmup + args.duration
+    loop = asyncio.get_running_loop()
+    start: asyncio.Future[Tuple[float, float]] = loop.create_future()
+    connected: asyncio.Queue[None] = asyncio.Queue()
+    tasks = [
+        asyncio.ensure_future(
+            run_session(
+                url,
+                session_schedule(i, interval, total, args.mix, arguments, counter),
+                start,
+                connected,
+                level,
+            )
+        )
+        for i in range(sessions)
+    ]
+    try:
+        for _ in range(sessions):
+            await asyncio.wait_for(connected.get(), timeout=60.0)
+    except asyncio.TimeoutError:
+        raise SystemExit(f"Could not open {sessions} sessions to {url}/sse")
+
+    async with httpx.AsyncClient(base_url=url, timeout=5.0) as client:
+        watcher = asyncio.ensure_future(watch_memory(client, level))
+        start.set_result((time.perf_counter(), args.warmup))
+        await asyncio.gather(*tasks)
+        watcher.cancel()
+    return level
+
+
+def report(level: Level, duration: float) -> None:
+    latencies = [ms for samples in level.samples.values() for ms in samples]
+    rss = f"{max(level.rss) / 2**20:7.1f}" if level.rss else "      ?"
+    if not latencies:
+        print(f"{level.sessions:>8}  no successful calls, {level.errors} errors")
+        return
+    stats = percentiles(latencies)
+    print(
+        f"{level.sessions:>8} {len(latencies) / duration:8.1f} "
+        f"{stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} "
+        f"{level.errors / level.calls:6.1%} {rss}"
+    )
+    for tool, samples in sorted(level.samples.items()):
+        stats = percentiles(samples)
+        print(
+            f"{'  ' + tool:>8} {len(samples) / duration:8.1f} "
+            f"{stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f}"
+        )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+@contextlib.contextmanager
+def local_server() -> Iterator[str]:
+    """Start ``mcp-simple-tool start`` on a free port and yield its URL."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "mcp_simple_tool", "start", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30.0
+        while True:
+            try:
+                if httpx.get(f"{url}/metrics", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise SystemExit(f"Server on port {port} did not start")
+            time.sleep(0.2)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10.0)
+
+
+async def run(args: argparse.Namespace, url: str) -> None:
+    mix = ", ".join(f"{name}={weight:g}" for name, weight in args.mix.items())
+    print(f"{url}: {args.rate:g} calls/s for {args.duration:g} s, mix {mix}")
+    print(
+        f"{'sessions':>8} {'calls/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'errors':>6} {'RSS MiB':>7}"
+    )
+    for sessions in args.sessions:
+        report(await run_level(args, url, sessions), args.duration)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", help="server base URL (default: start one)")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--rate", type=float, default=50.0, help="total calls/s")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument(
+        "--warmup", type=float, default=2.0, help="seconds not measured"
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix("search=5,read=3,fetch=2"),
+        help="tool weights, e.g. search=5,read=3,fetch=2",
+    )
+    parser.add_argument(
+        "--fetch-delay", type=float, default=0.0, help="stand-in server delay (s)"
+    )
+    args = parser.parse_args()
+
+    page = f"<html><body><article><p>{synthetic_corpus(1, 800)[0]}</p></article>"
+    with standin_server(page.encode(), args.fetch_delay) as fetch_url:
+        args.fetch_url = fetch_url
+        with contextlib.ExitStack() as stack:
+            url = args.url or stack.enter_context(local_server())
+            asyncio.run(run(args, url.rstrip("/")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""Microbenchmark top-k selection and batched query scoring.
+
+Compares a full ``argsort`` with the ``argpartition``-based ``top_k`` across
+corpus sizes, and N separate sparse queries with one stacked ``semantic_search_many``
+style matrix–matrix product.
+
+Usage::
+
+    python scripts/bench_topk.py --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+from _bench_common import time_calls
+from scipy import sparse
+
+from mcp_simple_tool.semantic_search.search import _sparse_cosine_similarity_search
+from mcp_simple_tool.semantic_search.vector_index import top_k
+
+
+def bench_selection(n: int, repeat: int) -> None:
+    sims = np.random.default_rng(0).random(n).astype(np.float32)
+    for k in (3, 20):
+        full = time_calls(lambda: np.argsort(-sims)[:k], repeat)
+        part = time_calls(lambda: top_k(sims, k), repeat)
+        print(
+            f"{n:>9} chunks  k={k:<2}  argsort {full['mean_ms']:8.3f} ms  "
+            f"argpartition {part['mean_ms']:8.3f} ms  "
+            f"({full['mean_ms'] / part['mean_ms']:.1f}×)"
+        )
+
+
+def random_csr(rows: int, cols: int, nnz_per_row: int) -> sparse.csr_matrix:
+    """Random CSR matrix with a fixed number of non-zeros per row."""
+    rng = np.random.default_rng(1)
+    indices = np.sort(rng.integers(0, cols, size=(rows, nnz_per_row)), axis=1)
+    return sparse.csr_matrix(
+        (
+            rng.random(rows * nnz_per_row, dtype=np.float32),
+            indices.ravel().astype(np.int32),
+            np.arange(0, rows * nnz_per_row + 1, nnz_per_row, dtype=np.int32),
+        ),
+        shape=(rows, cols),
+    )
+
+
+def bench_batching(n: int, n_queries: int, repeat: int) -> None:
+    n_features = 50_000
+    matrix = random_csr(n, n_features, 60)
+    queries = random_csr(n_queries, n_features, 8)
+
+    def looped() -> None:
+        for j in range(n_queries):
+            _sparse_cosine_similarity_search(matrix, queries[j], 5)
+
+    def batched() -> None:
+        sims = (matrix @ queries.T).toarray()
+        for j in range(n_queries):
+            top_k(sims[:, j], 5)
+
+    one = time_calls(looped, repeat)
+    many = time_calls(batched, repeat)
+    print(
+        f"{n:>9} chunks  {n_queries} queries  looped {one['mean_ms']:8.3f} ms  "
+        f"batched {many['mean_ms']:8.3f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for n in args.sizes:
+        bench_selection(n, args.repeat)
+    for n in args.sizes:
+        bench_batching(n, args.queries, max(3, args.repeat // 4))
+
+
+if __name__ == "__main__":
+    main()
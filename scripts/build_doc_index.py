@@ -1,9 +1,12 @@
 #!/usr/bin/env python
 """CLI helper to manually rebuild the documentation search index."""
 
-from mcp_simple_tool.semantic_search.indexing import build_index
+import sys
+
+from mcp_simple_tool.semantic_search.indexing import main
 
 if __name__ == "__main__":
     print("Building semantic-search index...")
-    build_index()
-    print("Done ✓") 
\ No newline at end of file
+    status = main()
+    print("Done ✓")
+    sys.exit(status)
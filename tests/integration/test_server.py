@@ -27,11 +27,13 @@ async def test_tool_registration():
     tools = await mcp.list_tools()
 
     # then
-    assert len(tools) == 3  # Updated to include get_local_content_tool
+    assert len(tools) == 5  # Updated to include http_fetch_many_tool
 
     tool_names = {tool.name for tool in tools}
     assert "http_fetch_tool" in tool_names
+    assert "http_fetch_many_tool" in tool_names
     assert "search_docs_tool" in tool_names
+    assert "search_docs_many_tool" in tool_names
     assert "get_local_content_tool" in tool_names
 
 
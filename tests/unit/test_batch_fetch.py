@@ -0,0 +1,119 @@
+"""Tests for concurrent batch fetching."""
+
+import asyncio
+import time
+
+import pytest
+
+from mcp_simple_tool.server.batch_fetch import BatchFetcher, TokenBucket
+from mcp_simple_tool.server.http import Page
+
+
+class Recorder:
+    """Fake fetch that records how many calls overlap, overall and per host."""
+
+    def __init__(self, delay: float = 0.02) -> None:
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.per_host: dict = {}
+        self.peak_per_host: dict = {}
+
+    async def __call__(self, url: str) -> Page:
+        host = url.split("/")[2]
+        self.active += 1
+        self.per_host[host] = self.per_host.get(host, 0) + 1
+        self.peak = max(self.peak, self.active)
+        self.peak_per_host[host] = max(
+            self.peak_per_host.get(host, 0), self.per_host[host]
+        )
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        self.per_host[host] -= 1
+        if "fail" in url:
+            raise TimeoutError
+        return Page(url, len(url))
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_respects_global_and_per_host_limits() -> None:
+    # given
+    fetcher = BatchFetcher(concurrency=4, host_concurrency=2)
+    recorder = Recorder()
+    urls = [f"https://h{i % 3}.example/{i}" for i in range(12)]
+
+    # when
+    outcomes = await fetcher.fetch_all(urls, recorder)
+
+    # then
+    assert [o.page.text for o in outcomes] == urls
+    assert recorder.peak == 4
+    assert max(recorder.peak_per_host.values()) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_reported_per_url() -> None:
+    # given
+    fetcher = BatchFetcher(concurrency=4, host_concurrency=4)
+    urls = ["https://a.example/ok", "https://a.example/fail", "not a url::"]
+
+    # when
+    outcomes = await fetcher.fetch_all(urls, Recorder(delay=0))
+
+    # then
+    assert outcomes[0].page is not None and outcomes[0].error is None
+    assert outcomes[1].error == "timed out"
+    assert outcomes[2].error == "invalid URL: expected an absolute http(s) URL"
+    assert fetcher.stats()["failed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_url_deadline_counts_time_spent_queueing() -> None:
+    # given - one slot, so the second URL waits 0.15 s before it starts
+    fetcher = BatchFetcher(concurrency=1, host_concurrency=1, timeout=0.25)
+    urls = ["https://a.example/1", "https://a.example/2"]
+
+    # when
+    outcomes = await fetcher.fetch_all(urls, Recorder(delay=0.15))
+
+    # then
+    assert outcomes[0].page is not None
+    assert outcomes[1].page is None
+    assert outcomes[1].error == "timed out after 0.25 s"
+    assert fetcher.stats()["timed_out"] == 1
+
+
+@pytest.mark.asyncio
+async def test_as_completed_yields_fastest_first() -> None:
+    # given
+    fetcher = BatchFetcher(concurrency=4, host_concurrency=4)
+
+    async def fetch(url: str) -> Page:
+        await asyncio.sleep(0.05 if url.endswith("slow") else 0)
+        return Page(url, 0)
+
+    # when
+    order = [
+        i
+        async for i, _ in fetcher.as_completed(
+            ["https://a.example/slow", "https://b.example/fast"], fetch
+        )
+    ]
+
+    # then
+    assert order == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate_after_burst() -> None:
+    # given - 2 immediate requests, then 50/s
+    bucket = TokenBucket(rate=50, burst=2)
+
+    # when
+    start = time.monotonic()
+    for _ in range(5):
+        await bucket.acquire()
+    elapsed = time.monotonic() - start
+
+    # then - three requests had to wait ~20 ms each
+    assert 0.05 <= elapsed < 0.5
@@ -0,0 +1,92 @@
+"""Tests for the built-in benchmark suite and the bench command."""
+
+import json
+import pathlib
+
+import pytest
+from click.testing import CliRunner
+
+from mcp_simple_tool.benchmarks import NOISE_FLOOR_MS, compare, run_suite
+from mcp_simple_tool.cli import cli
+
+
+def report(**p50_ms: float) -> dict:
+    return {
+        "version": 1,
+        "params": {"docs": 10, "words": 50, "repeat": 3},
+        "results": {name: {"p50_ms": ms} for name, ms in p50_ms.items()},
+    }
+
+
+def test_compare_flags_slowdowns_beyond_tolerance() -> None:
+    # given
+    baseline = report(chunk_text=1.0, fetch=2.0, gone=1.0)
+    current = report(chunk_text=1.2, fetch=3.0, new=9.0)
+
+    # when
+    regressions = compare(current, baseline, tolerance=0.25)
+
+    # then
+    assert [(r.name, r.ratio) for r in regressions] == [("fetch", 1.5)]
+
+
+def test_compare_ignores_slowdowns_under_noise_floor() -> None:
+    # given
+    baseline = report(read_local_doc=0.01)
+    current = report(read_local_doc=0.01 + NOISE_FLOOR_MS / 2)
+
+    # when / then
+    assert compare(current, baseline) == []
+
+
+def test_compare_rejects_reports_with_other_params() -> None:
+    # given
+    baseline = report(chunk_text=1.0)
+    current = report(chunk_text=1.0)
+    current["params"] = {**current["params"], "docs": 20}
+
+    # when / then
+    with pytest.raises(ValueError, match="params"):
+        compare(current, baseline)
+
+
+def test_run_suite_times_selected_benchmarks() -> None:
+    # when
+    result = run_suite(docs=5, words=50, repeat=2, only=["chunk", "read_local_doc"])
+
+    # then
+    assert result["params"] == {"docs": 5, "words": 50, "repeat": 2}
+    assert sorted(result["results"]) == [
+        "chunk_markdown",
+        "chunk_text",
+        "read_local_doc",
+        "read_local_doc.cached",
+    ]
+    for stats in result["results"].values():
+        assert 0 <= stats["min_ms"] <= stats["p50_ms"] <= stats["p95_ms"]
+
+
+def test_bench_command_exits_nonzero_on_regression(tmp_path: pathlib.Path) -> None:
+    # given
+    args = ["bench", "--docs", "3", "--words", "400", "--repeat", "2"]
+    baseline = tmp_path / "baseline.json"
+    runner = CliRunner()
+    runner.invoke(cli, args + ["--only", "chunk", "--output", str(baseline)])
+    saved = json.loads(baseline.read_text())
+    saved["results"]["chunk_markdown"]["p50_ms"] = 0.0
+    baseline.write_text(json.dumps(saved))
+
+    # when
+    result = runner.invoke(
+        cli,
+        args
+        + ["--only", "chunk_text", "--baseline", str(baseline), "--tolerance", "100"],
+    )
+    regressed = runner.invoke(
+        cli, args + ["--only", "chunk_markdown", "--baseline", str(baseline)]
+    )
+
+    # then
+    assert result.exit_code == 0
+    assert regressed.exit_code == 1
+    assert "REGRESSION chunk_markdown" in regressed.output
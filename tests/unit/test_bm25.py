@@ -0,0 +1,72 @@
+"""Tests for BM25 scoring over the inverted index."""
+
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from mcp_simple_tool.semantic_search.bm25 import B, K1, Postings
+
+
+def _exhaustive(counts: np.ndarray, terms: List[int], k: int) -> List[float]:
+    """Top-k BM25 scores computed for every chunk."""
+    n_docs = len(counts)
+    doc_len = counts.sum(axis=1)
+    df = (counts > 0).sum(axis=0)
+    scores = np.zeros(n_docs)
+    for t in terms:
+        idf = np.log1p((n_docs - df[t] + 0.5) / (df[t] + 0.5))
+        tf = counts[:, t]
+        scores += (
+            idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * doc_len / doc_len.mean()))
+        )
+    return sorted(scores[scores > 0], reverse=True)[:k]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pruned_search_matches_exhaustive_scoring(seed: int) -> None:
+    """MaxScore pruning never changes the top-k scores."""
+    # given - Zipf-like term frequencies, so common terms have long postings
+    rng = np.random.default_rng(seed)
+    n_docs, n_terms = 400, 200
+    p = 2.0 / np.arange(1, n_terms + 1)
+    counts = (rng.random((n_docs, n_terms)) < p) * rng.integers(1, 4, (n_docs, n_terms))
+    postings = Postings.from_counts(sparse.csr_matrix(counts))
+
+    for _ in range(20):
+        terms = [0, 1] + list(rng.integers(0, n_terms, 3))
+        k = int(rng.integers(1, 10))
+
+        # when
+        results: List[Tuple[int, float]] = postings.search(terms, k)
+
+        # then
+        np.testing.assert_allclose(
+            [score for _, score in results], _exhaustive(counts, terms, k), rtol=1e-5
+        )
+
+
+def test_search_ignores_unknown_terms_and_ranks_by_score() -> None:
+    # given
+    counts = sparse.csr_matrix(np.array([[1, 0], [3, 1], [0, 1]], dtype=np.float32))
+    postings = Postings.from_counts(counts)
+
+    # when
+    results = postings.search([-1, 0, 7], k=5)
+
+    # then
+    assert [doc for doc, _ in results] == [1, 0]
+    assert results[0][1] > results[1][1] > 0
+    assert postings.search([-1], k=5) == []
+
+
+def test_counts_round_trip() -> None:
+    # given
+    counts = sparse.csr_matrix(np.array([[1, 0, 2], [0, 0, 0], [0, 5, 1]]))
+
+    # when
+    restored = Postings.from_counts(counts).counts()
+
+    # then
+    np.testing.assert_array_equal(restored.toarray(), counts.toarray())
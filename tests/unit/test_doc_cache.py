@@ -0,0 +1,76 @@
+"""Tests for the local doc chunk cache."""
+
+import os
+
+import pytest
+
+from mcp_simple_tool.server.doc_cache import DocCache
+from mcp_simple_tool.server.doc_reader import read_local_doc
+
+
+@pytest.fixture
+def docs(tmp_path, monkeypatch):
+    monkeypatch.setattr("mcp_simple_tool.server.doc_reader.DOC_ROOT", tmp_path)
+    return tmp_path
+
+
+def test_hot_doc_is_served_without_file_system_access(docs) -> None:
+    # given
+    (docs / "hot.md").write_text("x" * 2500, encoding="utf-8")
+    cache = DocCache(max_bytes=1 << 20, check_interval=3600)
+    first = read_local_doc("hot.md", cache=cache)
+
+    # when - the file disappears, but the entry is still trusted
+    (docs / "hot.md").unlink()
+    again = read_local_doc("hot.md", offset=1, limit=1, cache=cache)
+
+    # then
+    assert [c.text for c in again] == [first[1].text]
+    assert again[0].meta["total_chunks"] == 3
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_changed_file_is_reread_after_check_interval(docs) -> None:
+    # given
+    doc = docs / "doc.md"
+    doc.write_text("old", encoding="utf-8")
+    cache = DocCache(max_bytes=1 << 20, check_interval=0)
+    read_local_doc("doc.md", cache=cache)
+
+    # when
+    doc.write_text("new text", encoding="utf-8")
+    os.utime(doc, ns=(1, 1))
+    chunks = read_local_doc("doc.md", cache=cache)
+
+    # then
+    assert chunks[0].text == "new text"
+    assert cache.invalidations == 1
+
+
+def test_cache_evicts_least_recently_used_by_bytes(docs) -> None:
+    # given - room for two 1 000-byte docs
+    for name in ("a", "b", "c"):
+        (docs / f"{name}.md").write_text(name * 1000, encoding="utf-8")
+    cache = DocCache(max_bytes=2200, check_interval=3600)
+    read_local_doc("a.md", cache=cache)
+    read_local_doc("b.md", cache=cache)
+    read_local_doc("a.md", cache=cache)
+
+    # when
+    read_local_doc("c.md", cache=cache)
+
+    # then
+    assert cache.get("b.md") is None
+    assert cache.get("a.md") is not None
+    assert cache.evictions == 1
+    assert cache.size <= cache.max_bytes
+
+
+def test_invalid_paths_are_never_cached(docs) -> None:
+    # given
+    cache = DocCache(max_bytes=1 << 20)
+
+    # when / then
+    with pytest.raises(Exception):
+        read_local_doc("../secret.md", cache=cache)
+    assert cache.stats()["entries"] == 0
@@ -1,7 +1,7 @@
 """Tests for doc_reader module."""
 
 import pytest
-from mcp_simple_tool.server.doc_reader import read_local_doc, DOC_ROOT
+from mcp_simple_tool.server.doc_reader import chunk_table, read_local_doc, DOC_ROOT
 
 
 def test_read_local_doc_ok(tmp_path, monkeypatch):
@@ -41,3 +41,65 @@ def test_chunking_large_text(tmp_path, monkeypatch):
     assert chunks[0].text == "a" * 1000
     assert chunks[1].text == "a" * 1000
     assert chunks[2].text == "a" * 500
+
+
+def test_paging_reads_only_the_requested_chunks(tmp_path, monkeypatch):
+    # given - multi-byte characters so byte and character offsets differ
+    text = "".join(f"{i:04d}ż" for i in range(1000))  # 5 000 characters
+    (tmp_path / "big.md").write_text(text, encoding="utf-8")
+    monkeypatch.setattr("mcp_simple_tool.server.doc_reader.DOC_ROOT", tmp_path)
+
+    # when
+    page = read_local_doc("big.md", offset=2, limit=2)
+
+    # then
+    assert [c.text for c in page] == [text[2000:3000], text[3000:4000]]
+    assert page[0].meta["chunk"] == 2
+    assert page[0].meta["total_chunks"] == 5
+    assert page[0].meta["byte_start"] == len(text[:2000].encode("utf-8"))
+    assert read_local_doc("big.md", offset=5) == []
+
+
+def test_byte_range_snaps_to_character_boundaries(tmp_path, monkeypatch):
+    # given
+    (tmp_path / "pl.md").write_text("zażółć gęślą", encoding="utf-8")
+    monkeypatch.setattr("mcp_simple_tool.server.doc_reader.DOC_ROOT", tmp_path)
+
+    # when - byte 3 falls inside "ż" and byte 7 inside "ł"
+    (chunk,) = read_local_doc("pl.md", byte_start=3, byte_end=7)
+
+    # then
+    assert chunk.text == "ół"
+    assert (chunk.meta["byte_start"], chunk.meta["byte_end"]) == (4, 8)
+    assert chunk.meta["total_bytes"] == len("zażółć gęślą".encode("utf-8"))
+
+
+def test_chunk_table_is_rebuilt_when_file_changes(tmp_path, monkeypatch):
+    # given
+    doc = tmp_path / "doc.md"
+    doc.write_text("a" * 1500, encoding="utf-8")
+    monkeypatch.setattr("mcp_simple_tool.server.doc_reader.DOC_ROOT", tmp_path)
+    assert chunk_table(doc).n_chunks == 2
+
+    # when
+    doc.write_text("b" * 3500, encoding="utf-8")
+
+    # then
+    assert chunk_table(doc).n_chunks == 4
+    assert [c.text for c in read_local_doc("doc.md", offset=3)] == ["b" * 500]
+
+
+def test_crlf_line_breaks_read_as_newlines(tmp_path, monkeypatch):
+    # given - the 1000-character chunk boundary falls inside the first \r\n
+    text = ("x" * 999 + "\r\n") * 3
+    (tmp_path / "win.md").write_bytes(text.encode("utf-8"))
+    monkeypatch.setattr("mcp_simple_tool.server.doc_reader.DOC_ROOT", tmp_path)
+
+    # when
+    chunks = read_local_doc("win.md")
+    (ranged,) = read_local_doc("win.md", byte_start=990, byte_end=1010)
+
+    # then
+    assert "".join(c.text for c in chunks) == text.replace("\r\n", "\n")
+    assert chunks[0].text.endswith("x\n")
+    assert ranged.text == "x" * 9 + "\n" + "x" * 9
@@ -0,0 +1,120 @@
+"""Tests for HTML text extraction."""
+
+from urllib.parse import urljoin
+
+import pytest
+
+from mcp_simple_tool.server.extract import HtmlExtractor, html_to_text, wants_extraction
+
+PAGE = """<!doctype html><html><head><title>Docs</title>
+<style>body { color: red }</style><script>var s = "<p>not text</p>";</script></head>
+<body><header><nav><a href="/">Home</a><a href="/docs">Docs</a></nav></header>
+<main><h1>Server &amp; Tools</h1>
+<p>The <code>FastMCP</code> class lets   you
+build servers. Read <a href="guide.html">the guide</a>.</p>
+<ol><li>install</li><li>run<ul><li>with uv</li></ul></li></ol>
+<pre><code>def f():
+    return 1
+</code></pre></main>
+<footer>© 2024 <a href="/legal">Legal</a></footer></body></html>"""
+
+EXPECTED = """# Server & Tools
+
+The `FastMCP` class lets you build servers. Read [the guide](https://ex.com/docs/guide.html).
+
+1. install
+2. run
+  - with uv
+
+```
+def f():
+    return 1
+```"""
+
+
+def test_html_to_text_keeps_main_content_as_markdown() -> None:
+    # when
+    text = html_to_text(PAGE, base_url="https://ex.com/docs/")
+
+    # then
+    assert text == EXPECTED
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 64])
+def test_extractor_output_does_not_depend_on_chunking(chunk: int) -> None:
+    # given
+    extractor = HtmlExtractor("https://ex.com/docs/")
+
+    # when
+    for start in range(0, len(PAGE), chunk):
+        extractor.feed(PAGE[start : start + chunk])
+
+    # then
+    assert extractor.result() == EXPECTED
+
+
+@pytest.mark.parametrize(
+    "href",
+    [
+        "/wiki/Item_1",
+        "/a/../b",
+        "/search?q=x",
+        "/page;v=2",
+        "//cdn.ex.com/x",
+        "https://other.org/x/y",
+        "https://ex.com/a/./b",
+        "HTTPS://ex.com/x",
+        "guide.html",
+        "mailto:someone@ex.com",
+    ],
+)
+def test_links_resolve_as_urljoin_does(href: str) -> None:
+    # given
+    base = "https://ex.com/docs/"
+
+    # when
+    text = html_to_text(f'<p><a href="{href}">x</a></p>', base_url=base)
+
+    # then
+    assert text == f"[x]({urljoin(base, href)})"
+
+
+def test_pages_without_main_keep_body_text() -> None:
+    # given
+    html = "<body><nav>menu</nav><div>first</div><div>second <b>bold</b></div></body>"
+
+    # when
+    text = html_to_text(html)
+
+    # then
+    assert text == "first\n\nsecond bold"
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<html><head><title>T</title><body><h1>Hello</h1><p>World</p></body></html>",
+        "<head><meta charset=utf-8><title>T</title><h1>Hello</h1><p>World</p>",
+    ],
+)
+def test_missing_head_end_tag_does_not_hide_the_body(html: str) -> None:
+    # when
+    text = html_to_text(html)
+
+    # then
+    assert text == "# Hello\n\nWorld"
+
+
+@pytest.mark.parametrize(
+    "mode, content_type, expected",
+    [
+        ("auto", "text/html; charset=utf-8", True),
+        ("auto", "application/xhtml+xml", True),
+        ("auto", "application/json", False),
+        ("auto", None, False),
+        ("markdown", "text/plain", True),
+        ("raw", "text/html", False),
+    ],
+)
+def test_wants_extraction(mode: str, content_type: str, expected: bool) -> None:
+    assert wants_extraction(mode, content_type) is expected
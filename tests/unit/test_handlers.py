@@ -5,12 +5,24 @@ import mcp.types as types
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
+from mcp_simple_tool.server import handlers
 from mcp_simple_tool.server.handlers import (
+    http_fetch_many_tool,
     http_fetch_tool,
+    response_cache,
+    search_cache,
     mcp,
+    search_docs_many_tool,
     search_docs_tool,
     settings,
 )
+from mcp_simple_tool.server.http import Page
+
+
+@pytest.fixture(autouse=True)
+def _empty_search_cache():
+    """Keep cached search results from leaking between tests."""
+    search_cache.invalidate(search_cache.generation)
 
 
 @pytest.mark.asyncio
@@ -20,7 +32,7 @@ async def test_tools_registration():
     tools = await mcp.list_tools()
 
     # then
-    assert len(tools) == 3
+    assert len(tools) == 5
 
     # Find the fetch tool
     fetch_tool_def = next((t for t in tools if t.name == "http_fetch_tool"), None)
@@ -48,7 +60,7 @@ async def test_tools_registration():
 async def test_fetch_tool_success():
     """Test successful fetch tool execution."""
     # given - mock the fetch function
-    mock_fetch = AsyncMock(return_value="Example content")
+    mock_fetch = AsyncMock(return_value=Page("Example content", 15))
 
     # patch the http.fetch function
     with pytest.MonkeyPatch().context() as mp:
@@ -59,13 +71,36 @@ async def test_fetch_tool_success():
 
         # then
         mock_fetch.assert_called_once_with(
-            "http://example.com", headers={"User-Agent": settings.user_agent}
+            "http://example.com",
+            headers={"User-Agent": settings.user_agent},
+            cache=response_cache,
+            max_bytes=settings.http_max_bytes,
+            deadline=settings.http_deadline,
+            extract="auto",
         )
         assert len(result) == 1
         assert isinstance(result[0], types.TextContent)
         assert result[0].text == "Example content"
 
 
+@pytest.mark.asyncio
+async def test_fetch_tool_reports_truncation(monkeypatch):
+    """A cut-short page ends with a note saying why."""
+    # given
+    page = Page("partial", 7, truncated="response exceeded 7 bytes")
+    monkeypatch.setattr(
+        "mcp_simple_tool.server.handlers.fetch", AsyncMock(return_value=page)
+    )
+
+    # when
+    result = await http_fetch_tool("http://example.com")
+
+    # then
+    assert result[0].text == (
+        "partial\n\n[Truncated: response exceeded 7 bytes; 7 bytes received]"
+    )
+
+
 @pytest.mark.asyncio
 async def test_search_docs_tool():
     """Test the search_docs_tool with mocked semantic search."""
@@ -74,7 +109,7 @@ async def test_search_docs_tool():
     with pytest.MonkeyPatch().context() as mp:
         mp.setattr(
             "mcp_simple_tool.server.handlers.semantic_search",
-            lambda query, k: [
+            lambda query, k, backend: [
                 {
                     "file": "test.md",
                     "score": 0.95,
@@ -92,3 +127,75 @@ async def test_search_docs_tool():
         assert "test.md" in result[0].text
         assert "0.950" in result[0].text
         assert "Test excerpt" in result[0].text
+
+
+def test_format_match_points_at_local_chunks():
+    """A result with a recorded span names its heading and the chunks to read."""
+    # given
+    result = {
+        "file": "server.md",
+        "score": 0.5,
+        "excerpt": "## Lifespan\n\ntext",
+        "start": 1500,
+        "end": 2100,
+        "heading": "Server > Lifespan",
+    }
+
+    # when
+    text = handlers._format_match(result)
+
+    # then
+    assert text.startswith("**server.md** › Server > Lifespan")
+    assert "get_local_content_tool offset=1 limit=2" in text
+
+
+@pytest.mark.asyncio
+async def test_search_docs_many_tool():
+    """Test that batched search returns one block per query, in order."""
+    # given
+    with pytest.MonkeyPatch().context() as mp:
+        mp.setattr(
+            "mcp_simple_tool.server.handlers.semantic_search_many",
+            lambda queries, k, backend: [
+                [{"file": f"{q}.md", "score": 0.5, "excerpt": f"about {q}"}]
+                for q in queries
+            ],
+        )
+
+        # when
+        result = await search_docs_many_tool(["alpha", "beta"], k=1)
+
+    # then
+    assert len(result) == 2
+    assert result[0].text.startswith("### alpha")
+    assert "**alpha.md**" in result[0].text
+    assert "about beta" in result[1].text
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_tool_returns_pages_and_errors_in_input_order():
+    """Each URL gets its own block, failures included, in input order."""
+
+    # given
+    async def fake_fetch(url, **kwargs):
+        if "bad" in url:
+            raise httpx.HTTPStatusError(
+                "boom", request=httpx.Request("GET", url), response=httpx.Response(404)
+            )
+        return Page(f"body of {url}", 10)
+
+    ctx = MagicMock()
+    ctx.report_progress = AsyncMock()
+    urls = ["https://a.example/1", "https://bad.example/", "https://a.example/2"]
+
+    with pytest.MonkeyPatch().context() as mp:
+        mp.setattr("mcp_simple_tool.server.handlers.fetch", fake_fetch)
+
+        # when
+        result = await http_fetch_many_tool(urls, ctx=ctx)
+
+    # then
+    assert [r.text.splitlines()[0] for r in result] == [f"### {u}" for u in urls]
+    assert result[0].text.endswith("body of https://a.example/1")
+    assert result[1].text.endswith("Error: HTTP 404")
+    assert ctx.report_progress.await_count == 3
@@ -1,10 +1,17 @@
 """Tests for HTTP utilities."""
 
+import asyncio
+import threading
+
 import httpx
 import pytest
 import respx
 
+from mcp_simple_tool.server import http
+from mcp_simple_tool.server.config import Settings
 from mcp_simple_tool.server.http import fetch
+from mcp_simple_tool.server.http_cache import ResponseCache
+from mcp_simple_tool.server.singleflight import SingleFlight
 
 
 @respx.mock
@@ -17,10 +24,11 @@ async def test_fetch_success():
     )
 
     # when
-    text = await fetch("https://example.com", headers={"User-Agent": "Test Agent"})
+    page = await fetch("https://example.com", headers={"User-Agent": "Test Agent"})
 
     # then
-    assert text == "ok"
+    assert page.text == "ok"
+    assert page.truncated is None
     assert route.called
     assert route.calls[0].request.headers["User-Agent"] == "Test Agent"
 
@@ -35,3 +43,395 @@ async def test_fetch_error():
     # when/then
     with pytest.raises(httpx.HTTPStatusError):
         await fetch("https://example.com", headers={"User-Agent": "Test Agent"})
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_fetch_reuses_shared_client():
+    """Fetches inside the lifespan go through the one pooled client."""
+    # given
+    respx.get("https://example.com").mock(return_value=httpx.Response(200, text="ok"))
+
+    # when
+    async with http.shared_client(Settings(http_max_connections=5)) as client:
+        assert http._client is client
+        texts = [
+            (await fetch("https://example.com", headers={})).text for _ in range(2)
+        ]
+
+    # then
+    assert texts == ["ok", "ok"]
+    assert client.is_closed
+    assert http._client is None
+
+
+def test_app_lifespan_opens_and_closes_shared_client():
+    """The Starlette lifespan owns the shared client."""
+    # given
+    from starlette.testclient import TestClient
+
+    from mcp_simple_tool.server.app import starlette_app
+
+    # when
+    with TestClient(starlette_app):
+        client = http._client
+
+        # then
+        assert client is not None and not client.is_closed
+    assert client.is_closed
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_fetch_serves_fresh_responses_from_cache():
+    """A page within its max-age is not requested again."""
+    # given
+    cache = ResponseCache(max_bytes=10_000)
+    route = respx.get("https://example.com").mock(
+        return_value=httpx.Response(
+            200, text="page", headers={"Cache-Control": "max-age=60"}
+        )
+    )
+
+    # when
+    texts = [
+        (await fetch("https://example.com", {}, cache=cache)).text for _ in range(3)
+    ]
+
+    # then
+    assert texts == ["page"] * 3
+    assert route.call_count == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["bytes_saved"] == 2 * len("page")
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_fetch_revalidates_stale_responses():
+    """A stale page is revalidated and a 304 reuses the cached body."""
+    # given
+    cache = ResponseCache(max_bytes=10_000)
+    route = respx.get("https://example.com").mock(
+        side_effect=[
+            httpx.Response(
+                200,
+                text="page",
+                headers={
+                    "ETag": '"v1"',
+                    "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+                },
+            ),
+            httpx.Response(304),
+        ]
+    )
+
+    # when
+    first = await fetch("https://example.com", {}, cache=cache)
+    second = await fetch("https://example.com", {}, cache=cache)
+
+    # then
+    assert first.text == second.text == "page"
+    conditional = route.calls[1].request.headers
+    assert conditional["If-None-Match"] == '"v1"'
+    assert conditional["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert cache.stats()["revalidations"] == 1
+
+
+@pytest.mark.parametrize(
+    "headers, stored",
+    [
+        ({"Cache-Control": "no-store"}, False),
+        ({"Cache-Control": "private, max-age=60"}, False),
+        ({}, False),
+        ({"Cache-Control": "no-cache", "ETag": '"v1"'}, True),
+        ({"Expires": "Thu, 01 Jan 2099 00:00:00 GMT"}, True),
+    ],
+)
+@pytest.mark.asyncio
+async def test_response_cache_obeys_cache_control(headers, stored):
+    # given
+    cache = ResponseCache(max_bytes=10_000)
+
+    # when
+    await cache.put("https://example.com", headers, "page", 4)
+
+    # then
+    assert (await cache.get("https://example.com") is not None) is stored
+
+
+@pytest.mark.asyncio
+async def test_response_cache_evicts_by_bytes_and_persists_to_disk(tmp_path):
+    # given - memory holds one entry, disk holds everything
+    cache = ResponseCache(max_bytes=1_000, disk_dir=str(tmp_path))
+    headers = {"Cache-Control": "max-age=60"}
+    await cache.put("https://a.example", headers, "a" * 600, 600)
+    await cache.put("https://b.example", headers, "b" * 600, 600)
+
+    # when - a fresh cache over the same directory
+    reopened = ResponseCache(max_bytes=1_000, disk_dir=str(tmp_path))
+    entry = await reopened.get("https://a.example")
+
+    # then
+    assert cache.evictions == 1
+    assert cache.stats()["entries"] == 1
+    assert entry is not None and entry.body == "a" * 600 and entry.is_fresh()
+    assert reopened.stats()["disk_entries"] == 2
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_concurrent_identical_fetches_share_one_request():
+    """Simultaneous fetches of one URL are coalesced into a single request."""
+    # given
+    release = asyncio.Event()
+
+    async def slow_page(request):
+        await release.wait()
+        return httpx.Response(200, text="page")
+
+    route = respx.get("https://example.com/").mock(side_effect=slow_page)
+    urls = [
+        "https://example.com",
+        "HTTPS://EXAMPLE.COM:443/#top",
+        "https://example.com/",
+    ]
+
+    # when
+    tasks = [asyncio.create_task(fetch(url, {"User-Agent": "t"})) for url in urls]
+    await asyncio.sleep(0.01)
+    release.set()
+    pages = await asyncio.gather(*tasks)
+
+    # then
+    assert [page.text for page in pages] == ["page"] * 3
+    assert route.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors_and_survives_cancellation():
+    # given
+    flight: SingleFlight[str] = SingleFlight()
+    release = asyncio.Event()
+    started = 0
+
+    async def call() -> str:
+        nonlocal started
+        started += 1
+        await release.wait()
+        raise ValueError("upstream failed")
+
+    first = asyncio.create_task(flight.run("key", call))
+    second = asyncio.create_task(flight.run("key", call))
+    await asyncio.sleep(0)
+
+    # when - one waiter gives up, the other still gets the shared outcome
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    # then
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    with pytest.raises(ValueError, match="upstream failed"):
+        await second
+    assert started == 1
+    assert flight.stats()["coalesced"] == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancels_call_when_last_waiter_leaves():
+    # given
+    flight: SingleFlight[str] = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def call() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "never"
+
+    waiter = asyncio.create_task(flight.run("key", call))
+    await asyncio.sleep(0)
+
+    # when
+    waiter.cancel()
+    await asyncio.sleep(0.01)
+
+    # then
+    assert cancelled.is_set()
+    assert flight.stats()["in_flight"] == 0
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_fetch_stops_reading_at_the_byte_limit():
+    """Only max_bytes of an oversized body are read and decoded."""
+    # given - a UTF-8 body whose limit falls inside a multi-byte character
+    body = ("zażółć " * 1000).encode("utf-8")
+    respx.get("https://example.com").mock(
+        return_value=httpx.Response(
+            200, stream=httpx.ByteStream(body), headers={"Content-Type": "text/plain"}
+        )
+    )
+    cache = ResponseCache(max_bytes=100_000)
+
+    # when
+    page = await fetch("https://example.com", {}, cache=cache, max_bytes=100)
+
+    # then
+    assert page.size == 100
+    assert page.truncated == "response exceeded 100 bytes"
+    assert body.decode("utf-8").startswith(page.text.rstrip("�"))
+    assert await cache.get("https://example.com") is None
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_fetch_keeps_partial_body_at_the_deadline():
+    """A body still streaming at the deadline is returned as far as it got."""
+
+    # given
+    class Trickle(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield b"first part "
+            await asyncio.sleep(10)
+            yield b"never sent"
+
+    respx.get("https://example.com").mock(
+        return_value=httpx.Response(200, stream=Trickle())
+    )
+
+    # when
+    page = await fetch("https://example.com", {}, deadline=0.05)
+
+    # then
+    assert page.text == "first part "
+    assert page.truncated == "download stopped after the 0.05 s deadline"
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_fetch_times_out_without_response():
+    # given
+    async def hang(request):
+        await asyncio.sleep(10)
+
+    respx.get("https://example.com").mock(side_effect=hang)
+
+    # when/then
+    with pytest.raises(TimeoutError):
+        await fetch("https://example.com", {}, deadline=0.05)
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_fetch_extracts_html_and_caches_the_raw_body():
+    """In auto mode HTML is reduced to text; the cache keeps the original."""
+    # given
+    html = "<html><head><script>x()</script></head><body><p>Hello</p></body></html>"
+    respx.get("https://example.com").mock(
+        return_value=httpx.Response(
+            200,
+            text=html,
+            headers={"Content-Type": "text/html", "Cache-Control": "max-age=60"},
+        )
+    )
+    cache = ResponseCache(max_bytes=10_000)
+
+    # when
+    extracted = await fetch("https://example.com", {}, cache=cache, extract="auto")
+    raw = await fetch("https://example.com", {}, cache=cache, extract="raw")
+
+    # then
+    assert extracted.text == "Hello"
+    assert raw.text == html
+    assert cache.stats()["hits"] == 1
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_fetch_decodes_unknown_charset_as_utf8():
+    """A charset label Python does not know falls back to UTF-8."""
+    # given
+    respx.get("https://example.com").mock(
+        return_value=httpx.Response(
+            200,
+            content="<p>zażółć</p>".encode("utf-8"),
+            headers={"Content-Type": "text/html; charset=bogus-enc"},
+        )
+    )
+
+    # when
+    page = await fetch("https://example.com", {})
+
+    # then
+    assert page.text == "<p>zażółć</p>"
+
+
+@pytest.mark.parametrize(
+    "cache_bytes, cache_control",
+    [(0, "max-age=60"), (10_000, "no-store")],
+)
+@respx.mock
+@pytest.mark.asyncio
+async def test_fetch_drops_the_raw_body_when_nothing_stores_it(
+    monkeypatch, cache_bytes, cache_control
+):
+    """Extracted pages keep no copy of the markup for a cache that won't take it."""
+    # given
+    readers = []
+
+    class SpyReader(http._BodyReader):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            readers.append(self)
+
+    monkeypatch.setattr(http, "_BodyReader", SpyReader)
+    respx.get("https://example.com").mock(
+        return_value=httpx.Response(
+            200,
+            text="<p>Hello</p>",
+            headers={"Content-Type": "text/html", "Cache-Control": cache_control},
+        )
+    )
+    cache = ResponseCache(max_bytes=cache_bytes)
+
+    # when
+    page = await fetch("https://example.com", {}, cache=cache, extract="auto")
+
+    # then
+    assert page.text == "Hello"
+    assert readers[0].raw_text() == ""
+    assert await cache.get("https://example.com") is None
+
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_fetch_extracts_html_off_the_event_loop(monkeypatch):
+    """Parsing runs in worker threads, so a large page does not block the loop."""
+    # given
+    threads = set()
+    feed = http.HtmlExtractor.feed
+
+    def spy(self, data):
+        threads.add(threading.get_ident())
+        feed(self, data)
+
+    monkeypatch.setattr(http.HtmlExtractor, "feed", spy)
+    html = "<p>" + "<a href='/x'>link</a> " * 20_000 + "</p>"
+    respx.get("https://example.com").mock(
+        return_value=httpx.Response(
+            200, text=html, headers={"Content-Type": "text/html"}
+        )
+    )
+
+    # when
+    page = await fetch("https://example.com", {}, extract="auto")
+
+    # then
+    assert page.text.startswith("[link](https://example.com/x) [link]")
+    assert threads and threading.get_ident() not in threads
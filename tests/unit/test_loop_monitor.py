@@ -0,0 +1,65 @@
+"""Tests for the event-loop stall monitor."""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from mcp_simple_tool.server import metrics
+from mcp_simple_tool.server.loop_monitor import LoopMonitor
+from mcp_simple_tool.server.metrics import instrument_tool
+
+
+@instrument_tool
+async def blocking_tool(path: str, seconds: float) -> str:
+    time.sleep(seconds)  # a sync call inside an async handler
+    return path
+
+
+@instrument_tool
+async def polite_tool(seconds: float) -> None:
+    await asyncio.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_monitor_names_the_blocking_tool_call(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    # given
+    monitor = LoopMonitor(threshold=0.05)
+    monkeypatch.setattr(metrics, "_call_hooks", [monitor.call_started])
+    runner = asyncio.ensure_future(monitor.run())
+    await asyncio.sleep(0.05)
+
+    # when
+    with caplog.at_level(logging.WARNING):
+        await blocking_tool(path="guide.md", seconds=0.3)
+        await asyncio.sleep(0.05)
+    runner.cancel()
+
+    # then
+    assert monitor.stalls == 1
+    assert monitor.max_stall >= 0.2
+    assert "blocking_tool(path='guide.md', seconds=0.3)" in caplog.text
+    assert "test_loop_monitor.py" in caplog.text
+    assert monitor.stats()["last_stall"].startswith("blocking_tool at ")
+    assert "guide.md" not in monitor.stats()["last_stall"]
+    assert monitor.active == {}
+
+
+@pytest.mark.asyncio
+async def test_monitor_ignores_handlers_that_await(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # given
+    monitor = LoopMonitor(threshold=0.05)
+    monkeypatch.setattr(metrics, "_call_hooks", [monitor.call_started])
+    runner = asyncio.ensure_future(monitor.run())
+
+    # when
+    await asyncio.gather(*(polite_tool(seconds=0.1) for _ in range(5)))
+    runner.cancel()
+
+    # then
+    assert monitor.stalls == 0
@@ -0,0 +1,126 @@
+"""Tests for the Prometheus metrics registry and /metrics endpoint."""
+
+import asyncio
+import time
+
+import anyio
+import pytest
+from starlette.testclient import TestClient
+
+from mcp_simple_tool.server import handlers
+from mcp_simple_tool.server.app import starlette_app
+from mcp_simple_tool.server.metrics import (
+    Histogram,
+    Registry,
+    instrument_tool,
+    monitor_loop_lag,
+    registry,
+)
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    # given
+    reg = Registry()
+    hist = reg.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0), tool="t")
+
+    # when
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value)
+    text = reg.render()
+
+    # then
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{tool="t",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{tool="t",le="1"} 3' in text
+    assert 'latency_seconds_bucket{tool="t",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{tool="t"} 4' in text
+    assert 'latency_seconds_sum{tool="t"} 3.65' in text
+
+
+def test_registry_returns_the_same_child_and_rejects_kind_clash() -> None:
+    # given
+    reg = Registry()
+    first = reg.counter("calls_total", "Calls", tool="a")
+
+    # when
+    again = reg.counter("calls_total", "Calls", tool="a")
+
+    # then
+    assert again is first
+    with pytest.raises(ValueError):
+        reg.gauge("calls_total", "Calls")
+
+
+@pytest.mark.asyncio
+async def test_instrument_tool_counts_calls_and_errors() -> None:
+    # given
+    @instrument_tool
+    async def flaky_tool(fail: bool) -> str:
+        if fail:
+            raise RuntimeError("boom")
+        return "ok"
+
+    # when
+    assert await flaky_tool(False) == "ok"
+    with pytest.raises(RuntimeError):
+        await flaky_tool(fail=True)
+
+    # then
+    assert registry.counter("mcp_tool_calls_total", "", tool="flaky_tool").value == 2
+    assert registry.counter("mcp_tool_errors_total", "", tool="flaky_tool").value == 1
+    latency = registry.histogram("mcp_tool_duration_seconds", "", tool="flaky_tool")
+    assert isinstance(latency, Histogram) and latency.count == 2
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_a_blocked_loop() -> None:
+    # given
+    lag = registry.histogram("mcp_event_loop_lag_seconds", "")
+    before = lag.sum
+
+    # when
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(monitor_loop_lag, 0.01)
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # blocks the loop
+        await asyncio.sleep(0.05)
+        tg.cancel_scope.cancel()
+
+    # then
+    assert lag.sum - before >= 0.05
+
+
+def test_metrics_endpoint_exposes_tool_and_cache_metrics() -> None:
+    # given
+    client = TestClient(starlette_app)
+    handlers.fetch_bytes.inc(42)
+
+    # when
+    response = client.get("/metrics")
+
+    # then
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'mcp_tool_calls_total{tool="search_docs_tool"}' in text
+    assert 'mcp_cache_hit_ratio{cache="doc"}' in text
+    assert "mcp_sse_sessions 0" in text
+    assert "mcp_search_index_generation" in text
+    assert float(text.split("\nmcp_fetch_bytes_total ")[1].split()[0]) >= 42
+    rss = float(text.split("\nprocess_resident_memory_bytes ")[1].split()[0])
+    assert rss > 1 << 20
+
+
+def test_admin_stats_is_restricted_to_loopback_clients() -> None:
+    # given - stats include where the loop last stalled and cache sizes
+    local = TestClient(starlette_app, client=("127.0.0.1", 50000))
+    remote = TestClient(starlette_app, client=("203.0.113.9", 50000))
+
+    # when
+    allowed = local.get("/admin/stats")
+    refused = remote.get("/admin/stats")
+
+    # then
+    assert allowed.status_code == 200
+    assert "http_cache" in allowed.json()
+    assert refused.status_code == 403
@@ -0,0 +1,143 @@
+"""Tests for the sampled tool-call profiler."""
+
+import asyncio
+import time
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from mcp_simple_tool.server import metrics
+from mcp_simple_tool.server.app import starlette_app
+from mcp_simple_tool.server.metrics import instrument_tool
+from mcp_simple_tool.server.profiling import Profile, ToolProfiler, profiles_endpoint
+from mcp_simple_tool.server.search_pool import SearchPool
+
+
+def crunch(seconds: float) -> int:
+    end, n = time.perf_counter() + seconds, 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+pool = SearchPool(workers=2, max_queue=4)
+
+
+@instrument_tool
+async def offloading_tool(seconds: float) -> int:
+    result, _timing = await pool.run(crunch, seconds)
+    return result
+
+
+@instrument_tool
+async def blocking_tool(seconds: float) -> int:
+    return crunch(seconds)
+
+
+@instrument_tool
+async def sleeping_tool(seconds: float) -> None:
+    await asyncio.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_sampled_call_profiles_its_search_pool_worker(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # given
+    profiler = ToolProfiler(rate=1.0, keep=5, interval=0.002)
+    monkeypatch.setattr(metrics, "_call_hooks", [profiler.call_started])
+
+    # when
+    await offloading_tool(seconds=0.2)
+
+    # then
+    [profile] = profiler.profiles()
+    assert profile.call == "offloading_tool(seconds=0.2)"
+    assert profile.duration >= 0.2
+    assert profile.samples > 10
+    assert profile.top(1)[0][0].startswith("crunch (test_profiling.py")
+    assert any(line.startswith("search_") for line in profile.collapsed().splitlines())
+
+
+@pytest.mark.asyncio
+async def test_overlapping_calls_only_see_their_own_stacks(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # given
+    profiler = ToolProfiler(rate=1.0, keep=5, interval=0.002)
+    monkeypatch.setattr(metrics, "_call_hooks", [profiler.call_started])
+
+    # when - one call blocks the loop and another runs in the pool while a
+    # third is suspended
+    await asyncio.gather(
+        sleeping_tool(seconds=0.5),
+        offloading_tool(seconds=0.2),
+        blocking_tool(seconds=0.2),
+    )
+
+    # then
+    profiles = {p.call.split("(")[0]: p for p in profiler.profiles()}
+    assert profiles["sleeping_tool"].samples == 0
+    offloaded = profiles["offloading_tool"].collapsed().splitlines()
+    blocked = profiles["blocking_tool"].collapsed().splitlines()
+    assert any(line.startswith("search_") for line in offloaded)
+    assert not any("blocking_tool" in line for line in offloaded)
+    assert any("blocking_tool" in line for line in blocked)
+    assert not any(line.startswith("search_") for line in blocked)
+
+
+def test_unsampled_calls_are_not_profiled() -> None:
+    # given
+    profiler = ToolProfiler(rate=0.0)
+
+    # when
+    ended = profiler.call_started("search_docs_tool", {"query": "x"})
+
+    # then
+    assert ended is None
+    assert profiler.stats()["sampled"] == 0
+
+
+def test_only_the_slowest_profiles_are_kept() -> None:
+    # given
+    profiler = ToolProfiler(rate=1.0, keep=3)
+
+    # when
+    for duration in (0.5, 0.1, 0.9, 0.3, 0.7):
+        profiler._record(Profile(f"call({duration})", 0.0, duration, 0.005))
+
+    # then
+    assert [p.duration for p in profiler.profiles()] == [0.9, 0.7, 0.5]
+
+
+def test_profiles_endpoint_lists_and_dumps_profiles() -> None:
+    # given
+    profiler = ToolProfiler(rate=1.0)
+    stacks = {("MainThread", "main (app.py:1)", "slow (search.py:9)"): 7}
+    profiler._record(Profile("search_docs_tool(query='x')", 0.0, 1.5, 0.005, stacks))
+    app = Starlette(routes=[Route("/admin/profiles", profiles_endpoint(profiler))])
+    client = TestClient(app)
+
+    # when
+    listing = client.get("/admin/profiles").json()
+    collapsed = client.get("/admin/profiles?index=0&format=collapsed").text
+    missing = client.get("/admin/profiles?index=3")
+
+    # then
+    assert listing[0]["call"] == "search_docs_tool(query='x')"
+    assert listing[0]["top"] == [{"frame": "slow (search.py:9)", "samples": 7}]
+    assert collapsed == "MainThread;main (app.py:1);slow (search.py:9) 7\n"
+    assert missing.status_code == 404
+
+
+def test_profiles_endpoint_rejects_remote_clients() -> None:
+    # given - recorded arguments may hold queries, URLs and file paths
+    client = TestClient(starlette_app, client=("203.0.113.9", 50000))
+
+    # when
+    response = client.get("/admin/profiles")
+
+    # then
+    assert response.status_code == 403
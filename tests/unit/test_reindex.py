@@ -0,0 +1,91 @@
+"""Tests for the index hot-swap endpoint and watcher."""
+
+from typing import Dict
+
+import anyio
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from mcp_simple_tool.server import reindex
+from mcp_simple_tool.server.admin import admin_only
+from mcp_simple_tool.server.app import starlette_app
+
+
+def test_reindex_endpoint_reports_generation(monkeypatch: pytest.MonkeyPatch) -> None:
+    # given
+    monkeypatch.setattr(reindex, "reload_index", lambda: 7)
+    client = TestClient(starlette_app, client=("127.0.0.1", 50000))
+
+    # when
+    response = client.post("/admin/reindex")
+
+    # then
+    assert response.status_code == 200
+    assert response.json() == {"generation": 7}
+
+
+def test_reindex_endpoint_rejects_remote_clients(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # given
+    calls = []
+    monkeypatch.setattr(reindex, "reload_index", lambda: calls.append(1) or 7)
+    client = TestClient(starlette_app, client=("203.0.113.9", 50000))
+
+    # when
+    response = client.post("/admin/reindex")
+
+    # then
+    assert response.status_code == 403
+    assert calls == []
+
+
+@pytest.mark.parametrize(
+    "headers, status",
+    [
+        ({}, 401),
+        ({"Authorization": "Bearer wrong"}, 401),
+        ({"Authorization": "Bearer s3cret"}, 200),
+    ],
+)
+def test_admin_token_is_required_when_configured(
+    monkeypatch: pytest.MonkeyPatch, headers: Dict[str, str], status: int
+) -> None:
+    # given
+    calls = []
+    monkeypatch.setattr(reindex, "reload_index", lambda: calls.append(1) or 7)
+    endpoint = admin_only(reindex.reindex_endpoint, token="s3cret")
+    app = Starlette(routes=[Route("/admin/reindex", endpoint, methods=["POST"])])
+    client = TestClient(app, client=("203.0.113.9", 50000))
+
+    # when
+    response = client.post("/admin/reindex", headers=headers)
+
+    # then
+    assert response.status_code == status
+    assert len(calls) == (status == 200)
+
+
+@pytest.mark.asyncio
+async def test_watch_index_survives_failed_builds(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # given
+    calls = []
+
+    def flaky_reload() -> int:
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return len(calls)
+
+    monkeypatch.setattr(reindex, "reload_index", flaky_reload)
+
+    # when
+    with anyio.move_on_after(0.2):
+        await reindex.watch_index(0.01)
+
+    # then
+    assert len(calls) > 2
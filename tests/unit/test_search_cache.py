@@ -0,0 +1,103 @@
+"""Tests for the search result cache."""
+
+import threading
+
+import pytest
+
+from mcp_simple_tool.server import handlers
+from mcp_simple_tool.server.search_cache import QueryCache
+
+RESULTS = [{"file": "a.md", "score": 0.5, "excerpt": "x" * 100}]
+
+
+def test_cache_normalises_queries_and_counts_hits() -> None:
+    # given
+    cache = QueryCache(max_bytes=10_000)
+    cache.put("How do I run  the Server?", 3, 0, RESULTS)
+
+    # when
+    hit = cache.get("how do i run the server", 3)
+    miss = cache.get("how do i run the server", 5)
+
+    # then
+    assert hit == RESULTS
+    assert miss is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_evicts_least_recently_used_by_bytes() -> None:
+    # given - room for two entries only
+    cache = QueryCache(max_bytes=600)
+    cache.put("one", 3, 0, RESULTS)
+    cache.put("two", 3, 0, RESULTS)
+    cache.get("one", 3)
+
+    # when
+    cache.put("three", 3, 0, RESULTS)
+
+    # then
+    assert cache.get("two", 3) is None
+    assert cache.get("one", 3) == RESULTS
+    assert cache.size <= cache.max_bytes
+    assert cache.evictions == 1
+
+
+def test_cache_drops_entries_of_old_generations() -> None:
+    # given
+    cache = QueryCache(max_bytes=10_000)
+    cache.put("query", 3, 0, RESULTS)
+
+    # when - a new generation is swapped in, then a stale result arrives
+    cache.invalidate(1)
+    cache.put("stale", 3, 0, RESULTS)
+
+    # then
+    assert cache.get("query", 3) is None
+    assert cache.get("stale", 3) is None
+
+
+def test_cache_survives_invalidation_from_another_thread() -> None:
+    # given - generation swaps run on worker threads, lookups on the loop
+    cache = QueryCache(max_bytes=10_000)
+    stop = threading.Event()
+
+    def swap_generations() -> None:
+        generation = 0
+        while not stop.is_set():
+            generation += 1
+            cache.invalidate(generation)
+
+    swapper = threading.Thread(target=swap_generations)
+    swapper.start()
+
+    # when
+    try:
+        for i in range(20_000):
+            cache.put(f"query {i % 7}", 3, cache.generation, RESULTS)
+            cache.get(f"query {i % 7}", 3)
+    finally:
+        stop.set()
+        swapper.join()
+
+    # then
+    assert cache.hits + cache.misses == 20_000
+
+
+@pytest.mark.asyncio
+async def test_search_docs_tool_serves_repeats_from_cache(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # given
+    calls = []
+    monkeypatch.setattr(handlers, "search_cache", QueryCache(max_bytes=10_000))
+    monkeypatch.setattr(
+        handlers, "semantic_search", lambda q, k, backend: calls.append(q) or RESULTS
+    )
+
+    # when
+    first = await handlers.search_docs_tool("cached query", 3)
+    second = await handlers.search_docs_tool("Cached  query!", 3)
+
+    # then
+    assert calls == ["cached query"]
+    assert first == second
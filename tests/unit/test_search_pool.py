@@ -0,0 +1,65 @@
+"""Tests for the bounded search worker pool."""
+
+import asyncio
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from mcp_simple_tool.server.config import Settings
+from mcp_simple_tool.server.search_pool import SearchPool, SearchQueueFull
+
+
+@pytest.mark.asyncio
+async def test_pool_keeps_event_loop_responsive() -> None:
+    # given
+    pool = SearchPool(workers=1, max_queue=4)
+    ticks = []
+
+    async def ticker() -> None:
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    # when - a blocking call runs while the loop keeps ticking
+    (result, timing), _ = await asyncio.gather(
+        pool.run(lambda: time.sleep(0.1) or "done"), ticker()
+    )
+    pool.shutdown()
+
+    # then
+    assert result == "done"
+    assert timing.compute >= 0.1
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.08
+
+
+@pytest.mark.asyncio
+async def test_pool_rejects_when_queue_is_full() -> None:
+    # given
+    pool = SearchPool(workers=1, max_queue=1)
+    slow = [asyncio.ensure_future(pool.run(time.sleep, 0.05)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    # when / then
+    with pytest.raises(SearchQueueFull):
+        await pool.run(time.sleep, 0)
+    timings = [timing for _, timing in await asyncio.gather(*slow)]
+    pool.shutdown()
+
+    assert pool.stats()["rejected"] == 1
+    # the queued call waited for the first one to finish
+    assert max(t.wait for t in timings) >= 0.04
+
+
+@pytest.mark.parametrize(
+    "name, value", [("MCP_SEARCH_BACKEND", "cosine"), ("MCP_SEARCH_POOL", "fork")]
+)
+def test_settings_reject_unknown_search_backend_and_pool(
+    monkeypatch: pytest.MonkeyPatch, name: str, value: str
+) -> None:
+    # given
+    monkeypatch.setenv(name, value)
+
+    # when / then - a typo fails at startup, not on the first search
+    with pytest.raises(ValidationError):
+        Settings()
@@ -1,12 +1,14 @@
 """Unit tests for the semantic search functionality."""
 
+import json
 import pathlib
 from unittest.mock import patch, MagicMock
 
 import numpy as np
 import pytest
+from scipy import sparse
 
-from mcp_simple_tool.semantic_search import indexing, search
+from mcp_simple_tool.semantic_search import indexing, search, store, vector_index
 
 
 @patch("mcp_simple_tool.semantic_search.indexing.TfidfVectorizer")
@@ -23,6 +25,45 @@ def test_chunker_roundtrip(mock_vectorizer: MagicMock) -> None:
     assert "".join(pieces[:1]) in txt
 
 
+def test_chunk_markdown_follows_headings_and_fences() -> None:
+    """Chunks break at headings, keep code fences whole and record their spans."""
+    # given
+    text = (
+        "# Server\n\nIntro.\n\n## Lifespan\n\nStartup.\n\n"
+        "```python\n# not a heading\n\nrun()\n```\n\n### Hooks\nLast.\n"
+    )
+
+    # when
+    chunks = indexing.chunk_markdown("s.md", text)
+
+    # then
+    assert [c.headings for c in chunks] == [
+        ("Server",),
+        ("Server", "Lifespan"),
+        ("Server", "Lifespan", "Hooks"),
+    ]
+    assert [text[c.start : c.end] for c in chunks] == [c.text for c in chunks]
+    assert chunks[1].text.startswith("## Lifespan")
+    assert chunks[1].text.endswith("run()\n```")
+    assert chunks[2].index_text == "Server > Lifespan > Hooks\n\n### Hooks\nLast."
+
+
+def test_chunk_markdown_splits_oversized_sections() -> None:
+    """Sections over the budget are cut between words, never mid-word."""
+    # given
+    text = "## Big\n\n" + "word " * 100
+
+    # when
+    chunks = indexing.chunk_markdown("b.md", text, max_chars=120)
+
+    # then
+    assert len(chunks) > 1
+    assert all(len(c.text) <= 120 + len("## Big\n\n") for c in chunks)
+    assert all(c.text.split()[-1] == "word" for c in chunks)
+    assert all(c.headings == ("Big",) for c in chunks)
+    assert chunks[0].text.startswith("## Big")
+
+
 def test_iter_files_finds_docs(monkeypatch: pytest.MonkeyPatch) -> None:
     """Test that iter_files finds documentation files."""
     # given
@@ -111,3 +152,341 @@ def test_semantic_search(mock_load_assets: MagicMock) -> None:
     assert results[0]["score"] == 0.9
     assert results[0]["excerpt"] == "content1"
     assert results[1]["file"] == "file3.md"
+
+
+def test_sparse_cosine_similarity_matches_dense() -> None:
+    """Sparse scoring ranks chunks exactly like the dense path."""
+    # given
+    dense = np.array(
+        [
+            [1.0, 0.0, 0.0],
+            [0.6, 0.8, 0.0],
+            [0.0, 0.0, 1.0],
+        ],
+        dtype=np.float32,
+    )
+    query = np.array([0.0, 2.0, 0.0], dtype=np.float32)
+
+    # when
+    res = search._sparse_cosine_similarity_search(
+        sparse.csr_matrix(dense), sparse.csr_matrix(query), k=2
+    )
+
+    # then
+    assert res == search._cosine_similarity_search(dense, query, k=2)
+    assert res[0][0] == 1
+    assert res[0][1] == pytest.approx(0.8)
+
+
+@patch("mcp_simple_tool.semantic_search.indexing.TfidfVectorizer")
+def test_build_index_sparse_roundtrip(
+    mock_vectorizer_cls: MagicMock,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The sparse format is saved as CSR arrays and memory-mapped on load."""
+    # given
+    (tmp_path / "a.md").write_text("alpha", encoding="utf-8")
+    matrix = sparse.csr_matrix(np.array([[0.0, 1.0, 0.0]]))
+    vectorizer = mock_vectorizer_cls.return_value
+    vectorizer.fit_transform.return_value = matrix
+    vectorizer.vocabulary_ = {"a": 0, "b": 1, "c": 2}
+    vectorizer.idf_ = np.ones(3)
+    monkeypatch.setattr(indexing, "DOC_DIR", tmp_path)
+    monkeypatch.setattr(search, "_generation", None)
+
+    # when
+    indexing.build_index()
+    vocab, loaded, meta = search._load_assets()
+
+    # then
+    assert not (tmp_path / ".vector_index.npy").exists()
+    assert sparse.issparse(loaded)
+    assert loaded.dtype == np.float32
+    assert not loaded.data.flags.owndata  # read-only view of the mapped file
+    assert not loaded.data.flags.writeable
+    np.testing.assert_array_equal(loaded.toarray(), matrix.toarray())
+    assert vocab.lookup("b") == 1
+    assert meta[0] == {
+        "file": "a.md",
+        "text": "alpha",
+        "start": 0,
+        "end": 5,
+        "heading": "",
+    }
+
+
+def test_string_table_roundtrip(tmp_path: pathlib.Path) -> None:
+    """Strings survive the blob + offsets encoding, including non-ASCII text."""
+    # given
+    strings = ["", "zażółć", "plain"]
+    paths = (tmp_path / "t.bin", tmp_path / "t.offsets.npy")
+
+    # when
+    store.StringTable.write(strings, *paths)
+    table = store.StringTable.open(*paths)
+
+    # then
+    assert list(table) == strings
+    assert table[-1] == "plain"
+
+
+def test_vocabulary_transform_matches_tfidf_weighting() -> None:
+    """Query encoding applies counts × idf, L2-normalises and skips OOV terms."""
+    # given
+    terms = ["alpha", "alpha beta", "beta"]
+    blob = np.frombuffer("".join(terms).encode(), dtype=np.uint8)
+    offsets = np.cumsum([0] + [len(t) for t in terms])
+    vocab = store.Vocabulary(
+        store.StringTable(blob, offsets),
+        ids=np.array([2, 0, 1]),
+        idf=np.array([1.0, 1.0, 3.0]),
+    )
+
+    # when
+    row = vocab.transform(["Alpha beta gamma"]).toarray()[0]
+
+    # then
+    expected = np.array([1.0, 1.0, 3.0]) / np.sqrt(11.0)
+    np.testing.assert_allclose(row, expected, rtol=1e-6)
+
+
+@patch("mcp_simple_tool.semantic_search.indexing.TfidfVectorizer")
+def test_build_index_incremental_reindexes_changed_files_only(
+    mock_vectorizer_cls: MagicMock,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Only modified files are re-vectorised; removed files lose their rows."""
+    # given - a full build over three one-chunk files
+    vocabulary = {"alpha": 0, "beta": 1, "delta": 2}
+    vectorizer = mock_vectorizer_cls.return_value
+    vectorizer.fit_transform.side_effect = lambda chunks: store.tfidf_rows(
+        chunks, lambda t: vocabulary.get(t, -1), np.ones(3)
+    )
+    vectorizer.vocabulary_ = vocabulary
+    vectorizer.idf_ = np.ones(3)
+    for name, text in [("a.md", "alpha"), ("b.md", "beta"), ("d.md", "delta")]:
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    monkeypatch.setattr(indexing, "DOC_DIR", tmp_path)
+    monkeypatch.setattr(search, "_generation", None)
+    indexing.build_index()
+
+    # when - edit one file, delete another and rebuild incrementally
+    (tmp_path / "b.md").write_text("beta gamma", encoding="utf-8")
+    (tmp_path / "d.md").unlink()
+    indexing.build_index()
+    vocab, matrix, meta = search._load_assets()
+
+    # then
+    assert vectorizer.fit_transform.call_count == 1
+    assert [m["file"] for m in meta] == ["a.md", "b.md"]
+    assert meta[1]["text"] == "beta gamma"
+    assert (meta[1]["start"], meta[1]["end"]) == (0, 10)
+    assert vocab.lookup("gamma") == 3
+    assert matrix.shape == (2, 5)
+    query = vocab.transform(["gamma"])
+    assert search._sparse_cosine_similarity_search(matrix, query, k=1)[0][0] == 1
+
+
+@patch("mcp_simple_tool.semantic_search.indexing.TfidfVectorizer")
+def test_interrupted_incremental_build_leaves_no_header(
+    mock_vectorizer_cls: MagicMock,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A crash mid-splice must not leave the old header over mixed files."""
+    # given - a full build over two one-chunk files
+    vocabulary = {"alpha": 0, "beta": 1}
+    vectorizer = mock_vectorizer_cls.return_value
+    vectorizer.fit_transform.side_effect = lambda chunks: store.tfidf_rows(
+        chunks, lambda t: vocabulary.get(t, -1), np.ones(2)
+    )
+    vectorizer.vocabulary_ = vocabulary
+    vectorizer.idf_ = np.ones(2)
+    for name, text in [("a.md", "alpha"), ("b.md", "beta")]:
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    monkeypatch.setattr(indexing, "DOC_DIR", tmp_path)
+    indexing.build_index()
+    layout = indexing.index_layout()
+    assert store.read_header(layout)
+
+    def crash(*args: object) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(indexing, "write_postings", crash)
+
+    # when - the incremental build fails after rewriting the matrix
+    (tmp_path / "b.md").write_text("beta gamma", encoding="utf-8")
+    with pytest.raises(OSError):
+        indexing.build_index()
+
+    # then
+    assert store.read_header(layout) == {}
+
+
+def test_reload_index_swaps_generation_only_on_change(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """In-flight holders keep the old generation; new callers see the new one."""
+    # given
+    changed = [True, False]
+    monkeypatch.setattr(search, "build_index", lambda: changed.pop(0))
+    monkeypatch.setattr(
+        search, "_open_generation", lambda n: search.IndexGeneration(n, *[None] * 3)
+    )
+    monkeypatch.setattr(search, "_generation", search.IndexGeneration(1, *[None] * 3))
+    monkeypatch.setattr(search, "_listeners", [])
+    swapped = []
+    search.on_generation_change(lambda g: swapped.append(g.number))
+    in_flight = search.current_generation()
+
+    # when
+    first = search.reload_index()
+    second = search.reload_index()
+
+    # then
+    assert (first, second) == (2, 2)
+    assert swapped == [2]
+    assert in_flight.number == 1
+    assert search.current_generation().number == 2
+
+
+@pytest.mark.parametrize("k", [1, 3, 10])
+def test_top_k_matches_full_sort(k: int) -> None:
+    """Partial selection returns the same ranking as a full argsort."""
+    # given
+    sims = np.random.default_rng(0).random(50).astype(np.float32)
+
+    # when
+    res = vector_index.top_k(sims, k)
+
+    # then
+    assert [i for i, _ in res] == list(np.argsort(-sims)[:k])
+
+
+@patch("mcp_simple_tool.semantic_search.search._load_assets")
+def test_semantic_search_many_scores_each_query(mock_load_assets: MagicMock) -> None:
+    """All queries are scored in one product and ranked independently."""
+    # given
+    matrix = sparse.csr_matrix(np.eye(3, dtype=np.float32))
+    vectorizer = MagicMock()
+    vectorizer.transform.return_value = sparse.csr_matrix(
+        np.array([[0, 0, 1], [1, 0, 0]], dtype=np.float32)
+    )
+    meta = [{"file": f"f{i}.md", "text": f"t{i}"} for i in range(3)]
+    mock_load_assets.return_value = (vectorizer, matrix, meta)
+
+    # when
+    results = search.semantic_search_many(["q1", "q2"], k=1)
+
+    # then
+    vectorizer.transform.assert_called_once_with(["q1", "q2"])
+    assert [r[0]["file"] for r in results] == ["f2.md", "f0.md"]
+    assert results[0][0]["score"] == pytest.approx(1.0)
+
+
+@patch("mcp_simple_tool.semantic_search.indexing.TfidfVectorizer")
+def test_build_index_rebuilds_outdated_format(
+    mock_vectorizer_cls: MagicMock,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """An index written in an older on-disk format is rebuilt in full."""
+    # given
+    (tmp_path / "a.md").write_text("# Title\n\nalpha", encoding="utf-8")
+    vectorizer = mock_vectorizer_cls.return_value
+    vectorizer.fit_transform.return_value = sparse.csr_matrix(np.ones((1, 1)))
+    vectorizer.vocabulary_ = {"alpha": 0}
+    vectorizer.idf_ = np.ones(1)
+    monkeypatch.setattr(indexing, "DOC_DIR", tmp_path)
+    indexing.build_index()
+    layout = indexing.index_layout()
+    header = store.read_header(layout)
+    layout.header.write_text(json.dumps({**header, "version": 1}))
+
+    # when
+    changed = indexing.build_index()
+
+    # then
+    assert changed
+    assert vectorizer.fit_transform.call_count == 2
+    assert store.is_current(store.read_header(layout))
+    assert store.load_chunks(layout)[0]["heading"] == "Title"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_build_computes_tfidf_over_merged_vocabulary(
+    workers: int, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Per-batch vocabularies merge into smooth-IDF, L2-normalised rows."""
+    # given - more files than one batch holds
+    texts = {
+        f"d{i}.md": f"# Doc {i}\n\nshared words and term{i}\n\n## Part\n\nterm{i}"
+        for i in range(5)
+    }
+    for name, text in texts.items():
+        (tmp_path / name).write_text(text, encoding="utf-8")
+    monkeypatch.setattr(indexing, "DOC_DIR", tmp_path)
+    monkeypatch.setattr(indexing, "BATCH_FILES", 2)
+    layout = indexing.index_layout()
+
+    # when
+    indexing.build_index(full=True, workers=workers)
+    matrix = store.load_matrix(layout, store.read_header(layout))
+    vocab = store.load_vocabulary(layout)
+    meta = store.load_chunks(layout)
+
+    # then
+    chunks = [
+        c
+        for name in dict.fromkeys(m["file"] for m in meta)
+        for c in indexing.chunk_document(name, texts[name])
+    ]
+    assert [(m["file"], m["text"], m["heading"]) for m in meta] == [
+        (c.file_path, c.text, c.heading) for c in chunks
+    ]
+    rows = [set(store.analyze(c.index_text)) for c in chunks]
+    assert list(vocab.terms) == sorted(set().union(*rows))
+    df = np.asarray([sum(t in r for r in rows) for t in vocab.terms])
+    idf = np.log((1 + len(chunks)) / (1 + df)) + 1
+    np.testing.assert_allclose(vocab.idf, idf, rtol=1e-6)
+    expected = store.tfidf_rows([c.index_text for c in chunks], vocab.lookup, idf)
+    np.testing.assert_allclose(matrix.toarray(), expected.toarray(), rtol=1e-5)
+
+
+@patch("mcp_simple_tool.semantic_search.indexing.TfidfVectorizer")
+def test_bm25_backend_sees_incremental_changes(
+    mock_vectorizer_cls: MagicMock,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Postings are spliced like the vectors, so BM25 finds newly added terms."""
+    # given
+    vocabulary = {"alpha": 0, "beta": 1}
+    vectorizer = mock_vectorizer_cls.return_value
+    vectorizer.fit_transform.side_effect = lambda chunks: store.tfidf_rows(
+        chunks, lambda t: vocabulary.get(t, -1), np.ones(2)
+    )
+    vectorizer.vocabulary_ = vocabulary
+    vectorizer.idf_ = np.ones(2)
+    (tmp_path / "a.md").write_text("alpha alpha beta", encoding="utf-8")
+    (tmp_path / "b.md").write_text("beta", encoding="utf-8")
+    monkeypatch.setattr(indexing, "DOC_DIR", tmp_path)
+    monkeypatch.setattr(search, "_generation", None)
+    indexing.build_index()
+
+    # when
+    (tmp_path / "b.md").write_text("beta gamma gamma", encoding="utf-8")
+    indexing.build_index()
+    gamma = search.semantic_search("gamma", k=3, backend="bm25")
+    alpha = search.semantic_search("alpha", k=3, backend="bm25")
+
+    # then
+    assert [r["file"] for r in gamma] == ["b.md"]
+    assert [r["file"] for r in alpha] == ["a.md"]
+    counts = store.load_postings(indexing.index_layout()).counts().toarray()
+    # columns: alpha, beta, then gamma, "beta gamma", "gamma gamma" from b.md
+    assert counts.tolist() == [[2, 1, 0, 0, 0], [0, 1, 2, 1, 1]]
+    with pytest.raises(ValueError):
+        search.semantic_search("alpha", backend="cosine")
@@ -0,0 +1,157 @@
+"""Tests for the pluggable nearest-neighbour indexes."""
+
+import pathlib
+
+import numpy as np
+import pytest
+
+from mcp_simple_tool.semantic_search import indexing, store
+from mcp_simple_tool.semantic_search.vector_index import (
+    AnnParams,
+    ExactIndex,
+    IVFIndex,
+    QuantizedVectors,
+    open_vector_index,
+    write_vector_index,
+)
+
+
+def _clustered(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    rows = centers[rng.integers(0, clusters, n)] + 0.3 * rng.normal(size=(n, dim))
+    rows /= np.linalg.norm(rows, axis=1, keepdims=True)
+    return rows.astype(np.float32)
+
+
+def test_ivf_scanning_every_list_is_exact() -> None:
+    # given
+    matrix = _clustered(500, 16, 8)
+    ivf = IVFIndex.train(matrix, nlist=10, nprobe=10)
+    query = matrix[3] + 0.1
+
+    # when
+    approx = ivf.search(query, k=5)
+
+    # then
+    assert [i for i, _ in approx] == [i for i, _ in ExactIndex(matrix).search(query, 5)]
+    assert ivf.list_ptr[-1] == len(matrix)
+    assert sorted(ivf.order) == list(range(len(matrix)))
+
+
+def test_ivf_recall_with_few_probes() -> None:
+    """Probing a fraction of the lists still finds most true neighbours."""
+    # given
+    matrix = _clustered(2000, 16, 20)
+    ivf = IVFIndex.train(matrix, nlist=20, nprobe=3)
+    exact = ExactIndex(matrix)
+    queries = matrix[::40] + 0.05
+
+    # when
+    hits = sum(
+        len({i for i, _ in ivf.search(q, 10)} & {i for i, _ in exact.search(q, 10)})
+        for q in queries
+    )
+
+    # then
+    assert hits / (10 * len(queries)) > 0.9
+
+
+def test_open_vector_index_falls_back_when_matrix_changed(
+    tmp_path: pathlib.Path,
+) -> None:
+    # given
+    layout = store.IndexLayout(tmp_path)
+    matrix = _clustered(200, 8, 4)
+    np.save(layout.dense, matrix)
+    write_vector_index(layout, AnnParams("ivf", nlist=4, nprobe=2), matrix)
+    trained = layout.array("ivf_centroids").stat().st_mtime_ns
+
+    # when
+    write_vector_index(layout, AnnParams("ivf", nlist=4, nprobe=4), matrix)
+    reopened = open_vector_index(layout, matrix)
+    np.save(layout.dense, matrix[:100])
+    stale = open_vector_index(layout, matrix[:100])
+
+    # then
+    assert isinstance(reopened, IVFIndex)
+    assert reopened.nprobe == 4
+    assert layout.array("ivf_centroids").stat().st_mtime_ns == trained
+    assert isinstance(stale, ExactIndex)
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_quantized_scores_are_close(dtype: str) -> None:
+    # given
+    matrix = _clustered(300, 32, 6)
+    query = matrix[7]
+
+    # when
+    quantized = QuantizedVectors.encode(matrix, dtype)
+
+    # then
+    assert quantized.codes.dtype == np.dtype(dtype)
+    assert quantized.codes.nbytes <= matrix.nbytes // 2
+    np.testing.assert_allclose(quantized.scores(query), matrix @ query, atol=0.02)
+    rows = np.array([5, 1, 250])
+    np.testing.assert_allclose(
+        quantized.scores(query, rows), quantized.scores(query)[rows], rtol=1e-6
+    )
+
+
+def test_quantized_search_reranks_with_exact_scores() -> None:
+    # given
+    matrix = _clustered(2000, 32, 20)
+    quantized = QuantizedVectors.encode(matrix, "int8")
+    exact = ExactIndex(matrix)
+    approx = ExactIndex(matrix, quantized, rerank=4)
+    queries = matrix[::50] + 0.05
+
+    # when
+    found = approx.search_many(queries, 10)
+
+    # then
+    want = exact.search_many(queries, 10)
+    assert found[0] == approx.search(queries[0], 10)
+    hits = sum(len({i for i, _ in f} & {i for i, _ in w}) for f, w in zip(found, want))
+    assert hits / (10 * len(queries)) > 0.95
+    for row, score in found[1]:
+        assert score == pytest.approx(
+            float(matrix[row] @ (queries[1] / np.linalg.norm(queries[1]))), abs=1e-6
+        )
+
+
+def test_quantized_ivf_round_trip(tmp_path: pathlib.Path) -> None:
+    # given
+    layout = store.IndexLayout(tmp_path)
+    matrix = _clustered(400, 16, 4)
+    np.save(layout.dense, matrix)
+    params = AnnParams("ivf", nlist=4, nprobe=4, quantize="int8")
+    write_vector_index(layout, params, matrix)
+    encoded = layout.array("quant_codes").stat().st_mtime_ns
+
+    # when
+    write_vector_index(layout, AnnParams("ivf", 4, 4, "int8", rerank=8), matrix)
+    index = open_vector_index(layout, matrix)
+
+    # then
+    assert isinstance(index, IVFIndex)
+    assert index.quantized is not None and index.rerank == 8
+    assert layout.array("quant_codes").stat().st_mtime_ns == encoded
+    assert [i for i, _ in index.search(matrix[9], 3)][0] == 9
+
+
+def test_unknown_kind_is_rejected(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(ValueError):
+        write_vector_index(store.IndexLayout(tmp_path), AnnParams("hnsw"))
+    with pytest.raises(ValueError):
+        write_vector_index(
+            store.IndexLayout(tmp_path), AnnParams("exact", quantize="int4")
+        )
+
+
+def test_rerank_below_one_is_rejected() -> None:
+    with pytest.raises(ValueError, match="rerank"):
+        AnnParams("exact", quantize="int8", rerank=0)
+    with pytest.raises(SystemExit):
+        indexing.main(["--quantize", "int8", "--rerank", "0"])